@@ -1,12 +1,30 @@
 import streamlit as st
 import paramiko
 import os
-import tempfile
-from pathlib import Path
+import posixpath
+import datetime
 import time
-import io
-from PIL import Image
-import base64
+from functools import partial
+from pathlib import Path
+from sshfm.listing import ListingCache
+from sshfm.sftp_pool import PoolTimeout, SFTPPool
+from sshfm.thumbnails import ThumbnailService
+from sshfm.transfer import BatchUpload, RangeDownload, UploadItem, format_progress
+from sshfm.jobs import JobManager
+from sshfm.metrics import OpStats, prometheus_text, start_metrics_server
+from sshfm.backends import DEFAULT_BACKEND, available_backends, open_backend
+from sshfm.content_cache import ContentCache
+from sshfm.preview import PREVIEW_SIZE, LogFollower, read_chunk, read_head, read_tail
+from sshfm.terminal import CommandRun
+from sshfm.fanout import FANOUT_WORKERS, FanoutRun, parse_inventory
+from sshfm.search import TreeIndex, normalize_root
+from sshfm.archive import open_archive
+from sshfm.remote_copy import CopyItem, RemoteCopy, rename_path
+from sshfm.bulk_delete import BulkDelete
+from sshfm.stream_server import StreamServer, file_stream
+from sshfm.profiles import DEFAULT_PROFILE, PROFILES, connect_options, negotiated, sftp_options
+from sshfm.sync import COMPARE_MODES, plan_sync, scan_local_dir, sources_from_uploads
+from sshfm.browse import FILE_TYPES, PAGE_SIZES, SORT_KEYS, entry_type, filter_entries, sort_entries, page_count, paginate
 
 st.set_page_config(
     page_title="SSH File Manager",
@@ -15,7 +33,7 @@ st.set_page_config(
 )
 
 # Fungsi untuk membuat koneksi SSH dengan private key
-def create_ssh_client(host, user, key_path):
+def create_ssh_client(host, user, key_path, port=22, profile=DEFAULT_PROFILE):
     try:
         ssh = paramiko.SSHClient()
         ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -28,95 +46,45 @@ def create_ssh_client(host, user, key_path):
         
         ssh.connect(
             hostname=host,
+            port=port,
             username=user,
             key_filename=expanded_path,
-            timeout=10
+            timeout=10,
+            **connect_options(profile)
         )
         return ssh
     except Exception as e:
         return str(e)
 
+# Fungsi untuk membuka backend SFTP (paramiko memakai pool yang sudah ada,
+# asyncssh membuka koneksi sendiri dengan banyak permintaan per channel)
+def create_backend(name, host, user, key_path, sftp_pool, port=22, profile=DEFAULT_PROFILE):
+    try:
+        return open_backend(name, host, user, key_path=key_path, port=port, profile=profile,
+                            sftp_pool=sftp_pool)
+    except Exception as e:
+        return str(e)
+
 # Fungsi untuk mendapatkan daftar file
-def get_file_list(ssh_client, path):
+def get_file_list(backend, path, on_progress=None):
     try:
-        sftp = ssh_client.open_sftp()
-        files = sftp.listdir(path)
-        file_info = []
-        
-        for file in files:
-            try:
-                full_path = os.path.join(path, file).replace('\\', '/')
-                stat = sftp.stat(full_path)
-                is_dir = True if stat.st_mode & 0o40000 else False
-                size = stat.st_size
-                mtime = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stat.st_mtime))
-                
-                # Deteksi tipe file
-                file_type = "other"
-                ext = os.path.splitext(file)[1].lower()
-                if ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']:
-                    file_type = "image"
-                elif ext in ['.pdf', '.doc', '.docx', '.txt', '.csv', '.xlsx', '.xls']:
-                    file_type = "document"
-                elif ext in ['.mp4', '.avi', '.mov', '.mkv']:
-                    file_type = "video"
-                
-                file_info.append({
-                    'name': file,
-                    'path': full_path,
-                    'size': size,
-                    'modified': mtime,
-                    'is_dir': is_dir,
-                    'type': file_type,
-                    'extension': ext
-                })
-            except:
-                # Skip files with permission issues
-                pass
-                
-        sftp.close()
-        return file_info
+        return backend.listdir(path, on_progress=on_progress)
     except Exception as e:
         return str(e)
 
-# Fungsi untuk mengambil thumbnail gambar
-def get_image_thumbnail(ssh_client, file_path, max_size=1024*1024):
+# Fungsi untuk membuat folder
+def create_remote_dir(sftp_pool, dir_path):
     try:
-        sftp = ssh_client.open_sftp()
-        
-        # Cek ukuran file sebelum mengambil
-        stats = sftp.stat(file_path)
-        if stats.st_size > max_size:
-            return None, "File terlalu besar untuk preview"
-        
-        # Ambil file untuk preview
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            sftp.getfo(file_path, tmp)
-            tmp_path = tmp.name
-        
-        # Buka dan resize gambar untuk thumbnail
-        img = Image.open(tmp_path)
-        img.thumbnail((200, 200))
-        
-        # Konversi ke base64 untuk ditampilkan
-        buffered = io.BytesIO()
-        img.save(buffered, format=img.format if img.format else "JPEG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-        
-        # Bersihkan file temporary
-        os.unlink(tmp_path)
-        sftp.close()
-        
-        return img_str, None
+        with sftp_pool.channel("mkdir") as sftp:
+            sftp.mkdir(dir_path)
+        return True, None
     except Exception as e:
-        return None, str(e)
+        return False, str(e)
 
-# Fungsi untuk menghapus file
-def delete_remote_file(ssh_client, file_path):
+# Ganti nama di server (rename SFTP); tujuan yang sudah ada tidak ditimpa
+def rename_remote(sftp_pool, src, dst):
     try:
-        sftp = ssh_client.open_sftp()
-        sftp.remove(file_path)
-        sftp.close()
+        rename_path(sftp_pool, src, dst)
         return True, None
     except Exception as e:
         return False, str(e)
@@ -124,12 +92,56 @@ def delete_remote_file(ssh_client, file_path):
 # Inisialisasi session state
 if 'ssh_client' not in st.session_state:
     st.session_state.ssh_client = None
+if 'sftp_pool' not in st.session_state:
+    st.session_state.sftp_pool = None
+if 'host' not in st.session_state:
+    st.session_state.host = None
+if 'thumbnails' not in st.session_state:
+    st.session_state.thumbnails = None
+if 'backend' not in st.session_state:
+    st.session_state.backend = None
 if 'current_path' not in st.session_state:
     st.session_state.current_path = "/home"
 if 'history' not in st.session_state:
     st.session_state.history = []
 if 'delete_confirmation' not in st.session_state:
     st.session_state.delete_confirmation = {}
+if 'listing_cache' not in st.session_state:
+    st.session_state.listing_cache = ListingCache()
+if 'listing_path' not in st.session_state:
+    st.session_state.listing_path = None
+if 'page_number' not in st.session_state:
+    st.session_state.page_number = 1
+if 'terminal_run' not in st.session_state:
+    st.session_state.terminal_run = None
+if 'fanout_run' not in st.session_state:
+    st.session_state.fanout_run = None
+if 'key_path' not in st.session_state:
+    st.session_state.key_path = None
+if 'connection_profile' not in st.session_state:
+    st.session_state.connection_profile = DEFAULT_PROFILE
+if 'search_indexes' not in st.session_state:
+    st.session_state.search_indexes = {}
+if 'archive_job' not in st.session_state:
+    st.session_state.archive_job = None
+if 'download_links' not in st.session_state:
+    st.session_state.download_links = {}
+if 'jobs' not in st.session_state:
+    st.session_state.jobs = None
+if 'job_paths' not in st.session_state:
+    st.session_state.job_paths = {}
+if 'jobs_finished' not in st.session_state:
+    st.session_state.jobs_finished = set()
+if 'preview' not in st.session_state:
+    st.session_state.preview = None
+if 'rename_target' not in st.session_state:
+    st.session_state.rename_target = None
+if 'bulk_delete_pending' not in st.session_state:
+    st.session_state.bulk_delete_pending = None
+if 'delete_batch' not in st.session_state:
+    st.session_state.delete_batch = None
+if 'preview_follow' not in st.session_state:
+    st.session_state.preview_follow = None
 
 # Tampilkan panduan SSH-keygen
 def show_ssh_keygen_guide():
@@ -176,14 +188,44 @@ def show_connection_form():
                                     value="/home", 
                                     help="Direktori awal saat terhubung")
     
+    # Profil mengatur kompresi, cipher, window dan ukuran paket koneksi
+    profile = st.selectbox("Profil Koneksi", list(PROFILES),
+                           format_func=lambda name: f"{name} — {PROFILES[name]['description']}")
+    backends = available_backends()
+    backend_name = st.selectbox("Backend SFTP", backends,
+                                index=backends.index(DEFAULT_BACKEND) if DEFAULT_BACKEND in backends else 0,
+                                help="asyncssh menjalankan banyak operasi listing/thumbnail/hapus "
+                                     "sekaligus di satu channel")
+    
     if st.button("Hubungkan ke Server", use_container_width=True):
         with st.spinner("Menghubungkan ke server..."):
-            client = create_ssh_client(server_ip, username, private_key_path)
+            # Metrik sesi ini (connect, SFTP, exec) dicatat per host
+            stats = OpStats(host=server_ip)
+            start = time.perf_counter()
+            client = create_ssh_client(server_ip, username, private_key_path, profile=profile)
+            stats.record("connect", time.perf_counter() - start, isinstance(client, str))
             
             if isinstance(client, str):
                 st.error(f"Koneksi gagal: {client}")
+                return
+            pool = SFTPPool(client, max_channels=6, stats=stats, **sftp_options(profile))
+            backend = create_backend(backend_name, server_ip, username, private_key_path, pool, profile=profile)
+            if isinstance(backend, str):
+                pool.close()
+                client.close()
+                st.error(f"Koneksi backend {backend_name} gagal: {backend}")
             else:
                 st.session_state.ssh_client = client
+                st.session_state.sftp_pool = pool
+                st.session_state.backend = backend
+                st.session_state.connection_profile = profile
+                st.session_state.host = f"{username}@{server_ip}"
+                st.session_state.key_path = private_key_path
+                # Pekerjaan SFTP berjalan di worker latar; metrik antrean masuk ke statistik pool
+                st.session_state.jobs = JobManager(workers=st.session_state.sftp_pool.max_channels,
+                                                   stats=st.session_state.sftp_pool.stats)
+                st.session_state.thumbnails = ThumbnailService(backend, st.session_state.host,
+                                                               jobs=st.session_state.jobs)
                 st.session_state.current_path = initial_path
                 st.session_state.history = [initial_path]
                 st.success("Berhasil terhubung ke server!")
@@ -213,24 +255,549 @@ def show_main_interface():
     
     with col3:
         if st.button("Refresh 🔄", use_container_width=True):
+            st.session_state.listing_cache.invalidate(st.session_state.current_path)
             st.rerun()
     
+    # Listing yang diubah job latar di-refresh sebelum ditampilkan
+    collect_finished_jobs()
+    
     # Tab untuk fitur utama
-    tab1, tab2, tab3 = st.tabs(["File Manager", "Terminal", "Disconnect"])
+    tab1, tab2, tab3, tab4 = st.tabs(["File Manager", "Cari", "Terminal", "Disconnect"])
     
     with tab1:
         show_file_manager()
     
     with tab2:
-        show_terminal()
+        show_search()
     
     with tab3:
+        show_terminal()
+    
+    with tab4:
         show_disconnect()
+    
+    show_jobs()
+    show_debug_panel()
+
+# Server /metrics (Prometheus) bersama semua sesi; None jika SSHFM_METRICS_PORT kosong
+@st.cache_resource
+def get_metrics_server():
+    return start_metrics_server()
+
+# Panel debug: metrik latensi SFTP dan statistik cache listing
+def show_debug_panel():
+    pool = st.session_state.sftp_pool
+    with st.expander("Debug", expanded=False):
+        cache_stats = st.session_state.listing_cache.stats()
+        st.caption(f"Cache listing: {cache_stats['hits']} hit, {cache_stats['misses']} miss, "
+                   f"{cache_stats['invalidations']} invalidasi, {cache_stats['entries']} path "
+                   f"(TTL {cache_stats['ttl']} detik)")
+        st.caption(f"Channel idle: {pool.idle_count()} / maks {pool.max_channels}")
+        job_metrics = st.session_state.jobs.metrics()
+        st.caption(f"Job: {job_metrics['queued']} antre (kedalaman antrean {job_metrics['queue_depth']}, "
+                   f"termasuk thumbnail), {job_metrics['running']} berjalan, {job_metrics['workers']} worker; "
+                   f"tunggu di antrean rata-rata {job_metrics['avg_wait_ms']:.1f} ms, "
+                   f"maks {job_metrics['max_wait_ms']:.1f} ms")
+        algorithms = negotiated(st.session_state.ssh_client)
+        st.caption(f"Backend SFTP: {st.session_state.backend.name}")
+        st.caption(f"Profil {st.session_state.connection_profile}: cipher {algorithms.get('cipher')}, "
+                   f"kompresi {algorithms.get('kompresi')}, window {pool.window_size // (1024 * 1024)} MB, "
+                   f"paket {pool.max_packet_size // 1024} KB")
+        rows = pool.stats.snapshot()
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+        else:
+            st.caption("Belum ada operasi tercatat")
+        metrics_server = get_metrics_server()
+        if metrics_server is not None:
+            st.caption(f"Endpoint Prometheus (semua sesi): {metrics_server.url}")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("Ekspor Prometheus", partial(prometheus_text, [pool.stats]),
+                               file_name="sshfm_metrics.prom", mime="text/plain", use_container_width=True)
+        with col2:
+            if st.button("Reset Metrik", use_container_width=True):
+                pool.stats.reset()
+                st.rerun()
+
+# Ikon berdasarkan tipe file
+def file_icon(file):
+    if file['is_dir']:
+        return "📁"
+    elif file['type'] == "image":
+        return "🖼️"
+    elif file['type'] == "document":
+        return "📄"
+    elif file['type'] == "video":
+        return "🎬"
+    return "📎"
+
+# Satu kartu file: nama, preview, info dan tombol aksi
+def show_file_tile(file):
+    icon = file_icon(file)
+    
+    st.markdown(f"**{icon} {file['name']}**")
+
+    # Tampilkan preview gambar jika tipe file adalah gambar
+    if file['type'] == "image":
+        status, thumb = st.session_state.thumbnails.get(file)
+        if status == 'ready':
+            mime, img_b64 = thumb
+            st.markdown(f"""
+            <div style="text-align: center;">
+                <img src="data:{mime};base64,{img_b64}" style="max-width: 100%; max-height: 150px; margin: 10px 0;">
+            </div>
+            """, unsafe_allow_html=True)
+        elif status == 'pending':
+            st.caption("⏳ Memuat preview...")
+        else:
+            st.caption(f"Preview tidak tersedia: {thumb}")
+
+    # Info file
+    file_size = f"{file['size'] / 1024:.1f} KB" if not file['is_dir'] else ""
+    st.caption(f"Modified: {file['modified']}")
+    if file_size:
+        st.caption(f"Size: {file_size}")
+
+    # Jika direktori, tambahkan tombol navigasi
+    if file['is_dir']:
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Buka", key=f"open_{file['name']}"):
+                new_path = os.path.join(st.session_state.current_path, file['name']).replace('\\', '/')
+                st.session_state.current_path = new_path
+                st.session_state.history.append(new_path)
+                st.rerun()
+        with col2:
+            if st.button("📦 Download", key=f"archive_{file['name']}"):
+                start_archive(file['path'])
+                st.rerun()
+    else:
+        # Untuk file, tambahkan tombol download dan hapus
+        col1, col2 = st.columns(2)
+
+        with col1:
+            job = st.session_state.jobs.find("download", file['path'])
+            if job is not None and job.status == "selesai":
+                # File cache dialirkan per potongan lewat server stream saat link
+                # dibuka; st.download_button akan membacanya utuh ke memori
+                st.link_button(f"Download {file['name']}", download_link(job, file['name']))
+            elif job is not None and job.is_running():
+                st.caption(format_progress("Mengunduh", job.done, job.total or 0, job.rate()))
+            elif st.button("⬇️ Download", key=f"download_{file['name']}"):
+                start_download(file)
+                st.rerun()
+            if job is not None and job.status == "gagal":
+                st.error(f"Gagal mengunduh file: {job.error}")
+
+        with col2:
+            # Tombol hapus yang lebih besar
+            file_key = f"delete_{file['name']}"
+
+            # Cek apakah file ini sudah dalam konfirmasi hapus
+            if file_key in st.session_state.delete_confirmation and st.session_state.delete_confirmation[file_key]:
+                # Tampilkan konfirmasi tanpa nested columns
+                st.warning(f"Yakin hapus {file['name']}?")
+
+                # Tombol konfirmasi Ya
+                if st.button("✓ Ya", key=f"confirm_yes_{file['name']}", use_container_width=True):
+                    # Hapus di latar; listing di-refresh saat job selesai
+                    submit_job("hapus", file['path'], partial(run_delete, st.session_state.backend, file['path']),
+                               refresh_path=posixpath.dirname(file['path']))
+                    # Reset status konfirmasi
+                    st.session_state.delete_confirmation[file_key] = False
+                    st.rerun()
+
+                # Tombol konfirmasi Tidak
+                if st.button("✗ Tidak", key=f"confirm_no_{file['name']}", use_container_width=True):
+                    # Reset status konfirmasi
+                    st.session_state.delete_confirmation[file_key] = False
+                    st.rerun()
+            else:
+                # Tombol hapus yang lebih besar dan mencolok
+                if st.button("🗑️ Hapus", key=file_key, use_container_width=True):
+                    # Aktifkan mode konfirmasi untuk file ini
+                    st.session_state.delete_confirmation[file_key] = True
+                    st.rerun()
+
+        # Preview teks hanya membaca potongan file, cocok untuk log besar
+        if file['type'] not in ("image", "video"):
+            if st.button("👁️ Preview", key=f"preview_{file['name']}"):
+                open_preview(file['path'], read_head)
+                st.rerun()
+
+    # Ganti nama file/folder langsung di server, tanpa memindahkan data
+    if st.session_state.rename_target == file['path']:
+        new_name = st.text_input("Nama baru", value=file['name'], key=f"rename_name_{file['name']}")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("✓ Simpan", key=f"rename_save_{file['name']}", use_container_width=True):
+                if not new_name or "/" in new_name:
+                    st.error("Nama tidak valid")
+                else:
+                    parent = posixpath.dirname(file['path'])
+                    success, error = rename_remote(st.session_state.sftp_pool, file['path'],
+                                                   posixpath.join(parent, new_name))
+                    if success:
+                        st.session_state.rename_target = None
+                        st.session_state.listing_cache.invalidate(parent)
+                        st.rerun()
+                    else:
+                        st.error(f"Gagal mengganti nama: {error}")
+        with col2:
+            if st.button("✗ Batal", key=f"rename_cancel_{file['name']}", use_container_width=True):
+                st.session_state.rename_target = None
+                st.rerun()
+    elif st.button("✏️ Ganti Nama", key=f"rename_{file['name']}"):
+        st.session_state.rename_target = file['path']
+        st.rerun()
+
+    # Garis pemisah antar file
+    st.markdown("---")
+
+# Buka preview teks dengan reader (read_head/read_tail/read_chunk) untuk path
+def open_preview(path, reader, *args):
+    stop_preview_follow()
+    preview = st.session_state.preview
+    length = preview['length'] if preview and preview['path'] == path else PREVIEW_SIZE
+    encoding = preview['chunk']['encoding'] if preview and preview['path'] == path else None
+    try:
+        chunk = reader(st.session_state.backend, path, *args, length=length, encoding=encoding)
+    except Exception as e:
+        st.session_state.preview = {'path': path, 'length': length, 'chunk': None, 'error': str(e)}
+        return
+    st.session_state.preview = {'path': path, 'length': length, 'chunk': chunk, 'error': None}
+
+def stop_preview_follow():
+    if st.session_state.preview_follow is not None:
+        st.session_state.preview_follow.cancel()
+        st.session_state.preview_follow = None
+
+# Panel preview: awal/akhir file, halaman per offset byte, dan mode follow
+def show_preview():
+    preview = st.session_state.preview
+    path = preview['path']
+    st.subheader(f"Preview: {posixpath.basename(path)}")
+    if preview['error']:
+        st.error(f"Gagal membaca file: {preview['error']}")
+    chunk = preview['chunk']
+    follower = st.session_state.preview_follow
+    
+    col1, col2, col3, col4, col5, col6 = st.columns([2, 1, 1, 1, 1, 2])
+    with col1:
+        sizes = [4, 16, 64, 256, 1024]
+        length_kb = st.selectbox("Ukuran potongan (KB)", sizes, index=sizes.index(preview['length'] // 1024)
+                                 if preview['length'] // 1024 in sizes else 2, key="preview_length")
+        if length_kb * 1024 != preview['length']:
+            preview['length'] = length_kb * 1024
+            if chunk is not None and follower is None:
+                open_preview(path, read_chunk, chunk['offset'])
+                st.rerun()
+    with col2:
+        if st.button("⏮ Awal", use_container_width=True):
+            open_preview(path, read_head)
+            st.rerun()
+    with col3:
+        if st.button("◀ Sebelumnya", use_container_width=True, disabled=chunk is None or chunk['offset'] == 0):
+            open_preview(path, read_chunk, max(0, chunk['offset'] - preview['length']))
+            st.rerun()
+    with col4:
+        if st.button("Berikutnya ▶", use_container_width=True, disabled=chunk is None or chunk['end'] >= chunk['size']):
+            open_preview(path, read_chunk, chunk['end'])
+            st.rerun()
+    with col5:
+        if st.button("Akhir ⏭", use_container_width=True):
+            open_preview(path, read_tail)
+            st.rerun()
+    with col6:
+        if st.button("Tutup Preview", use_container_width=True):
+            stop_preview_follow()
+            st.session_state.preview = None
+            st.rerun()
+    
+    if chunk is None:
+        return
+    col1, col2 = st.columns([2, 3])
+    with col1:
+        offset = st.number_input("Lompat ke offset (byte)", min_value=0, max_value=max(chunk['size'], 0),
+                                 value=chunk['offset'], step=preview['length'])
+        if offset != chunk['offset']:
+            open_preview(path, read_chunk, offset)
+            st.rerun()
+    with col2:
+        following = st.toggle("Ikuti (tail -f)", value=follower is not None, disabled=chunk['text'] is None,
+                              help="Cek ukuran file tiap detik dan tampilkan hanya baris yang ditambahkan")
+    if following and follower is None:
+        # Mulai dari akhir file: tampilkan potongan terakhir lalu ikuti tambahannya
+        open_preview(path, read_tail)
+        tail = st.session_state.preview['chunk']
+        if tail is not None:
+            st.session_state.preview_follow = LogFollower(st.session_state.backend, path, tail['end'],
+                                                          encoding=tail['encoding'],
+                                                          initial_text=tail['text']).start()
+        st.rerun()
+    elif not following and follower is not None:
+        stop_preview_follow()
+        st.rerun()
+    
+    if follower is not None:
+        show_preview_live()
+    elif chunk['text'] is None:
+        st.warning("File tampak biner, preview teks tidak tersedia")
+    else:
+        st.caption(f"Byte {chunk['offset']:,}–{chunk['end']:,} dari {chunk['size']:,} "
+                   f"({chunk['encoding']})")
+        st.code(chunk['text'], language=None)
+
+# Isi mode follow, diperbarui tiap detik tanpa rerun seluruh halaman
+@st.fragment(run_every=1)
+def show_preview_live():
+    follower = st.session_state.preview_follow
+    if follower is None:
+        return
+    caption = (f"Mengikuti: {follower.size:,} byte, {follower.bytes_read:,} byte baru dibaca "
+               f"({follower.encoding})")
+    if follower.skipped:
+        caption += f", {follower.skipped:,} byte dilewati"
+    st.caption(caption)
+    if follower.error:
+        st.warning(f"Gagal membaca file: {follower.error}")
+    st.code(follower.text(), language=None)
+
+# Cache isi file hasil download, dipakai bersama semua sesi
+@st.cache_resource
+def get_content_cache():
+    return ContentCache()
+
+# Unduh file ke cache lokal sebagai rentang byte paralel. File yang tidak
+# berubah (size, mtime) tidak diunduh ulang; download yang putus atau
+# dibatalkan dilanjutkan saat diklik lagi. Berjalan sebagai job latar.
+def run_download(pool, cache, host, path, job):
+    with pool.channel("stat") as sftp:
+        attr = sftp.stat(path)
+    job.report(0, attr.st_size)
+    cached = cache.lookup(host, path, attr.st_size, attr.st_mtime)
+    if cached:
+        job.report(attr.st_size)
+        return cached
+    
+    download = RangeDownload(pool, path, cache.part_path(host, path),
+                             attr.st_size, attr.st_mtime).start()
+    job.on_cancel(download.cancel)
+    while not download.wait(0.25):
+        job.report(download.done_bytes())
+    job.report(download.done_bytes())
+    job.check()
+    download.finish()
+    return cache.commit_part(host, path, attr.st_size, attr.st_mtime)
+
+def start_download(file):
+    submit_job("download", file['path'], partial(run_download, st.session_state.sftp_pool,
+                                                 get_content_cache(), st.session_state.host, file['path']))
+
+# Link stream untuk hasil job download: didaftarkan sekali per job dan dipakai
+# ulang di setiap rerun, lalu dibuat ulang setelah kedaluwarsa
+def download_link(job, filename):
+    links = st.session_state.download_links
+    now = time.monotonic()
+    for job_id in [job_id for job_id, (_, expires) in links.items() if now > expires]:
+        del links[job_id]
+    if job.id not in links:
+        server = get_stream_server()
+        url = server.register(filename, "application/octet-stream", partial(file_stream, job.result),
+                              once=False)
+        links[job.id] = (url, now + server.link_ttl)
+    return links[job.id][0]
+
+# Hapus satu file; error dilaporkan lewat status job
+def run_delete(backend, path, job):
+    backend.remove(path)
+
+# Hapus banyak entri sekaligus sebagai job; progres dalam jumlah entri
+def run_bulk_delete(batch, job):
+    batch.start()
+    job.on_cancel(batch.cancel)
+    while not batch.wait(0.25):
+        job.report(batch.done_count(), batch.total_count())
+    job.report(batch.done_count(), batch.total_count())
+    summary = batch.summary()
+    if batch.error:
+        raise IOError(batch.error)
+    if summary['failed'] and not job.cancelled:
+        raise IOError(f"{summary['failed']} dari {summary['items']} entri gagal dihapus")
+    return summary
+
+# Upload batch sebagai job; file yang belum selesai berhenti saat dibatalkan
+def run_upload(pool, items, workers, job):
+    return follow_batch(BatchUpload(pool, items, workers=workers).start(), job)
+
+def follow_batch(batch, job):
+    job.on_cancel(batch.cancel)
+    job.report(0, batch.total)
+    while not batch.wait(0.25):
+        job.report(batch.done_bytes())
+    job.report(batch.done_bytes())
+    summary = batch.summary()
+    if summary['failed'] and not job.cancelled:
+        raise IOError(f"{summary['failed']} dari {summary['files']} file gagal diunggah")
+    return summary
+
+# Salin/pindahkan di server sebagai job; progres dalam byte hanya untuk salin
+# (pindah cukup rename, selesai seketika)
+def run_remote_copy(pool, items, action, overwrite, job):
+    copy = RemoteCopy(pool, items, action=action, overwrite=overwrite).start()
+    job.on_cancel(copy.cancel)
+    while not copy.wait(0.25):
+        if action == "copy":
+            job.report(copy.done_bytes(), copy.total_bytes())
+    if action == "copy":
+        job.report(copy.done_bytes(), copy.total_bytes())
+    summary = copy.summary()
+    if summary['failed'] and not job.cancelled:
+        errors = [f"{item.src}: {item.error}" for item in items if item.status == "gagal"]
+        raise IOError(f"{summary['failed']} dari {summary['items']} entri gagal — " + "; ".join(errors[:3]))
+    return summary
+
+# Daftarkan job di antrean sesi. refresh_path: listing (satu path atau daftar) yang
+# di-invalidate saat job selesai (dari thread skrip, karena cache listing tidak thread-safe).
+# Job dengan refresh_path ditahan di riwayat JobManager sampai collect_finished_jobs memprosesnya.
+def submit_job(kind, label, fn, total=None, refresh_path=None):
+    job = st.session_state.jobs.submit(kind, label, fn, total=total, hold=refresh_path is not None)
+    if refresh_path is not None:
+        st.session_state.job_paths[job.id] = refresh_path
+    return job
+
+# Server HTTP lokal untuk mengalirkan archive folder dan file unduhan, dipakai bersama semua sesi
+@st.cache_resource
+def get_stream_server():
+    return StreamServer()
+
+# Siapkan link download folder: tar dari server jika ada shell, jika tidak zip lewat SFTP.
+# Archive dibuat sambil dikirim, tanpa menampung isi folder di memori atau disk.
+def start_archive(path):
+    previous = st.session_state.archive_job
+    if previous is not None and previous['progress'].is_running():
+        previous['progress'].cancel()
+    pool = st.session_state.sftp_pool
+    name, content_type, stream, progress = open_archive(pool, st.session_state.ssh_client, path)
+    server = get_stream_server()
+    url = server.register(name, content_type, lambda: stream)
+    st.session_state.archive_job = {'path': path, 'url': url, 'progress': progress,
+                                    'expires': time.monotonic() + server.link_ttl}
+
+def show_archive_job():
+    job = st.session_state.archive_job
+    progress = job['progress']
+    st.link_button(f"⬇️ Unduh {progress.name}", job['url'], disabled=progress.status != "menunggu")
+    if progress.status == "menunggu":
+        st.caption(f"Klik link untuk mulai mengunduh {job['path']} ({progress.method})")
+    else:
+        status = (f"{progress.name}: {progress.status}, {progress.files} file, "
+                  f"{progress.bytes / (1024 * 1024):.1f} MB, {progress.rate():.2f} MB/s, "
+                  f"{progress.elapsed():.1f} detik")
+        st.caption(status)
+    if progress.error:
+        st.warning(progress.error)
+
+# Progres archive diperbarui tiap detik selama link belum selesai dialirkan.
+# Link yang tidak dibuka sampai kedaluwarsa ditandai selesai agar polling berhenti.
+@st.fragment(run_every=1)
+def show_archive_live():
+    job = st.session_state.archive_job
+    if job['progress'].status == "menunggu" and time.monotonic() > job['expires']:
+        job['progress'].expire()
+        st.rerun()
+    col1, col2 = st.columns([4, 1])
+    with col2:
+        if st.button("✗ Batalkan", key="cancel_archive"):
+            job['progress'].cancel()
+            st.session_state.archive_job = None
+            st.rerun()
+    with col1:
+        show_archive_job()
+    if not job['progress'].is_running():
+        st.rerun()
+
+# Sumber file untuk sinkronisasi folder; None jika belum dipilih
+def get_sync_sources(source):
+    if source == "Folder dari browser":
+        uploaded_files = st.file_uploader("Pilih folder", accept_multiple_files="directory", key="sync_files")
+        strip_top = st.checkbox("Isi folder langsung ke tujuan (tanpa nama folder teratas)", key="sync_strip")
+        return sources_from_uploads(uploaded_files, strip_top) if uploaded_files else None
+    local_dir = st.text_input("Path folder di mesin aplikasi", key="sync_local_dir",
+                              placeholder="contoh: ./deploy/config")
+    if not local_dir:
+        return None
+    local_dir = os.path.expanduser(local_dir)
+    if not os.path.isdir(local_dir):
+        st.error(f"Folder tidak ditemukan: {local_dir}")
+        return None
+    return scan_local_dir(local_dir)
+
+# Sinkronkan folder lokal ke server: bandingkan dulu, unggah yang berubah saja
+def show_folder_sync():
+    source = st.radio("Sumber", ["Folder dari browser", "Folder di mesin aplikasi"],
+                      horizontal=True, key="sync_source")
+    sources = get_sync_sources(source)
+    remote_root = st.text_input("Folder tujuan di server", value=st.session_state.current_path,
+                                key="sync_remote_root")
+    # Browser tidak mengirim waktu ubah file, jadi hanya ukuran/checksum
+    modes = ["checksum", "size"] if source == "Folder dari browser" else ["mtime", "checksum", "size"]
+    compare = st.selectbox("Bandingkan dengan", modes, format_func=COMPARE_MODES.get, key="sync_compare")
+    pool = st.session_state.sftp_pool
+    workers = st.slider("Upload paralel (channel SFTP)", 1, pool.max_channels,
+                        min(4, pool.max_channels), key="sync_workers")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        dry_run = st.button("Lihat Perbedaan", use_container_width=True, disabled=not sources)
+    with col2:
+        apply = st.button("Sinkronkan", use_container_width=True, disabled=not sources)
+    if not (dry_run or apply):
+        return
+    
+    try:
+        with st.spinner("Membandingkan dengan server..."):
+            plan = plan_sync(pool, sources, remote_root, compare=compare,
+                             ssh_client=st.session_state.ssh_client, workers=workers)
+    except IOError as e:
+        st.error(f"Gagal membandingkan: {e}")
+        return
+    counts = plan.counts()
+    st.caption(f"{counts['baru']} baru, {counts['berubah']} berubah, {counts['sama']} sama, "
+               f"{counts['konflik']} konflik, {counts['hanya di server']} hanya di server — "
+               f"{counts['upload_bytes'] / 1024:.1f} KB perlu diunggah (dibandingkan dalam {plan.seconds:.2f} detik)")
+    
+    if dry_run:
+        rows = plan.rows()
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+        else:
+            st.success("Semua file sudah sama dengan server")
+        if plan.remote_only:
+            with st.expander(f"{len(plan.remote_only)} file hanya ada di server (tidak dihapus)"):
+                st.code("\n".join(plan.remote_only))
+        return
+    
+    if not plan.changed():
+        st.success("Semua file sudah sama dengan server, tidak ada yang diunggah")
+        return
+    submit_job("sinkron", f"{len(plan.changed())} file ke {plan.remote_root}",
+               partial(run_sync, pool, plan, workers), refresh_path=plan.remote_root)
+    st.info(f"Sinkronisasi berjalan di latar, {counts['sama']} file dilewati. Progres ada di panel Job.")
+
+# Buat folder yang kurang lalu unggah file yang berubah, sebagai job latar
+def run_sync(pool, plan, workers, job):
+    return follow_batch(plan.start(pool, workers=workers), job)
 
 # Tab File Manager
 def show_file_manager():
     st.subheader("File Manager")
     
+    # Listing dimuat sebelum expander yang juga memakainya, agar halaman pertama
+    # tampil di atas selama sisa entri masih mengalir
+    files = get_current_listing(first_page=True)
+    
     # Upload multiple files
     with st.expander("Upload Files", expanded=False):
         uploaded_files = st.file_uploader("Pilih file untuk diunggah", 
@@ -238,183 +805,538 @@ def show_file_manager():
                                           help="File akan diunggah ke path saat ini")
         
         if uploaded_files:
+            pool = st.session_state.sftp_pool
+            workers = st.slider("Upload paralel (channel SFTP)", 1, pool.max_channels,
+                                min(4, pool.max_channels), key="upload_workers")
             if st.button("Upload Files", use_container_width=True):
-                with st.spinner("Mengunggah file..."):
-                    try:
-                        sftp = st.session_state.ssh_client.open_sftp()
-                        
-                        for uploaded_file in uploaded_files:
-                            temp_path = os.path.join(tempfile.gettempdir(), uploaded_file.name)
-                            
-                            # Simpan ke file sementara
-                            with open(temp_path, "wb") as f:
-                                f.write(uploaded_file.getbuffer())
-                            
-                            # Upload ke server
-                            remote_path = os.path.join(st.session_state.current_path, uploaded_file.name).replace('\\', '/')
-                            sftp.put(temp_path, remote_path)
-                            
-                            # Hapus file sementara
-                            os.remove(temp_path)
-                        
-                        sftp.close()
-                        st.success(f"{len(uploaded_files)} file berhasil diunggah!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Gagal mengunggah file: {e}")
+                items = []
+                for uploaded_file in uploaded_files:
+                    # Upload langsung dari buffer memori, tanpa file sementara
+                    remote_path = os.path.join(st.session_state.current_path, uploaded_file.name).replace('\\', '/')
+                    items.append(UploadItem(uploaded_file.name, uploaded_file.getbuffer(), remote_path))
+                submit_job("upload", f"{len(items)} file ke {st.session_state.current_path}",
+                           partial(run_upload, pool, items, workers),
+                           refresh_path=st.session_state.current_path)
+                st.rerun()
+    
+    # Upload folder: hanya file baru/berubah yang dikirim
+    with st.expander("Sinkronkan Folder", expanded=False):
+        show_folder_sync()
+    
+    # Buat folder baru di path saat ini
+    with st.expander("Buat Folder", expanded=False):
+        folder_name = st.text_input("Nama folder", key="new_folder_name")
+        if st.button("Buat Folder", use_container_width=True) and folder_name:
+            new_dir = os.path.join(st.session_state.current_path, folder_name).replace('\\', '/')
+            success, error = create_remote_dir(st.session_state.sftp_pool, new_dir)
+            if success:
+                st.session_state.listing_cache.invalidate(st.session_state.current_path)
+                st.rerun()
+            else:
+                st.error(f"Gagal membuat folder: {error}")
+    
+    # Salin/pindahkan beberapa entri ke folder lain, seluruhnya di sisi server
+    with st.expander("Salin / Pindahkan", expanded=False):
+        show_copy_move()
+    
+    # Hapus banyak file/folder dengan satu konfirmasi
+    with st.expander("Hapus Beberapa", expanded=st.session_state.bulk_delete_pending is not None):
+        show_bulk_delete()
+    
+    if st.session_state.preview is not None:
+        show_preview()
+    
+    job = st.session_state.archive_job
+    if job is not None:
+        if job['progress'].is_running():
+            show_archive_live()
+        else:
+            show_archive_job()
+            if st.button("Tutup", key="close_archive"):
+                st.session_state.archive_job = None
+                st.rerun()
     
     # Daftar file
     st.subheader("Daftar File")
     
-    # Dapatkan daftar file dari server
-    files = get_file_list(st.session_state.ssh_client, st.session_state.current_path)
-    
     if isinstance(files, str):
         st.error(f"Gagal mendapatkan daftar file: {files}")
         return
     
-    # Tampilkan daftar file dalam tabel
-    if files:
-        # Urutkan: folder terlebih dahulu, kemudian file
-        files = sorted(files, key=lambda x: (not x['is_dir'], x['name'].lower()))
-        
+    if not files:
+        st.info("Direktori kosong")
+        return
+    
+    # Filter, urutan dan halaman dihitung dari listing yang sudah di-cache
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
+    with col1:
+        name_query = st.text_input("Cari nama", key="filter_name", placeholder="contoh: log atau *.csv")
+    with col2:
+        types = st.multiselect("Tipe", FILE_TYPES, key="filter_types")
+    with col3:
+        ext_options = sorted({f['extension'] for f in files if f['extension']})
+        extensions = st.multiselect("Ekstensi", ext_options, key="filter_extensions")
+    with col4:
+        view_mode = st.radio("Tampilan", ["Grid", "Tabel"], horizontal=True, key="view_mode")
+    
+    visible = filter_entries(files, name_query, extensions, types)
+    
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
+    with col1:
+        sort_by = st.selectbox("Urutkan", list(SORT_KEYS), key="sort_by")
+    with col2:
+        descending = st.toggle("Menurun", key="sort_descending")
+    with col3:
+        page_size = st.selectbox("Per halaman", PAGE_SIZES, key="page_size")
+    with col4:
+        pages = page_count(len(visible), page_size)
+        page = st.number_input(f"Halaman (dari {pages})", min_value=1, max_value=pages,
+                               value=min(st.session_state.page_number, pages))
+        st.session_state.page_number = page
+    
+    visible = sort_entries(visible, sort_by, descending)
+    page_files, page, pages = paginate(visible, page, page_size)
+    st.caption(f"{len(visible)} dari {len(files)} entri, halaman {page}/{pages}")
+    
+    if not page_files:
+        st.info("Tidak ada file yang cocok dengan filter")
+    elif view_mode == "Tabel":
+        show_file_table(page_files)
+    else:
         # Buat kolom untuk setiap file
         col_size = 3  # Jumlah kolom per baris
-        rows = [files[i:i+col_size] for i in range(0, len(files), col_size)]
+        rows = [page_files[i:i+col_size] for i in range(0, len(page_files), col_size)]
         
         for row in rows:
             cols = st.columns(col_size)
             
             for i, file in enumerate(row):
-                if i < len(cols):
-                    with cols[i]:
-                        with st.container():
-                            # Tentukan ikon berdasarkan tipe file
-                            if file['is_dir']:
-                                icon = "📁"
-                            elif file['type'] == "image":
-                                icon = "🖼️"
-                            elif file['type'] == "document":
-                                icon = "📄"
-                            elif file['type'] == "video":
-                                icon = "🎬"
-                            else:
-                                icon = "📎"
-                            
-                            st.markdown(f"**{icon} {file['name']}**")
-                            
-                            # Tampilkan preview gambar jika tipe file adalah gambar
-                            if file['type'] == "image":
-                                img_b64, error = get_image_thumbnail(st.session_state.ssh_client, file['path'])
-                                if img_b64:
-                                    st.markdown(f"""
-                                    <div style="text-align: center;">
-                                        <img src="data:image/jpeg;base64,{img_b64}" style="max-width: 100%; max-height: 150px; margin: 10px 0;">
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                elif error:
-                                    st.caption(f"Preview tidak tersedia: {error}")
-                            
-                            # Info file
-                            file_size = f"{file['size'] / 1024:.1f} KB" if not file['is_dir'] else ""
-                            st.caption(f"Modified: {file['modified']}")
-                            if file_size:
-                                st.caption(f"Size: {file_size}")
-                            
-                            # Jika direktori, tambahkan tombol navigasi
-                            if file['is_dir']:
-                                if st.button("Buka", key=f"open_{file['name']}"):
-                                    new_path = os.path.join(st.session_state.current_path, file['name']).replace('\\', '/')
-                                    st.session_state.current_path = new_path
-                                    st.session_state.history.append(new_path)
-                                    st.rerun()
-                            else:
-                                # Untuk file, tambahkan tombol download dan hapus
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    if st.button("⬇️ Download", key=f"download_{file['name']}"):
-                                        with st.spinner("Mengunduh file..."):
-                                            try:
-                                                sftp = st.session_state.ssh_client.open_sftp()
-                                                local_path = os.path.join(tempfile.gettempdir(), file['name'])
-                                                sftp.get(file['path'], local_path)
-                                                
-                                                # Baca file dan berikan download button
-                                                with open(local_path, "rb") as f:
-                                                    file_bytes = f.read()
-                                                    st.download_button(
-                                                        label=f"Download {file['name']}",
-                                                        data=file_bytes,
-                                                        file_name=file['name'],
-                                                        mime="application/octet-stream"
-                                                    )
-                                                
-                                                sftp.close()
-                                            except Exception as e:
-                                                st.error(f"Gagal mengunduh file: {e}")
-                                
-                                with col2:
-                                    # Tombol hapus yang lebih besar
-                                    file_key = f"delete_{file['name']}"
-                                    
-                                    # Cek apakah file ini sudah dalam konfirmasi hapus
-                                    if file_key in st.session_state.delete_confirmation and st.session_state.delete_confirmation[file_key]:
-                                        # Tampilkan konfirmasi tanpa nested columns
-                                        st.warning(f"Yakin hapus {file['name']}?")
-                                        
-                                        # Tombol konfirmasi Ya
-                                        if st.button("✓ Ya", key=f"confirm_yes_{file['name']}", use_container_width=True):
-                                            with st.spinner("Menghapus file..."):
-                                                success, error = delete_remote_file(st.session_state.ssh_client, file['path'])
-                                                if success:
-                                                    st.success(f"File {file['name']} berhasil dihapus!")
-                                                    # Reset status konfirmasi
-                                                    st.session_state.delete_confirmation[file_key] = False
-                                                    st.rerun()
-                                                else:
-                                                    st.error(f"Gagal menghapus file: {error}")
-                                        
-                                        # Tombol konfirmasi Tidak
-                                        if st.button("✗ Tidak", key=f"confirm_no_{file['name']}", use_container_width=True):
-                                            # Reset status konfirmasi
-                                            st.session_state.delete_confirmation[file_key] = False
-                                            st.rerun()
-                                    else:
-                                        # Tombol hapus yang lebih besar dan mencolok
-                                        if st.button("🗑️ Hapus", key=file_key, use_container_width=True):
-                                            # Aktifkan mode konfirmasi untuk file ini
-                                            st.session_state.delete_confirmation[file_key] = True
-                                            st.rerun()
-                            
-                            # Garis pemisah antar file
-                            st.markdown("---")
+                with cols[i]:
+                    with st.container():
+                        show_file_tile(file)
+    
+    # Muat ulang halaman sekali saat semua thumbnail selesai dibuat
+    if st.session_state.thumbnails.pending_count():
+        wait_for_thumbnails()
+
+# Pilih entri di folder saat ini dan folder tujuan. Widget sengaja tanpa key
+# agar pilihan dan tujuan mengikuti folder yang sedang dibuka.
+def show_copy_move():
+    files = get_current_listing()
+    if isinstance(files, str) or not files:
+        st.caption("Tidak ada entri di folder ini")
+        return
+    by_name = {file['name']: file for file in files}
+    names = st.multiselect("File/folder", list(by_name))
+    target = st.text_input("Folder tujuan", value=st.session_state.current_path)
+    action = st.radio("Aksi", ["Salin", "Pindahkan"], horizontal=True, key="copy_action")
+    overwrite = st.checkbox("Timpa jika sudah ada", key="copy_overwrite")
+    if st.button(f"{action} {len(names)} entri", use_container_width=True, disabled=not names):
+        target = normalize_root(target)
+        items = [CopyItem(by_name[name]['path'], posixpath.join(target, name)) for name in names]
+        kind, mode = ("salin", "copy") if action == "Salin" else ("pindah", "move")
+        submit_job(kind, f"{len(items)} entri ke {target}",
+                   partial(run_remote_copy, st.session_state.sftp_pool, items, mode, overwrite),
+                   refresh_path=[st.session_state.current_path, target])
+        st.rerun()
+
+# Pilih entri satu per satu dan/atau dengan pola nama (mis. semua log yang
+# dirotasi), lalu hapus semuanya setelah satu konfirmasi. Hasil hapus terakhir
+# ditampilkan per entri.
+def show_bulk_delete():
+    files = get_current_listing()
+    if isinstance(files, str) or not files:
+        st.caption("Tidak ada entri di folder ini")
+        return
+    by_name = {file['name']: file for file in files}
+    pattern = st.text_input("Pilih dengan pola nama", placeholder="contoh: *.log.* atau *.tmp")
+    matched = [file['name'] for file in filter_entries(files, pattern)] if pattern else []
+    picked = st.multiselect("File/folder lain", list(by_name))
+    names = matched + [name for name in picked if name not in matched]
+    if pattern:
+        st.caption(f"{len(matched)} entri cocok dengan pola")
+    recursive = st.checkbox("Hapus folder beserta isinya", key="delete_recursive")
+    use_rm = st.checkbox("Pakai satu perintah rm di server (jika exec diizinkan)", value=True, key="delete_use_rm")
+    
+    pending = st.session_state.bulk_delete_pending
+    if pending is not None:
+        st.warning(f"Yakin hapus {len(pending)} entri" + (" beserta seluruh isi folder?" if recursive else "?"))
+        if st.button("✓ Ya, hapus semua", key="bulk_delete_yes", use_container_width=True):
+            batch = BulkDelete(st.session_state.sftp_pool, pending, recursive=recursive,
+                               method="auto" if use_rm else "sftp")
+            st.session_state.delete_batch = batch
+            # Konfirmasi bisa datang setelah pindah folder; yang di-refresh folder induk entri itu sendiri
+            parents = sorted({posixpath.dirname(path) for path in pending})
+            where = parents[0] if len(parents) == 1 else f"{len(parents)} folder"
+            submit_job("hapus", f"{len(pending)} entri di {where}",
+                       partial(run_bulk_delete, batch), refresh_path=parents)
+            st.session_state.bulk_delete_pending = None
+            st.rerun()
+        if st.button("✗ Tidak", key="bulk_delete_no", use_container_width=True):
+            st.session_state.bulk_delete_pending = None
+            st.rerun()
+    elif st.button(f"🗑️ Hapus {len(names)} entri", disabled=not names, use_container_width=True):
+        st.session_state.bulk_delete_pending = [by_name[name]['path'] for name in names]
+        st.rerun()
+    
+    batch = st.session_state.delete_batch
+    if batch is not None and not batch.is_running():
+        summary = batch.summary()
+        st.caption(f"Hapus terakhir ({summary['method'] or '-'}, {summary['seconds']:.1f} detik): "
+                   f"{summary['succeeded']} berhasil, {summary['skipped']} dilewati, {summary['failed']} gagal")
+        st.dataframe(batch.rows(), use_container_width=True, hide_index=True)
+
+# Tampilan tabel ringkas; pilih satu baris untuk menampilkan aksinya
+def file_rows(page_files):
+    return [{
+        'Nama': f"{file_icon(file)} {file['name']}",
+        'Tipe': entry_type(file),
+        'Ukuran (KB)': None if file['is_dir'] else round(file['size'] / 1024, 1),
+        'Diubah': file['modified']
+    } for file in page_files]
+
+def show_file_table(page_files):
+    event = st.dataframe(file_rows(page_files), use_container_width=True, hide_index=True,
+                         on_select="rerun", selection_mode="single-row", key="file_table")
+    if event.selection.rows:
+        index = event.selection.rows[0]
+        if index < len(page_files):
+            show_file_tile(page_files[index])
+
+# Daftar file untuk path saat ini dari cache listing; server hanya dihubungi
+# jika cache kosong, kedaluwarsa (TTL) atau di-invalidate oleh Refresh/upload/hapus.
+# Dengan first_page, entri sebanyak satu halaman langsung ditampilkan (urutan
+# dari server) begitu tiba, sementara sisa direktori masih dimuat.
+def get_current_listing(first_page=False):
+    path = st.session_state.current_path
+    cache = st.session_state.listing_cache
+    files = cache.get(path)
+    if files is None:
+        # Dapatkan daftar file dari server, tampilkan progres selama entri mengalir
+        progress = st.empty()
+        preview = st.empty()
+        page_size = st.session_state.get("page_size", PAGE_SIZES[0])
+        def show_progress(entries):
+            if first_page and len(entries) == page_size:
+                with preview.container():
+                    st.caption(f"{page_size} entri pertama, sisa daftar masih dimuat...")
+                    st.dataframe(file_rows(entries), use_container_width=True, hide_index=True)
+            if len(entries) % 500 == 0:
+                progress.caption(f"Memuat daftar file... {len(entries)} entri")
+        files = get_file_list(st.session_state.backend, path, on_progress=show_progress)
+        progress.empty()
+        preview.empty()
+        if isinstance(files, str):
+            return files
+        cache.put(path, files)
+    
+    # Direktori baru: filter dan halaman kembali ke awal
+    if st.session_state.listing_path != path:
+        for key in ("filter_name", "filter_types", "filter_extensions", "file_table"):
+            st.session_state.pop(key, None)
+        st.session_state.page_number = 1
+        st.session_state.listing_path = path
+    return files
+
+# Indeks pencarian untuk path saat ini; dimuat dari disk jika pernah dibuat
+def get_search_index(root):
+    root = normalize_root(root)
+    indexes = st.session_state.search_indexes
+    if root not in indexes:
+        indexes[root] = TreeIndex(st.session_state.host, root)
+    return indexes[root]
+
+# Tab Cari: pencarian rekursif di bawah path saat ini lewat indeks lokal
+def show_search():
+    index = get_search_index(st.session_state.current_path)
+    st.subheader(f"Cari di {index.root}")
+    
+    if index.is_empty():
+        st.caption("Indeks belum dibuat untuk folder ini, klik Perbarui Indeks")
     else:
-        st.info("Direktori kosong")
+        st.caption(f"Indeks: {index.entry_count()} entri di {len(index.dirs)} folder, "
+                   f"diperbarui {index.age():.0f} detik lalu ({index.method})")
+    
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        method = st.radio("Metode indeks", ["Otomatis", "SFTP"], horizontal=True, key="search_method",
+                          help="Otomatis memakai satu perintah find di server (jika tersedia) untuk "
+                               "indeks baru atau indeks ulang penuh, dan penelusuran SFTP bertahap "
+                               "untuk pembaruan biasa")
+    with col2:
+        full = st.checkbox("Indeks ulang penuh", key="search_full",
+                           help="Tanpa ini hanya folder yang berubah (mtime) yang dibaca ulang")
+    with col3:
+        refresh = st.button("Perbarui Indeks", use_container_width=True)
+    
+    # Tab dirender di setiap rerun, jadi penelusuran hanya dimulai lewat tombol
+    if refresh:
+        progress = st.empty()
+        def show_progress(scanned, pending):
+            progress.caption(f"Menelusuri folder... {scanned} selesai, {pending} antre")
+        try:
+            stats = index.refresh(st.session_state.sftp_pool, st.session_state.ssh_client,
+                                  method="auto" if method == "Otomatis" else "sftp",
+                                  full=full, on_progress=show_progress)
+        except (IOError, PoolTimeout) as e:
+            progress.empty()
+            st.error(f"Gagal membuat indeks: {e}")
+            return
+        progress.empty()
+        st.caption(f"Indeks diperbarui lewat {stats['method']} dalam {stats['seconds']:.2f} detik: "
+                   f"{stats['listed']} folder dibaca, {stats['reused']} dipakai ulang")
+        if index.errors:
+            st.warning(f"{len(index.errors)} folder tidak bisa dibaca: " + "; ".join(index.errors[:5]))
+    
+    with st.form("search_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            name_query = st.text_input("Nama", placeholder="contoh: *.log atau laporan")
+            extensions = st.text_input("Ekstensi", placeholder="contoh: .jpg, .png")
+            types = st.multiselect("Tipe", FILE_TYPES)
+        with col2:
+            min_kb = st.number_input("Ukuran minimal (KB)", min_value=0, value=0)
+            max_kb = st.number_input("Ukuran maksimal (KB, 0 = tanpa batas)", min_value=0, value=0)
+            date_range = st.date_input("Diubah antara", value=(), format="YYYY-MM-DD")
+        st.form_submit_button("Cari", use_container_width=True)
+    
+    filters = {
+        'name_query': name_query,
+        'extensions': [e if e.startswith(".") else "." + e
+                       for e in (x.strip().lower() for x in extensions.split(",")) if e],
+        'types': types,
+        'min_size': min_kb * 1024 or None,
+        'max_size': max_kb * 1024 or None,
+    }
+    if len(date_range) == 2:
+        filters['modified_after'] = datetime.datetime.combine(date_range[0], datetime.time.min).timestamp()
+        filters['modified_before'] = datetime.datetime.combine(date_range[1], datetime.time.max).timestamp()
+    if not any(filters.values()):
+        return
+    
+    results = sort_entries(index.search(**filters), "Nama")
+    page_files, _, _ = paginate(results, 1, PAGE_SIZES[-1])
+    st.caption(f"{len(results)} hasil" + (f", {len(page_files)} pertama ditampilkan"
+                                         if len(results) > len(page_files) else ""))
+    if not page_files:
+        return
+    rows = [{
+        'Path': f"{file_icon(file)} {file['path']}",
+        'Ukuran (KB)': None if file['is_dir'] else round(file['size'] / 1024, 1),
+        'Diubah': file['modified']
+    } for file in page_files]
+    event = st.dataframe(rows, use_container_width=True, hide_index=True,
+                         on_select="rerun", selection_mode="single-row", key="search_table")
+    if event.selection.rows and event.selection.rows[0] < len(page_files):
+        file = page_files[event.selection.rows[0]]
+        folder = file['path'] if file['is_dir'] else posixpath.dirname(file['path'])
+        if st.button(f"📂 Buka {folder}", key="search_open"):
+            st.session_state.current_path = folder
+            st.session_state.history.append(folder)
+            st.rerun()
+
+@st.fragment(run_every=1)
+def wait_for_thumbnails():
+    if st.session_state.thumbnails.pending_count() == 0:
+        st.rerun()
+
+# Invalidate listing yang diubah job selesai; True jika ada job baru selesai
+def collect_finished_jobs():
+    finished = {job.id for job in st.session_state.jobs.jobs() if not job.is_running()}
+    new = finished - st.session_state.jobs_finished
+    st.session_state.jobs_finished = finished
+    for job_id in new:
+        paths = st.session_state.job_paths.pop(job_id, None)
+        if paths is not None:
+            for path in [paths] if isinstance(paths, str) else paths:
+                st.session_state.listing_cache.invalidate(path)
+            st.session_state.jobs.release(job_id)
+    return bool(new)
+
+# Panel job latar: download, upload, sinkronisasi dan hapus berjalan di luar
+# thread skrip sehingga halaman tetap responsif dan job bertahan antar rerun
+def show_jobs():
+    jobs = st.session_state.jobs.jobs()
+    if not jobs:
+        return
+    if any(job.is_running() for job in jobs):
+        show_jobs_live()
+    else:
+        show_job_list(jobs)
+
+def show_job_list(jobs):
+    running = sum(1 for job in jobs if job.is_running())
+    with st.expander(f"Job Latar ({running} berjalan, {len(jobs) - running} selesai)", expanded=running > 0):
+        for job in jobs:
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                if job.total and job.kind == "hapus":
+                    text = f"{job.label}: {job.done} / {job.total} entri"
+                elif job.total:
+                    text = format_progress(job.label, job.done, job.total, job.rate())
+                else:
+                    text = job.label
+                st.caption(f"#{job.id} {job.kind} — {job.status} — {text}"
+                           + (f" ({job.elapsed():.1f} detik)" if job.started else ""))
+                if job.error:
+                    st.caption(f"⚠️ {job.error}")
+            with col2:
+                if job.is_running() and st.button("✗ Batalkan", key=f"cancel_job_{job.id}"):
+                    job.cancel()
+                    st.rerun()
+        if running < len(jobs) and st.button("Bersihkan yang selesai", key="clear_jobs"):
+            st.session_state.jobs.clear_finished()
+            st.rerun()
+
+# Progres job diperbarui tiap detik; halaman dimuat ulang setiap ada job selesai
+@st.fragment(run_every=1)
+def show_jobs_live():
+    if collect_finished_jobs():
+        st.rerun()
+    show_job_list(st.session_state.jobs.jobs())
 
 # Tab Terminal
 def show_terminal():
     st.subheader("Terminal SSH")
     
+    mode = st.radio("Target", ["Server ini", "Banyak server"], horizontal=True, key="terminal_mode")
+    if mode == "Banyak server":
+        show_fanout()
+        return
+    
     with st.form("terminal_form"):
         command = st.text_input("Masukkan perintah shell:", placeholder="contoh: ls -la")
         submitted = st.form_submit_button("Jalankan Perintah", use_container_width=True)
         
         if submitted and command:
-            with st.spinner("Menjalankan perintah..."):
-                try:
-                    stdin, stdout, stderr = st.session_state.ssh_client.exec_command(command, timeout=30)
-                    output = stdout.read().decode()
-                    error = stderr.read().decode()
-                    
-                    if output:
-                        st.code(output, language="bash")
-                    
-                    if error:
-                        st.error(error)
-                        
-                except Exception as e:
-                    st.error(f"Gagal menjalankan perintah: {e}")
+            # Perintah sebelumnya yang masih berjalan dihentikan dulu
+            previous = st.session_state.terminal_run
+            if previous is not None and previous.is_running():
+                previous.cancel()
+            st.session_state.terminal_run = CommandRun(st.session_state.ssh_client, command,
+                                                       stats=st.session_state.sftp_pool.stats).start()
+    
+    run = st.session_state.terminal_run
+    if run is not None:
+        if run.is_running():
+            show_terminal_live()
+        else:
+            show_command_output(run)
+
+# Output perintah yang sedang berjalan, diperbarui tiap setengah detik
+@st.fragment(run_every=0.5)
+def show_terminal_live():
+    run = st.session_state.terminal_run
+    if st.button("⏹ Batalkan", key="cancel_command"):
+        run.cancel()
+        run.wait(2)
+    show_command_output(run)
+    if not run.is_running():
+        st.rerun()
+
+def show_command_output(run):
+    status = f"`{run.command}` — {run.status}, {run.elapsed():.1f} detik"
+    if run.exit_code is not None:
+        status += f", exit code {run.exit_code}"
+    dropped = run.stdout.dropped + run.stderr.dropped
+    if dropped:
+        status += f" ({dropped / 1024:.0f} KB output lama tidak ditampilkan)"
+    st.caption(status)
+    
+    output = run.stdout.text()
+    error = run.stderr.text()
+    if output:
+        st.code(output, language="bash")
+    if error:
+        st.error(error)
+    if run.error:
+        st.error(f"Gagal menjalankan perintah: {run.error}")
+
+# Buka koneksi SSH baru ke satu host inventory dengan private key sesi ini
+def connect_inventory_host(key_path, profile, entry):
+    client = create_ssh_client(entry['host'], entry['user'], key_path, port=entry['port'], profile=profile)
+    if isinstance(client, str):
+        raise ConnectionError(client)
+    return client
+
+# Jalankan satu perintah di banyak server sekaligus
+def show_fanout():
+    with st.form("fanout_form"):
+        inventory = st.text_area("Daftar host", height=120,
+                                 placeholder="root@10.0.0.1\nadmin@web-2:2222\n# baris komentar diabaikan",
+                                 help="Satu host per baris dengan format [user@]host[:port]")
+        inventory_file = st.file_uploader("Atau unggah file inventory", type=["txt", "ini", "list"])
+        command = st.text_input("Perintah:", placeholder="contoh: uptime")
+        col1, col2 = st.columns(2)
+        with col1:
+            workers = st.slider("Sesi paralel", 1, 64, FANOUT_WORKERS)
+        with col2:
+            timeout = st.number_input("Batas waktu per host (detik, 0 = tanpa batas)", min_value=0, value=60)
+        submitted = st.form_submit_button("Jalankan di Semua Host", use_container_width=True)
+        
+        if submitted and command:
+            text = inventory
+            if inventory_file is not None:
+                text += "\n" + inventory_file.getvalue().decode("utf-8", errors="replace")
+            default_user = st.session_state.host.split("@", 1)[0]
+            hosts = parse_inventory(text, default_user=default_user)
+            if not hosts:
+                st.error("Daftar host kosong")
+            else:
+                previous = st.session_state.fanout_run
+                if previous is not None and previous.is_running():
+                    previous.cancel()
+                connect = partial(connect_inventory_host, st.session_state.key_path,
+                                  st.session_state.connection_profile)
+                st.session_state.fanout_run = FanoutRun(hosts, command, connect, workers=workers,
+                                                        timeout=timeout or None,
+                                                        stats=st.session_state.sftp_pool.stats).start()
+    
+    fanout = st.session_state.fanout_run
+    if fanout is not None:
+        if fanout.is_running():
+            show_fanout_live()
+        else:
+            show_fanout_result(fanout)
+
+# Status per host yang diperbarui selama perintah berjalan
+@st.fragment(run_every=1)
+def show_fanout_live():
+    fanout = st.session_state.fanout_run
+    if st.button("⏹ Batalkan Semua", key="cancel_fanout"):
+        fanout.cancel()
+        fanout.wait(2)
+    show_fanout_result(fanout)
+    if not fanout.is_running():
+        st.rerun()
+
+def show_fanout_result(fanout):
+    finished = sum(1 for host in fanout.hosts if host.end_time is not None)
+    st.caption(f"`{fanout.command}` — {finished}/{len(fanout.hosts)} host selesai, "
+               f"{fanout.elapsed():.1f} detik")
+    st.progress(finished / len(fanout.hosts))
+    st.dataframe(fanout.rows(), use_container_width=True, hide_index=True)
+    
+    # Host dengan hasil identik digabung agar mudah dibandingkan
+    groups = fanout.groups()
+    for group in groups:
+        label = f"{len(group['hosts'])} host — {group['status']}"
+        if group['exit_code'] is not None:
+            label += f", exit code {group['exit_code']}"
+        with st.expander(label, expanded=len(groups) <= 3):
+            st.caption(", ".join(group['hosts']))
+            if group['stdout']:
+                st.code(group['stdout'], language="bash")
+            if group['stderr']:
+                st.error(group['stderr'])
+            if group['error']:
+                st.error(group['error'])
+    
+    # Output host yang masih berjalan ditampilkan langsung
+    for host in fanout.hosts:
+        if host.status == "berjalan" and host.stdout():
+            with st.expander(f"{host.label} (berjalan)"):
+                st.code(host.stdout()[-4000:], language="bash")
 
 # Tab Disconnect
 def show_disconnect():
@@ -424,15 +1346,44 @@ def show_disconnect():
     
     if st.button("Putuskan Koneksi", use_container_width=True):
         try:
+            if st.session_state.terminal_run is not None:
+                st.session_state.terminal_run.cancel()
+            if st.session_state.fanout_run is not None:
+                st.session_state.fanout_run.cancel()
+            if st.session_state.archive_job is not None:
+                st.session_state.archive_job['progress'].cancel()
+            stop_preview_follow()
+            st.session_state.jobs.shutdown()
+            st.session_state.thumbnails.close()
+            st.session_state.backend.close()
+            st.session_state.sftp_pool.close()
             st.session_state.ssh_client.close()
         except:
             pass
         
         # Reset session state
         st.session_state.ssh_client = None
+        st.session_state.sftp_pool = None
+        st.session_state.thumbnails = None
+        st.session_state.backend = None
         st.session_state.current_path = "/home"
         st.session_state.history = []
         st.session_state.delete_confirmation = {}
+        st.session_state.listing_cache = ListingCache()
+        st.session_state.listing_path = None
+        st.session_state.terminal_run = None
+        st.session_state.fanout_run = None
+        st.session_state.key_path = None
+        st.session_state.search_indexes = {}
+        st.session_state.archive_job = None
+        st.session_state.jobs = None
+        st.session_state.job_paths = {}
+        st.session_state.jobs_finished = set()
+        st.session_state.preview = None
+        st.session_state.preview_follow = None
+        st.session_state.rename_target = None
+        st.session_state.bulk_delete_pending = None
+        st.session_state.delete_batch = None
         
         st.success("Berhasil memutuskan koneksi dari server!")
         st.rerun()
@@ -2,25 +2,120 @@ import streamlit as st
 import paramiko
 import os
 import tempfile
+import time
+from functools import partial
+from sshfm.metrics import OpStats, prometheus_text
+from sshfm.sftp_pool import SFTPPool
+from sshfm.profiles import DEFAULT_PROFILE, PROFILES, connect_options, sftp_options
+from sshfm.transfer import ProgressMeter, format_progress
+from sshfm.sync import COMPARE_MODES, plan_sync, scan_local_dir, sources_from_uploads
+from sshfm.terminal import CommandRun
+from sshfm.backends import DEFAULT_BACKEND, available_backends, open_backend
 
 st.set_page_config(layout="wide")
 st.title("Remote Server Manager - Secure SSH")
 
 # Fungsi untuk koneksi SSH menggunakan Private Key
-def create_ssh_client(host, user, key_path):
+def create_ssh_client(host, user, key_path, profile=DEFAULT_PROFILE):
     try:
         ssh = paramiko.SSHClient()
         ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=host, username=user, key_filename=os.path.expanduser(key_path))
+        ssh.connect(hostname=host, username=user, key_filename=os.path.expanduser(key_path),
+                    **connect_options(profile))
         return ssh
     except Exception as e:
         return str(e)
 
+# Tampilkan output perintah (stdout dan stderr) yang sudah diterima
+def show_command_output(run):
+    status = f"{run.status}, {run.elapsed():.1f} detik"
+    if run.exit_code is not None:
+        status += f", exit code {run.exit_code}"
+    st.caption(status)
+    output = run.stdout.text()
+    error = run.stderr.text()
+    if output:
+        st.text_area("Output:", value=output, height=200)
+    if error:
+        st.error(f"Error: {error}")
+    if run.error:
+        st.error(f"Gagal menjalankan perintah: {run.error}")
+
+# Output perintah yang sedang berjalan, diperbarui tiap setengah detik
+@st.fragment(run_every=0.5)
+def show_command_live():
+    run = st.session_state.command_run
+    if st.button("Batalkan"):
+        run.cancel()
+        run.wait(2)
+    show_command_output(run)
+    if not run.is_running():
+        st.rerun()
+
+# Upload folder dengan delta sync: hanya file baru/berubah yang dikirim
+def show_folder_sync(ssh_client, sftp_pool):
+    source = st.radio("Sumber", ["Folder dari browser", "Folder di mesin aplikasi"], horizontal=True)
+    if source == "Folder dari browser":
+        uploaded_files = st.file_uploader("Pilih folder", accept_multiple_files="directory")
+        strip_top = st.checkbox("Isi folder langsung ke tujuan (tanpa nama folder teratas)", value=True)
+        sources = sources_from_uploads(uploaded_files, strip_top) if uploaded_files else None
+        # Browser tidak mengirim waktu ubah file
+        modes = ["checksum", "size"]
+    else:
+        local_dir = os.path.expanduser(st.text_input("Path folder lokal", placeholder="contoh: ./deploy/config"))
+        sources = scan_local_dir(local_dir) if os.path.isdir(local_dir) else None
+        modes = ["mtime", "checksum", "size"]
+    remote_path = st.text_input("Folder tujuan di server", value="/home/admin/config/")
+    compare = st.selectbox("Bandingkan dengan", modes, format_func=COMPARE_MODES.get)
+    
+    col1, col2 = st.columns(2)
+    dry_run = col1.button("Lihat Perbedaan", disabled=not sources)
+    apply = col2.button("Sinkronkan", disabled=not sources)
+    if not (dry_run or apply):
+        return
+    try:
+        plan = plan_sync(sftp_pool, sources, remote_path, compare=compare, ssh_client=ssh_client)
+    except IOError as e:
+        st.error(f"Gagal membandingkan: {e}")
+        return
+    counts = plan.counts()
+    st.caption(f"{counts['baru']} baru, {counts['berubah']} berubah, {counts['sama']} sama, "
+               f"{counts['konflik']} konflik — {counts['upload_bytes'] / 1024:.1f} KB perlu diunggah")
+    if dry_run:
+        rows = plan.rows()
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+        else:
+            st.success("Semua file sudah sama dengan server")
+        return
+    
+    if not plan.changed():
+        st.success("Semua file sudah sama dengan server, tidak ada yang diunggah")
+        return
+    batch = plan.start(sftp_pool, workers=sftp_pool.max_channels)
+    bar = st.progress(0.0, text="Mengunggah...")
+    while not batch.wait(0.25):
+        bar.progress(min(batch.done_bytes() / batch.total, 1.0) if batch.total else 1.0,
+                     text=format_progress("Mengunggah", batch.done_bytes(), batch.total, batch.rate()))
+    bar.progress(1.0, text=format_progress("Mengunggah", batch.done_bytes(), batch.total, batch.rate()))
+    summary = batch.summary()
+    if summary['failed']:
+        st.error(f"{summary['failed']} dari {summary['files']} file gagal diunggah")
+        st.dataframe([row for row in batch.rows() if row['error']], use_container_width=True, hide_index=True)
+    else:
+        st.success(f"{summary['files']} file diunggah, {counts['sama']} dilewati ({summary['seconds']:.1f} detik)")
+
 # Inisialisasi session state
 if 'ssh_client' not in st.session_state:
     st.session_state.ssh_client = None
+if 'sftp_pool' not in st.session_state:
+    st.session_state.sftp_pool = None
+if 'backend' not in st.session_state:
+    st.session_state.backend = None
 if 'file_list' not in st.session_state:
     st.session_state.file_list = []
+if 'command_run' not in st.session_state:
+    st.session_state.command_run = None
 
 # Form koneksi SSH
 if st.session_state.ssh_client is None:
@@ -28,38 +123,58 @@ if st.session_state.ssh_client is None:
     server_ip = st.text_input("Host", value="10.201.0.0")
     username = st.text_input("Username", value="root")
     private_key_path = st.text_input("Private Key Path", value="~/.ssh/id_rsa")
+    profile = st.selectbox("Profil Koneksi", list(PROFILES),
+                           format_func=lambda name: f"{name} — {PROFILES[name]['description']}")
+    backends = available_backends()
+    backend_name = st.selectbox("Backend SFTP", backends,
+                                index=backends.index(DEFAULT_BACKEND) if DEFAULT_BACKEND in backends else 0)
     
     if st.button("Connect to Server"):
-        client = create_ssh_client(server_ip, username, private_key_path)
+        stats = OpStats(host=server_ip)
+        start = time.perf_counter()
+        client = create_ssh_client(server_ip, username, private_key_path, profile)
+        stats.record("connect", time.perf_counter() - start, isinstance(client, str))
         if isinstance(client, str):
             st.error(f"Koneksi gagal: {client}")
         else:
-            st.session_state.ssh_client = client
-            st.success("Berhasil terhubung ke server!")
+            sftp_pool = SFTPPool(client, stats=stats, **sftp_options(profile))
+            try:
+                # Operasi file (list, upload, download, hapus) lewat backend yang dipilih
+                st.session_state.backend = open_backend(backend_name, server_ip, username, key_path=private_key_path,
+                                                        profile=profile, sftp_pool=sftp_pool)
+                st.session_state.ssh_client = client
+                st.session_state.sftp_pool = sftp_pool
+                st.success("Berhasil terhubung ke server!")
+            except Exception as e:
+                sftp_pool.close()
+                client.close()
+                st.error(f"Koneksi backend {backend_name} gagal: {e}")
         st.rerun()
 
 # Jika terkoneksi, tampilkan fitur utama
 if st.session_state.ssh_client and not isinstance(st.session_state.ssh_client, str):
     ssh_client = st.session_state.ssh_client
+    sftp_pool = st.session_state.sftp_pool
+    backend = st.session_state.backend
     st.success("Connected to Remote Server")
 
-    option = st.radio("Pilih aksi:", ["Jalankan Perintah", "Upload File", "Download / Hapus File", "Disconnect"])
+    option = st.radio("Pilih aksi:", ["Jalankan Perintah", "Upload File", "Sinkronkan Folder", "Download / Hapus File", "Disconnect"])
 
     if option == "Jalankan Perintah":
         st.subheader("Eksekusi Perintah di Server")
         command = st.text_input("Masukkan perintah:", value="df -h")
         if st.button("Jalankan"):
-            with st.spinner("Menjalankan perintah..."):
-                try:
-                    stdin, stdout, stderr = ssh_client.exec_command(command)
-                    output = stdout.read().decode()
-                    error = stderr.read().decode()
-                    if output:
-                        st.text_area("Output:", value=output, height=200)
-                    if error:
-                        st.error(f"Error: {error}")
-                except Exception as e:
-                    st.error(f"Gagal menjalankan perintah: {e}")
+            previous = st.session_state.command_run
+            if previous is not None and previous.is_running():
+                previous.cancel()
+            st.session_state.command_run = CommandRun(ssh_client, command, stats=backend.stats).start()
+        
+        run = st.session_state.command_run
+        if run is not None:
+            if run.is_running():
+                show_command_live()
+            else:
+                show_command_output(run)
 
     elif option == "Upload File":
         st.subheader("Upload File ke Server")
@@ -67,19 +182,20 @@ if st.session_state.ssh_client and not isinstance(st.session_state.ssh_client, s
         remote_path = st.text_input("Path tujuan di server", value="/home/admin/config/")
         
         if st.button("Upload File") and uploaded_file:
-            with st.spinner("Mengunggah file..."):
-                try:
-                    sftp = ssh_client.open_sftp()
-                    temp_path = os.path.join(tempfile.gettempdir(), uploaded_file.name)
-                    with open(temp_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-                    
-                    sftp.put(temp_path, os.path.join(remote_path, uploaded_file.name))
-                    sftp.close()
-                    os.remove(temp_path)
-                    st.success(f"File {uploaded_file.name} berhasil diunggah ke {remote_path}")
-                except Exception as e:
-                    st.error(f"Gagal mengunggah file: {e}")
+            bar = st.progress(0.0, text="Mengunggah...")
+            meter = ProgressMeter(uploaded_file.size, lambda done, total, rate: bar.progress(
+                min(done / total, 1.0) if total else 1.0, text=format_progress("Mengunggah", done, total, rate)))
+            try:
+                # Upload langsung dari buffer memori, tanpa file sementara
+                backend.write(os.path.join(remote_path, uploaded_file.name), uploaded_file.getbuffer(),
+                              on_progress=meter.update)
+                st.success(f"File {uploaded_file.name} berhasil diunggah ke {remote_path} ({meter.rate():.2f} MB/s)")
+            except Exception as e:
+                st.error(f"Gagal mengunggah file: {e}")
+
+    elif option == "Sinkronkan Folder":
+        st.subheader("Sinkronkan Folder ke Server")
+        show_folder_sync(ssh_client, sftp_pool)
 
     elif option == "Download / Hapus File":
         st.subheader("Download atau Hapus File dari Server")
@@ -87,9 +203,7 @@ if st.session_state.ssh_client and not isinstance(st.session_state.ssh_client, s
         
         if st.button("List Files"):
             try:
-                sftp = ssh_client.open_sftp()
-                st.session_state.file_list = sftp.listdir(remote_folder_path)
-                sftp.close()
+                st.session_state.file_list = sorted(entry['name'] for entry in backend.listdir(remote_folder_path))
                 st.success("Daftar file berhasil dimuat")
             except Exception as e:
                 st.error(f"Gagal mengakses folder: {e}")
@@ -103,11 +217,10 @@ if st.session_state.ssh_client and not isinstance(st.session_state.ssh_client, s
                 if st.button("Download File"):
                     with st.spinner("Mengunduh file..."):
                         try:
-                            sftp = ssh_client.open_sftp()
                             remote_file_path = os.path.join(remote_folder_path, selected_file)
                             local_path = os.path.join(tempfile.gettempdir(), selected_file)
-                            sftp.get(remote_file_path, local_path)
-                            sftp.close()
+                            with open(local_path, "wb") as f:
+                                backend.download(remote_file_path, f)
                             
                             with open(local_path, "rb") as f:
                                 st.download_button("Download", f, file_name=selected_file)
@@ -119,18 +232,34 @@ if st.session_state.ssh_client and not isinstance(st.session_state.ssh_client, s
                 if st.button("Hapus File"):
                     with st.spinner("Menghapus file..."):
                         try:
-                            sftp = ssh_client.open_sftp()
-                            sftp.remove(os.path.join(remote_folder_path, selected_file))
-                            sftp.close()
+                            backend.remove(os.path.join(remote_folder_path, selected_file))
                             st.success(f"File {selected_file} berhasil dihapus")
                         except Exception as e:
                             st.error(f"Gagal menghapus file: {e}")
     
     elif option == "Disconnect":
+        if st.session_state.command_run is not None:
+            st.session_state.command_run.cancel()
+            st.session_state.command_run = None
+        backend.close()
+        sftp_pool.close()
         ssh_client.close()
         st.session_state.ssh_client = None
+        st.session_state.sftp_pool = None
+        st.session_state.backend = None
         st.session_state.file_list = []
         st.success("Disconnected from server")
         st.rerun()
+
+    # Metrik latensi per operasi SFTP
+    with st.expander("Metrik SFTP", expanded=False):
+        st.caption(f"Backend: {backend.name}")
+        rows = backend.stats.snapshot()
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+            st.download_button("Ekspor Prometheus", partial(prometheus_text, [backend.stats]),
+                               file_name="sshfm_metrics.prom", mime="text/plain")
+        else:
+            st.caption("Belum ada operasi tercatat")
 else:
     st.warning("Silakan hubungkan ke server terlebih dahulu.")
@@ -1,9 +1,16 @@
 import streamlit as st
 import paramiko
-import json
-import os
-import bcrypt
-import tempfile
+import time
+from functools import partial
+from sshfm.ssh_pool import SSHConnectionPool
+from sshfm.transfer import ProgressMeter, format_progress
+from sshfm.backends import DEFAULT_BACKEND, AsyncSSHBackend, ParamikoBackend
+from sshfm.users import UserStore, migrate_json
+from sshfm.auth import AuthBusy, Authenticator, Throttled
+from sshfm.content_cache import ContentCache
+from sshfm.metrics import OpStats, prometheus_text, start_metrics_server
+from sshfm.sync import COMPARE_MODES, plan_sync, sources_from_uploads
+from sshfm.stream_server import StreamServer, file_stream
 
 # Konfigurasi server
 SERVER_IP = "10.201.1.229" # try try try
@@ -11,101 +18,169 @@ USERNAME = "root"
 PASSWORD = "123"
 BASE_REMOTE_DIR = "/home/user/uploads"
 USER_FILE = "users.json"
+USER_DB = "users.db"
 
 # Fungsi untuk koneksi SSH
-def create_ssh_client():
+def create_ssh_client(host=SERVER_IP, user=USERNAME):
     ssh = paramiko.SSHClient()
     ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh.connect(SERVER_IP, username=USERNAME, password=PASSWORD)
+    ssh.connect(host, username=user, password=PASSWORD)
     return ssh
 
-# Fungsi register user
+# Metrik operasi SSH/SFTP bersama semua sesi (connect, upload, list, dll.)
+@st.cache_resource
+def get_op_stats():
+    return OpStats(host=SERVER_IP)
+
+# Server /metrics (Prometheus); None jika SSHFM_METRICS_PORT kosong
+@st.cache_resource
+def get_metrics_server():
+    return start_metrics_server()
+
+# Pool koneksi SSH bersama untuk semua sesi Streamlit di proses ini
+@st.cache_resource
+def get_ssh_pool():
+    return SSHConnectionPool(create_ssh_client, max_size=8, idle_timeout=300, keepalive=30,
+                             stats=get_op_stats())
+
+# Backend asyncssh: satu koneksi bersama dengan banyak permintaan SFTP sekaligus
+@st.cache_resource
+def get_async_backend():
+    return AsyncSSHBackend.connect(SERVER_IP, USERNAME, password=PASSWORD, stats=get_op_stats())
+
+# Fungsi run(fn, op) yang menjalankan operasi file lewat backend SFTP
+# (SSHFM_BACKEND=asyncssh atau paramiko dengan koneksi dari pool). Pool dan
+# backend diambil di sini, jadi run() aman dipanggil dari thread lain.
+# Operasi SFTP di dalamnya dicatat backend; pool mencatat seluruh pemakaian
+# koneksi sebagai "sesi:<op>". Backend paramiko memakai SFTPPool milik
+# koneksi pool, jadi channel SFTP tidak dibuka ulang tiap operasi.
+def backend_runner():
+    if DEFAULT_BACKEND == "asyncssh":
+        backend = get_async_backend()
+        return lambda fn, op: fn(backend)
+    ssh_pool = get_ssh_pool()
+    return lambda fn, op: ssh_pool.run_sftp(SERVER_IP, USERNAME, lambda pool: fn(ParamikoBackend(pool)),
+                                            op=f"sesi:{op}")
+
+def run_backend(fn, op):
+    return backend_runner()(fn, op)
+
+# Cache isi file hasil unduhan, divalidasi dengan (size, mtime) remote
+@st.cache_resource
+def get_content_cache():
+    return ContentCache()
+
+# Penyimpanan user (SQLite WAL) bersama semua sesi; users.json lama diimpor sekali
+@st.cache_resource
+def get_user_store():
+    store = UserStore(USER_DB)
+    migrate_json(store, USER_FILE)
+    return store
+
+# bcrypt berjalan di pool proses terbatas, dengan batas percobaan per user dan per IP
+@st.cache_resource
+def get_authenticator():
+    return Authenticator(get_user_store())
+
+# Fungsi register user; False jika username sudah ada.
+# Throttled/AuthBusy muncul jika terlalu banyak percobaan atau server sibuk.
 def register_user(username, password):
-    users = load_users()
-    if username in users:
-        return False  # Username sudah ada
-    hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-    users[username] = hashed_password
-    with open(USER_FILE, "w") as f:
-        json.dump(users, f, indent=4)
-    return True
+    return get_authenticator().register(username, password, st.context.ip_address)
 
 # Fungsi login user
 def login_user(username, password):
-    users = load_users()
-    if username in users and bcrypt.checkpw(password.encode(), users[username].encode()):
-        return True
-    return False
-
-# Load daftar user dari file JSON
-def load_users():
-    if not os.path.exists(USER_FILE):
-        return {}
-    with open(USER_FILE, "r") as f:
-        return json.load(f)
+    return get_authenticator().login(username, password, st.context.ip_address)
 
 # Fungsi upload file
-def upload_file(uploaded_file, user):
+def upload_file(uploaded_file, user, on_progress=None):
     remote_dir = f"{BASE_REMOTE_DIR}/{user}"
-    ssh = create_ssh_client()
-    sftp = ssh.open_sftp()
-    try:
-        sftp.mkdir(remote_dir)
-    except:
-        pass
     remote_path = f"{remote_dir}/{uploaded_file.name}"
-    
-    if uploaded_file.name in sftp.listdir(remote_dir):
-        sftp.close()
-        ssh.close()
-        return f"File '{uploaded_file.name}' sudah ada di server."
-    
-    temp_dir = tempfile.gettempdir()
-    local_path = os.path.join(temp_dir, uploaded_file.name)
-    
-    with open(local_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-    
-    sftp.put(local_path, remote_path)
-    os.remove(local_path)
-    
-    sftp.close()
-    ssh.close()
-    return f"File '{uploaded_file.name}' berhasil diunggah ke server."
+
+    def upload(backend):
+        try:
+            backend.mkdir(remote_dir)
+        except:
+            pass
+
+        # Cukup stat satu path, tidak perlu listing seluruh folder
+        try:
+            backend.stat(remote_path)
+            return f"File '{uploaded_file.name}' sudah ada di server."
+        except IOError:
+            pass
+
+        # Upload langsung dari buffer memori, tanpa file sementara
+        backend.write(remote_path, uploaded_file.getbuffer(), on_progress=on_progress)
+        return f"File '{uploaded_file.name}' berhasil diunggah ke server."
+
+    return run_backend(upload, "upload")
+
+# Sinkronkan folder ke folder user: bandingkan dulu, lalu (jika apply) unggah
+# file baru/berubah secara paralel. Hasilnya (rencana, batch upload atau None).
+def sync_folder(sources, user, compare, apply=False):
+    remote_dir = f"{BASE_REMOTE_DIR}/{user}"
+
+    def sync(pool):
+        plan = plan_sync(pool, sources, remote_dir, compare=compare, ssh_client=pool.ssh_client)
+        batch = None
+        if apply and plan.changed():
+            batch = plan.start(pool)
+            batch.wait()
+        return plan, batch
+
+    return get_ssh_pool().run_sftp(SERVER_IP, USERNAME, sync, op="sync")
 
 # Fungsi list file
 def list_files(user):
     remote_dir = f"{BASE_REMOTE_DIR}/{user}"
-    ssh = create_ssh_client()
-    sftp = ssh.open_sftp()
-    try:
-        files = sftp.listdir(remote_dir)
-    except:
-        files = []
-    sftp.close()
-    ssh.close()
-    return files
-
-# Fungsi download file
-def download_file(user, filename):
+
+    def listdir(backend):
+        try:
+            return [entry['name'] for entry in backend.listdir(remote_dir)]
+        except IOError:
+            return []
+
+    return run_backend(listdir, "listdir")
+
+# Fungsi download file, memakai cache lokal jika file remote tidak berubah
+def download_file(run, cache, user, filename):
     remote_path = f"{BASE_REMOTE_DIR}/{user}/{filename}"
-    temp_dir = tempfile.gettempdir()
-    local_path = os.path.join(temp_dir, filename)
-    ssh = create_ssh_client()
-    sftp = ssh.open_sftp()
-    sftp.get(remote_path, local_path)
-    sftp.close()
-    ssh.close()
-    return local_path
+    return run(lambda backend: cache.fetch(backend, SERVER_IP, remote_path), "download")
+
+# Server HTTP lokal untuk mengalirkan file unduhan, dipakai bersama semua sesi
+@st.cache_resource
+def get_stream_server():
+    return StreamServer()
+
+# Isi file untuk st.download_button, dipanggil saat tombol diklik (di thread
+# lain, jadi run dan cache diambil dulu di thread skrip). Streamlit menampung
+# isinya utuh di memori, jadi file besar sebaiknya lewat link stream.
+def read_download(run, cache, user, filename):
+    with open(download_file(run, cache, user, filename), "rb") as f:
+        return f.read()
+
+# Dipanggil server stream saat link stream dibuka (di thread server HTTP):
+# file diambil ke cache lokal jika berubah lalu dialirkan per potongan,
+# tidak pernah utuh di memori
+def open_download(run, cache, user, filename):
+    return file_stream(download_file(run, cache, user, filename))
+
+# Link stream sekali pakai untuk file besar, dibuat hanya saat diminta.
+# Link ditandai terpakai begitu dibuka agar tombolnya tidak tersisa.
+def create_stream_link(user, filename):
+    server = get_stream_server()
+    link = {'file': filename, 'used': False, 'expires': time.monotonic() + server.link_ttl}
+    opener = partial(open_download, backend_runner(), get_content_cache(), user, filename)
+    def open_once():
+        link['used'] = True
+        return opener()
+    link['url'] = server.register(filename, "application/octet-stream", open_once)
+    return link
 
 # Fungsi hapus file
 def delete_file(user, filename):
     remote_path = f"{BASE_REMOTE_DIR}/{user}/{filename}"
-    ssh = create_ssh_client()
-    sftp = ssh.open_sftp()
-    sftp.remove(remote_path)
-    sftp.close()
-    ssh.close()
+    run_backend(lambda backend: backend.remove(remote_path), "remove")
     return f"File '{filename}' berhasil dihapus."
 
 # UI Streamlit
@@ -118,6 +193,8 @@ if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
 if "files" not in st.session_state:
     st.session_state.files = []
+if "stream_link" not in st.session_state:
+    st.session_state.stream_link = None
 
 if not st.session_state.logged_in:
     col_login = st.columns([1]) 
@@ -129,41 +206,83 @@ if not st.session_state.logged_in:
             new_user = st.text_input("Username")
             new_pass = st.text_input("Password", type="password")
             if st.button("Daftar"):
-                if register_user(new_user, new_pass):
-                    st.success("Registrasi berhasil! Silakan login.")
-                else:
-                    st.error("Username sudah terdaftar.")
+                try:
+                    if register_user(new_user, new_pass):
+                        st.success("Registrasi berhasil! Silakan login.")
+                    else:
+                        st.error("Username sudah terdaftar.")
+                except (Throttled, AuthBusy) as e:
+                    st.error(str(e))
         else:
             st.subheader("Login")
             user = st.text_input("Username")
             password = st.text_input("Password", type="password")
             if st.button("Masuk"):
-                if login_user(user, password):
+                try:
+                    logged_in = login_user(user, password)
+                except (Throttled, AuthBusy) as e:
+                    st.error(str(e))
+                    logged_in = None
+                if logged_in:
                     st.session_state.logged_in = True
                     st.session_state.username = user
                     st.session_state.page = "file_manager"
                     st.session_state.files = list_files(user)
                     st.rerun()
-                else:
+                elif logged_in is not None:
                     st.error("Username atau password salah.")
 else:
     st.subheader("File Manager")
     uploaded_file = st.file_uploader("Upload File ke Server")
     if uploaded_file is not None:
-        message = upload_file(uploaded_file, st.session_state.username)
+        bar = st.progress(0.0, text="Mengunggah...")
+        meter = ProgressMeter(uploaded_file.size, lambda done, total, rate: bar.progress(
+            min(done / total, 1.0) if total else 1.0, text=format_progress("Mengunggah", done, total, rate)))
+        message = upload_file(uploaded_file, st.session_state.username, on_progress=meter.update)
         st.session_state.files = list_files(st.session_state.username)
         st.success(message)
         st.rerun()
     
+    with st.expander("Sinkronkan Folder"):
+        folder_files = st.file_uploader("Pilih folder", accept_multiple_files="directory", key="sync_files")
+        compare = st.selectbox("Bandingkan dengan", ["checksum", "size"], format_func=COMPARE_MODES.get)
+        col1, col2 = st.columns(2)
+        dry_run = col1.button("Lihat Perbedaan", disabled=not folder_files)
+        apply = col2.button("Sinkronkan", disabled=not folder_files)
+        if dry_run or apply:
+            sources = sources_from_uploads(folder_files, strip_top=True)
+            try:
+                with st.spinner("Membandingkan dengan server..."):
+                    plan, batch = sync_folder(sources, st.session_state.username, compare, apply=apply)
+                counts = plan.counts()
+                st.caption(f"{counts['baru']} baru, {counts['berubah']} berubah, {counts['sama']} sama, "
+                           f"{counts['konflik']} konflik — {counts['upload_bytes'] / 1024:.1f} KB perlu diunggah")
+                if dry_run:
+                    st.dataframe(plan.rows(), use_container_width=True, hide_index=True)
+                elif batch is None:
+                    st.success("Semua file sudah sama dengan server")
+                else:
+                    summary = batch.summary()
+                    st.session_state.files = list_files(st.session_state.username)
+                    if summary['failed']:
+                        st.error(f"{summary['failed']} dari {summary['files']} file gagal diunggah")
+                    else:
+                        st.success(f"{summary['files']} file diunggah, {counts['sama']} dilewati "
+                                   f"({summary['seconds']:.1f} detik)")
+            except IOError as e:
+                st.error(f"Gagal sinkronisasi: {e}")
+    
     st.subheader("Daftar File di Server")
     files = st.session_state.files
     if files:
         selected_file = st.selectbox("Pilih file:", files)
         col1, col2, spacer, col3 = st.columns([1, 1, 5, 1])
         with col1:
-            file_path = download_file(st.session_state.username, selected_file)
-            with open(file_path, "rb") as f:
-                st.download_button("Download", f, file_name=selected_file, use_container_width=True)
+            # File baru diunduh saat tombol diklik, bukan di setiap rerun
+            st.download_button("Download", partial(read_download, backend_runner(), get_content_cache(),
+                                                   st.session_state.username, selected_file),
+                               file_name=selected_file, mime="application/octet-stream",
+                               use_container_width=True)
         with col2:
             if st.button("Hapus", use_container_width=True):
                 st.success(delete_file(st.session_state.username, selected_file))
@@ -174,3 +293,30 @@ else:
                 st.session_state.logged_in = False
                 st.session_state.page = "login"
                 st.rerun()
+        
+        link = st.session_state.stream_link
+        if link is not None and (link['used'] or link['file'] != selected_file
+                                 or time.monotonic() > link['expires']):
+            link = st.session_state.stream_link = None
+        if link is None:
+            if st.button("Buat link stream (file besar)"):
+                st.session_state.stream_link = create_stream_link(st.session_state.username, selected_file)
+                st.rerun()
+        else:
+            st.link_button(f"⬇️ Stream {selected_file}", link['url'])
+            st.caption("Link sekali pakai, berlaku 10 menit. Browser harus bisa menjangkau server stream "
+                       "(atur SSHFM_STREAM_HOST/SSHFM_STREAM_URL jika browser di mesin lain).")
+    
+    # Latensi, byte dan error per operasi untuk semua sesi
+    with st.expander("Diagnostik"):
+        stats = get_op_stats()
+        rows = stats.snapshot()
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+        else:
+            st.caption("Belum ada operasi tercatat")
+        metrics_server = get_metrics_server()
+        if metrics_server is not None:
+            st.caption(f"Endpoint Prometheus: {metrics_server.url}")
+        st.download_button("Ekspor Prometheus", partial(prometheus_text, [stats]),
+                           file_name="sshfm_metrics.prom", mime="text/plain")
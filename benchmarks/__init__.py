@@ -0,0 +1 @@
+# Benchmark SSH File Manager terhadap server SSH/SFTP lokal (lihat standin.py)
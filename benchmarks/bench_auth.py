@@ -0,0 +1,92 @@
+import argparse
+import statistics
+import threading
+import time
+
+import bcrypt
+
+from sshfm.auth import AuthBusy, PasswordHasher
+
+# Latensi "UI" (pekerjaan Python kecil seperti satu rerun Streamlit) selama
+# banyak login bersamaan: bcrypt langsung di thread sesi (cara lama app.py)
+# dibandingkan pool proses terbatas dengan antrean dan prioritas rendah.
+# Jalankan dari root repo: python -m benchmarks.bench_auth
+
+
+def ui_work():
+    rows = [{'name': f"file{i:05d}.log", 'size': (i * 7919) % 100000} for i in range(2000)]
+    rows.sort(key=lambda row: row['size'])
+    return rows
+
+
+def probe(stop, samples, interval=0.05):
+    while not stop.is_set():
+        start = time.perf_counter()
+        ui_work()
+        samples.append(time.perf_counter() - start)
+        time.sleep(interval)
+
+
+def run_mode(name, verify, clients, seconds):
+    stop = threading.Event()
+    samples = []
+    counts = {'ok': 0, 'busy': 0}
+    lock = threading.Lock()
+
+    def client():
+        while not stop.is_set():
+            try:
+                verify()
+                key = 'ok'
+            except AuthBusy:
+                key = 'busy'
+                time.sleep(0.05)
+            with lock:
+                counts[key] += 1
+
+    threads = [threading.Thread(target=probe, args=(stop, samples))]
+    threads += [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    samples.sort()
+    return (name, counts['ok'] / seconds, counts['busy'], statistics.median(samples) * 1000,
+            samples[int(len(samples) * 0.95)] * 1000, samples[-1] * 1000)
+
+
+def run(clients, seconds, rounds, workers):
+    hashed = bcrypt.hashpw(b"rahasia", bcrypt.gensalt(rounds))
+    hasher = PasswordHasher(workers=workers, rounds=rounds, queue_timeout=0.5)
+    try:
+        # Panaskan proses worker agar waktu start tidak ikut terukur
+        hasher.verify("rahasia", hashed.decode())
+        results = [
+            run_mode("tanpa beban", lambda: time.sleep(0.1), 0, seconds),
+            run_mode("inline", lambda: bcrypt.checkpw(b"rahasia", hashed), clients, seconds),
+            run_mode("pool", lambda: hasher.verify("rahasia", hashed.decode()), clients, seconds),
+        ]
+    finally:
+        hasher.close()
+
+    print(f"{clients} klien login bersamaan, bcrypt cost {rounds}, pool {workers} proses, {seconds} s per mode")
+    print(f"{'mode':<12}{'login/s':>9}{'ditolak':>9}{'UI p50 (ms)':>13}{'UI p95 (ms)':>13}{'UI maks (ms)':>14}")
+    for name, rate, busy, p50, p95, worst in results:
+        print(f"{name:<12}{rate:>9.1f}{busy:>9}{p50:>13.1f}{p95:>13.1f}{worst:>14.1f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    run(args.clients, args.seconds, args.rounds, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.standin import StandinServer
+from sshfm.backends import AsyncSSHBackend, ParamikoBackend, available_backends
+
+# Ribuan stat/read bersamaan lewat backend paramiko (thread per channel SFTP)
+# dibandingkan backend asyncssh (banyak permintaan di satu channel, satu event loop).
+# Jalankan dari root repo: python -m benchmarks.bench_backends
+
+
+def run(ops, size, latency, channels, concurrency):
+    root = tempfile.mkdtemp(prefix="bench_backends_")
+    try:
+        files = 100
+        for i in range(files):
+            with open(os.path.join(root, f"f{i:03d}.bin"), "wb") as f:
+                f.write(os.urandom(size))
+        paths = [(os.path.join(root, f"f{i % files:03d}.bin"),) for i in range(ops)]
+
+        results = []
+        with StandinServer(latency=latency) as server:
+            for name in available_backends():
+                if name == "paramiko":
+                    backend = ParamikoBackend.connect(server.host, "bench", password="bench",
+                                                      port=server.port, max_channels=channels)
+                else:
+                    backend = AsyncSSHBackend.connect(server.host, "bench", password="bench", port=server.port)
+                for op in ("stat", "read"):
+                    start = time.perf_counter()
+                    out = backend.map(op, paths, concurrency=concurrency)
+                    seconds = time.perf_counter() - start
+                    errors = sum(1 for _, error in out if error)
+                    results.append((name, op, seconds, errors))
+                backend.close()
+        if "asyncssh" not in available_backends():
+            print("asyncssh tidak terpasang, hanya backend paramiko yang diukur (pip install asyncssh)")
+
+        print(f"{ops} operasi bersamaan, file {size / 1024:.0f} KB, RTT {latency * 1000:.0f} ms, "
+              f"paramiko {channels} channel")
+        print(f"{'backend':<10}{'operasi':<8}{'total (s)':>10}{'op/s':>9}{'error':>7}")
+        for name, op, seconds, errors in results:
+            print(f"{name:<10}{op:<8}{seconds:>10.2f}{ops / seconds:>9.0f}{errors:>7}")
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=4 * 1024, help="ukuran file yang dibaca (byte)")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--channels", type=int, default=6, help="channel SFTP untuk backend paramiko")
+    parser.add_argument("--concurrency", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.ops, args.size, args.latency, args.channels, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import os
+import posixpath
+import shutil
+import tempfile
+import time
+
+from benchmarks import trees
+from benchmarks.standin import StandinServer
+from sshfm.remote_copy import CopyItem, RemoteCopy
+from sshfm.search import walk_tree
+from sshfm.sftp_pool import SFTPPool
+from sshfm.transfer import MB, upload_buffer
+
+# Salin satu pohon folder di server: unduh lalu unggah ulang (cara lama)
+# dibandingkan stream antar channel, ekstensi copy-data dan cp di server,
+# plus pindah (rename). Bandwidth dibatasi agar biaya data lewat klien terlihat.
+# Jalankan dari root repo: python -m benchmarks.bench_copy
+
+
+# Cara lama: setiap file dibaca utuh ke mesin aplikasi lalu ditulis kembali
+def roundtrip_copy(pool, src, dst):
+    dirs, counts, errors = walk_tree(pool, src)
+    with pool.channel("copy") as sftp:
+        for path in sorted(dirs, key=lambda path: path.count("/")):
+            sftp.mkdir(dst + path[len(src):])
+        for info in dirs.values():
+            for entry in info['entries']:
+                if entry['is_dir']:
+                    continue
+                with sftp.open(entry['path'], "rb") as f:
+                    f.prefetch(entry['size'])
+                    data = f.read()
+                upload_buffer(sftp, data, dst + entry['path'][len(src):])
+
+
+def run(depth, fanout, files, max_size, latency, bandwidth):
+    root = tempfile.mkdtemp(prefix="bench_copy_")
+    results = []
+    try:
+        src = trees.make_deep(root, depth, fanout, files, max_size=max_size)
+        total = sum(os.path.getsize(os.path.join(path, name))
+                    for path, _, names in os.walk(src) for name in names)
+        count = sum(len(names) for _, _, names in os.walk(src))
+        with StandinServer(latency=latency, bandwidth=bandwidth) as server:
+            client = server.connect()
+            pool = SFTPPool(client, max_channels=6)
+            modes = [("unduh+unggah", None), ("stream", "stream"), ("copy-data", "copy-data"), ("cp", "cp")]
+            for name, method in modes:
+                dst = posixpath.join(root, f"copy_{name}")
+                start = time.perf_counter()
+                if method is None:
+                    roundtrip_copy(pool, src, dst)
+                else:
+                    copy = RemoteCopy(pool, [CopyItem(src, dst)], method=method).start()
+                    copy.wait()
+                    if copy.items[0].status != "berhasil":
+                        raise IOError(copy.items[0].error)
+                results.append((name, time.perf_counter() - start))
+            start = time.perf_counter()
+            move = RemoteCopy(pool, [CopyItem(posixpath.join(root, "copy_cp"), posixpath.join(root, "moved"))],
+                              action="move").start()
+            move.wait()
+            results.append(("pindah", time.perf_counter() - start))
+            pool.close()
+            client.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    limit = f"{bandwidth / MB:.1f} MB/s" if bandwidth else "tanpa batas"
+    print(f"{count} file, {total / MB:.1f} MB, RTT {latency * 1000:.0f} ms, bandwidth {limit}")
+    print(f"{'cara':<14}{'total (s)':>11}{'MB/s':>9}")
+    for name, seconds in results:
+        print(f"{name:<14}{seconds:>11.2f}{total / seconds / MB:>9.1f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--files", type=int, default=10, help="file per folder")
+    parser.add_argument("--max-size", type=int, default=512 * 1024, help="ukuran maksimum per file (byte)")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--bandwidth", type=float, default=10 * MB, help="batas byte/detik per arah")
+    args = parser.parse_args()
+    run(args.depth, args.fanout, args.files, args.max_size, args.latency, args.bandwidth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.standin import StandinServer
+from sshfm.bulk_delete import BulkDelete
+from sshfm.sftp_pool import SFTPPool
+
+# Hapus banyak file kecil (mis. log yang dirotasi): satu REMOVE per file
+# menunggu balasan (cara lama), REMOVE dipipeline di satu channel, dan satu
+# `rm` lewat exec.
+# Jalankan dari root repo: python -m benchmarks.bench_delete
+
+
+def make_files(root, count):
+    path = tempfile.mkdtemp(prefix="logs_", dir=root)
+    for i in range(count):
+        with open(os.path.join(path, f"app.log.{i}"), "wb") as f:
+            f.write(b"x")
+    return [os.path.join(path, f"app.log.{i}") for i in range(count)]
+
+
+def run(files, latency, window):
+    root = tempfile.mkdtemp(prefix="bench_delete_")
+    results = []
+    try:
+        with StandinServer(latency=latency) as server:
+            client = server.connect()
+            pool = SFTPPool(client)
+
+            paths = make_files(root, files)
+            start = time.perf_counter()
+            with pool.channel("remove") as sftp:
+                for path in paths:
+                    sftp.remove(path)
+            results.append(("satu per satu", files, time.perf_counter() - start))
+
+            for name, method in [("pipeline", "sftp"), ("rm", "rm")]:
+                paths = make_files(root, files)
+                batch = BulkDelete(pool, paths, method=method, window=window).start()
+                batch.wait()
+                summary = batch.summary()
+                results.append((name, summary['succeeded'], summary['seconds']))
+            pool.close()
+            client.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{files} file, RTT {latency * 1000:.0f} ms, window pipeline {window}")
+    print(f"{'cara':<14}{'berhasil':>9}{'total (s)':>11}{'file/s':>9}")
+    for name, succeeded, seconds in results:
+        print(f"{name:<14}{succeeded:>9}{seconds:>11.2f}{succeeded / seconds:>9.0f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--window", type=int, default=64, help="request REMOVE yang belum dibalas")
+    args = parser.parse_args()
+    run(args.files, args.latency, args.window)
+
+
+if __name__ == "__main__":
+    main()
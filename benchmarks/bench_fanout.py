@@ -0,0 +1,52 @@
+import argparse
+
+from benchmarks.standin import StandinServer
+from sshfm.fanout import FanoutRun, parse_inventory
+
+# Fan-out satu perintah ke banyak server SSH lokal (stand-in) sekaligus,
+# dibandingkan dengan menjalankannya host demi host.
+# Jalankan dari root repo: python -m benchmarks.bench_fanout
+
+
+def run(hosts, latency, command, workers):
+    servers = [StandinServer(latency=latency).start() for _ in range(hosts)]
+    by_port = {server.port: server for server in servers}
+    try:
+        inventory = "\n".join(f"bench@127.0.0.1:{server.port}" for server in servers)
+        entries = parse_inventory(inventory)
+
+        def connect(entry):
+            return by_port[entry['port']].connect(entry['user'])
+
+        results = {}
+        for name, count in (("sekuensial", 1), ("fan-out", workers)):
+            fanout = FanoutRun(entries, command, connect, workers=count).start()
+            fanout.wait()
+            results[name] = fanout
+
+        print(f"{hosts} host, RTT {latency * 1000:.0f} ms, perintah: {command}")
+        for name, fanout in results.items():
+            ok = sum(1 for host in fanout.hosts if host.status == "selesai")
+            print(f"{name:<11} {fanout.elapsed():>7.2f} s, {ok}/{hosts} selesai")
+        groups = results["fan-out"].groups()
+        print(f"{len(groups)} kelompok output identik:")
+        for group in groups:
+            print(f"  {len(group['hosts'])} host, exit {group['exit_code']}: "
+                  f"{group['stdout'].strip()[:60]!r}")
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hosts", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--command", default="df -h / | tail -1 | wc -l")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+    run(args.hosts, args.latency, args.command, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.standin import StandinServer
+from sshfm.listing import iter_file_list, join_remote
+
+# Benchmark listing direktori: listdir + stat per file (cara lama)
+# dibandingkan aliran READDIR yang dipipeline (iter_file_list).
+# Jalankan dari root repo: python -m benchmarks.bench_listing
+
+
+# Hitung paket permintaan SFTP yang dikirim klien
+def count_requests(sftp):
+    counter = {'requests': 0}
+    original = sftp._async_request
+
+    def counted(*args, **kwargs):
+        counter['requests'] += 1
+        return original(*args, **kwargs)
+
+    sftp._async_request = counted
+    return counter
+
+
+def list_with_stat(sftp, path):
+    entries = []
+    for name in sftp.listdir(path):
+        entries.append(sftp.stat(join_remote(path, name)))
+    return entries
+
+
+def run(files, latency):
+    root = tempfile.mkdtemp(prefix="bench_listing_")
+    try:
+        for i in range(files):
+            with open(os.path.join(root, f"file_{i:06d}.txt"), "wb") as f:
+                f.write(b"x" * (i % 512))
+
+        with StandinServer(latency=latency) as server:
+            client = server.connect()
+            results = {}
+
+            sftp = client.open_sftp()
+            counter = count_requests(sftp)
+            start = time.perf_counter()
+            old = list_with_stat(sftp, root)
+            results['listdir+stat'] = (time.perf_counter() - start, None,
+                                       counter['requests'], len(old))
+            sftp.close()
+
+            sftp = client.open_sftp()
+            counter = count_requests(sftp)
+            start = time.perf_counter()
+            first = None
+            count = 0
+            for _ in iter_file_list(sftp, root):
+                if first is None:
+                    first = time.perf_counter() - start
+                count += 1
+            results['pipelined'] = (time.perf_counter() - start, first,
+                                    counter['requests'], count)
+            sftp.close()
+            client.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{files} file, RTT {latency * 1000:.0f} ms")
+    print(f"{'metode':<14}{'total (s)':>12}{'entri 1 (s)':>14}{'permintaan':>12}{'entri':>8}")
+    for name, (total, first, requests, count) in results.items():
+        first_str = f"{first:.3f}" if first is not None else "-"
+        print(f"{name:<14}{total:>12.3f}{first_str:>14}{requests:>12}{count:>8}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="round trip tambahan dalam detik")
+    args = parser.parse_args()
+    run(args.files, args.latency)
+
+
+if __name__ == "__main__":
+    main()
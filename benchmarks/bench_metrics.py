@@ -0,0 +1,65 @@
+import argparse
+import threading
+import time
+
+from sshfm.metrics import OpStats, prometheus_text
+
+# Biaya pencatatan metrik per operasi (record/timed) dengan beberapa thread
+# sekaligus, dibandingkan latensi operasi SFTP tercepat yang realistis.
+# Jalankan dari root repo: python -m benchmarks.bench_metrics
+
+
+def hammer(threads, calls, fn):
+    def worker(index):
+        for i in range(calls):
+            fn(index, i)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run(calls, threads, hosts, rtt):
+    ops = ("listdir", "stat", "read", "write", "remove", "exec")
+    results = []
+    for count in (1, threads):
+        stats = OpStats(host="bench")
+        seconds = hammer(count, calls, lambda t, i: stats.record(
+            ops[i % len(ops)], 0.004, False, nbytes=4096, host=f"host{(t + i) % hosts}"))
+        results.append(("record", count, seconds / (count * calls)))
+
+        def timed(t, i):
+            with stats.timed(ops[i % len(ops)], host=f"host{(t + i) % hosts}"):
+                pass
+
+        seconds = hammer(count, calls, timed)
+        results.append(("timed", count, seconds / (count * calls)))
+
+    start = time.perf_counter()
+    text = prometheus_text([stats])
+    export_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{calls} panggilan per thread, {len(ops)} operasi x {hosts} host, dibandingkan operasi {rtt * 1000:.1f} ms")
+    print(f"{'cara':<8}{'thread':>7}{'µs/panggilan':>14}{'overhead':>10}")
+    for name, count, per_call in results:
+        print(f"{name:<8}{count:>7}{per_call * 1e6:>14.2f}{per_call / rtt * 100:>9.3f}%")
+    print(f"Ekspor Prometheus: {len(text.splitlines())} baris dalam {export_ms:.1f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=100000, help="panggilan per thread")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--hosts", type=int, default=20)
+    parser.add_argument("--rtt", type=float, default=0.001, help="latensi operasi pembanding (detik)")
+    args = parser.parse_args()
+    run(args.calls, args.threads, args.hosts, args.rtt)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.standin import StandinServer
+from sshfm.profiles import PROFILES, connect_options, negotiated, sftp_options
+from sshfm.sftp_pool import SFTPPool
+from sshfm.transfer import MB, READ_BLOCK, upload_buffer
+
+# Throughput per profil koneksi (default/LAN/WAN) untuk data teks (log)
+# dan data acak, pada link lokal cepat dan link WAN tiruan (RTT tinggi,
+# bandwidth terbatas). Jalankan dari root repo: python -m benchmarks.bench_profiles
+
+LINKS = {
+    "lan": {'latency': 0.0005, 'bandwidth': None},
+    "wan": {'latency': 0.05, 'bandwidth': 4 * MB},
+}
+
+
+def make_payloads(size):
+    line = b"2024-05-01T12:00:00Z INFO request handled path=/api/v1/items status=200 ms=12\n"
+    return {
+        'teks': (line * (size // len(line) + 1))[:size],
+        'acak': os.urandom(size),
+    }
+
+
+def download(sftp, path, size):
+    with sftp.open(path, "rb") as f:
+        f.prefetch(size)
+        while f.read(READ_BLOCK):
+            pass
+
+
+def run(link, size, profiles):
+    payloads = make_payloads(size)
+    workdir = tempfile.mkdtemp(prefix="bench_profiles_")
+    rows = []
+    try:
+        for name, data in payloads.items():
+            with open(os.path.join(workdir, name), "wb") as f:
+                f.write(data)
+        with StandinServer(**LINKS[link]) as server:
+            for profile in profiles:
+                client = server.connect(**connect_options(profile))
+                pool = SFTPPool(client, max_channels=1, **sftp_options(profile))
+                algorithms = negotiated(client)
+                for name, data in payloads.items():
+                    with pool.channel("bench") as sftp:
+                        start = time.perf_counter()
+                        download(sftp, os.path.join(workdir, name), len(data))
+                        down = time.perf_counter() - start
+                        start = time.perf_counter()
+                        upload_buffer(sftp, data, os.path.join(workdir, name + ".up"))
+                        up = time.perf_counter() - start
+                    rows.append((profile, name, len(data) / down / MB, len(data) / up / MB, algorithms))
+                pool.close()
+                client.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    settings = LINKS[link]
+    bandwidth = f"{settings['bandwidth'] / MB:.0f} MB/s" if settings['bandwidth'] else "tanpa batas"
+    print(f"link {link}: RTT {settings['latency'] * 1000:.1f} ms, bandwidth {bandwidth}, {size / MB:.0f} MB per file")
+    print(f"{'profil':<9}{'data':<6}{'unduh MB/s':>12}{'unggah MB/s':>13}  algoritma")
+    for profile, name, down, up, algorithms in rows:
+        print(f"{profile:<9}{name:<6}{down:>12.2f}{up:>13.2f}  "
+              f"{algorithms['cipher']}, {algorithms['kompresi']}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--link", choices=sorted(LINKS) + ["semua"], default="semua")
+    parser.add_argument("--size", type=int, default=8 * MB, help="ukuran per file (byte)")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    args = parser.parse_args()
+    for link in (sorted(LINKS) if args.link == "semua" else [args.link]):
+        run(link, args.size, args.profiles)
+        print()
+
+
+if __name__ == "__main__":
+    main()
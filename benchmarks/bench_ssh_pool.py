@@ -0,0 +1,112 @@
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks.standin import StandinServer
+from sshfm.ssh_pool import SSHConnectionPool
+
+# Load test pool koneksi app.py: N pengguna simulasi membuka halaman
+# file manager (list + download seperti app.py) secara bersamaan.
+# Mode "connect" membuat koneksi baru per operasi (perilaku lama),
+# mode "pool" memakai SSHConnectionPool bersama.
+# Jalankan dari root repo: python -m benchmarks.bench_ssh_pool
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def page_view(run_sftp, remote_dir, local_dir):
+    names = run_sftp(lambda sftp: sftp.listdir(remote_dir))
+    name = names[0]
+    local_path = os.path.join(local_dir, name)
+    run_sftp(lambda sftp: sftp.get(f"{remote_dir}/{name}", local_path))
+
+
+def run_mode(mode, server, users, pages, remote_dir):
+    server.reset_counters()
+    pool = None
+    if mode == "pool":
+        pool = SSHConnectionPool(lambda host, user: server.connect(user), max_size=users)
+
+    def run_sftp(fn):
+        def with_sftp(ssh):
+            sftp = ssh.open_sftp()
+            try:
+                return fn(sftp)
+            finally:
+                sftp.close()
+        if pool is not None:
+            return pool.run(server.host, "bench", with_sftp)
+        ssh = server.connect()
+        try:
+            return with_sftp(ssh)
+        finally:
+            ssh.close()
+
+    latencies = []
+    lock = threading.Lock()
+    local_dir = tempfile.mkdtemp(prefix="bench_pool_local_")
+
+    def user_loop(index):
+        user_dir = os.path.join(local_dir, str(index))
+        os.makedirs(user_dir)
+        for _ in range(pages):
+            start = time.perf_counter()
+            page_view(run_sftp, remote_dir, user_dir)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=user_loop, args=(i,)) for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    if pool is not None:
+        pool.close()
+    shutil.rmtree(local_dir, ignore_errors=True)
+    handshakes = server.counters["handshakes"]
+    return {
+        'mode': mode,
+        'pages': len(latencies),
+        'handshakes': handshakes,
+        'handshakes_per_sec': handshakes / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'elapsed_s': elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5, help="halaman per pengguna")
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    remote_dir = tempfile.mkdtemp(prefix="bench_pool_remote_")
+    try:
+        with open(os.path.join(remote_dir, "config.yaml"), "wb") as f:
+            f.write(os.urandom(16 * 1024))
+        with StandinServer(latency=args.latency) as server:
+            print(f"{args.users} pengguna x {args.pages} halaman, RTT {args.latency * 1000:.0f} ms")
+            print(f"{'mode':<9}{'halaman':>9}{'handshake':>11}{'hs/detik':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}{'total (s)':>11}")
+            for mode in ("connect", "pool"):
+                r = run_mode(mode, server, args.users, args.pages, remote_dir)
+                print(f"{r['mode']:<9}{r['pages']:>9}{r['handshakes']:>11}{r['handshakes_per_sec']:>10.1f}"
+                      f"{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['elapsed_s']:>11.2f}")
+    finally:
+        shutil.rmtree(remote_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
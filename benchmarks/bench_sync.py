@@ -0,0 +1,85 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.standin import StandinServer
+from sshfm.sftp_pool import SFTPPool
+from sshfm.sync import plan_sync, scan_local_dir
+from sshfm.transfer import BatchUpload, UploadItem
+
+# Benchmark deploy folder konfigurasi berulang: upload ulang semua file
+# satu per satu (cara lama) dibandingkan delta sync yang hanya mengirim
+# file baru/berubah. Jalankan dari root repo: python -m benchmarks.bench_sync
+
+
+def make_tree(root, files, size):
+    for i in range(files):
+        path = os.path.join(root, f"service{i % 10}", f"conf{i:04d}.yaml")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+
+
+def run(files, size, changed, latency, workers):
+    local_root = tempfile.mkdtemp(prefix="bench_sync_src_")
+    remote_root = tempfile.mkdtemp(prefix="bench_sync_dst_")
+    make_tree(local_root, files, size)
+    results = []
+    try:
+        with StandinServer(latency=latency) as server:
+            client = server.connect()
+            pool = SFTPPool(client, max_channels=workers)
+
+            # Cara lama: semua file diunggah ulang, sekuensial
+            sources = scan_local_dir(local_root)
+            plan_sync(pool, sources, remote_root).start(pool, workers=workers).wait()
+            start = time.perf_counter()
+            items = [UploadItem(s.rel_path, s.open_buffer, f"{remote_root}/{s.rel_path}", size=s.size)
+                     for s in sources]
+            BatchUpload(pool, items, workers=1).start().wait()
+            results.append(("upload ulang semua", len(items), time.perf_counter() - start))
+
+            # Samakan mtime di server dengan file lokal
+            plan_sync(pool, sources, remote_root, compare="size").start(pool, workers=workers).wait()
+            for source in sources:
+                os.utime(f"{remote_root}/{source.rel_path}", (source.mtime, source.mtime))
+
+            for compare in ("mtime", "checksum"):
+                # Ubah sebagian file sebelum tiap putaran deploy
+                for source in sources[:changed]:
+                    with open(source.local_path, "ab") as f:
+                        f.write(b"\n# diubah\n")
+                start = time.perf_counter()
+                plan = plan_sync(pool, scan_local_dir(local_root), remote_root, compare=compare,
+                                 ssh_client=client, workers=workers)
+                batch = plan.start(pool, workers=workers)
+                batch.wait()
+                results.append((f"delta sync ({compare})", len(plan.changed()), time.perf_counter() - start))
+            pool.close()
+            client.close()
+    finally:
+        shutil.rmtree(local_root, ignore_errors=True)
+        shutil.rmtree(remote_root, ignore_errors=True)
+
+    print(f"{files} file x {size / 1024:.0f} KB, {changed} berubah, RTT {latency * 1000:.0f} ms")
+    print(f"{'metode':<24}{'diunggah':>10}{'total (s)':>11}")
+    for name, uploaded, seconds in results:
+        print(f"{name:<24}{uploaded:>10}{seconds:>11.2f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--size", type=int, default=4 * 1024, help="ukuran per file (byte)")
+    parser.add_argument("--changed", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=6)
+    args = parser.parse_args()
+    run(args.files, args.size, args.changed, args.latency, args.workers)
+
+
+if __name__ == "__main__":
+    main()
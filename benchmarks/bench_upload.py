@@ -0,0 +1,54 @@
+import argparse
+import os
+import shutil
+import tempfile
+
+from benchmarks.standin import StandinServer
+from sshfm.sftp_pool import SFTPPool
+from sshfm.transfer import MB, BatchUpload, UploadItem
+
+# Benchmark batch upload banyak file kecil: sekuensial (1 worker)
+# dibandingkan paralel di beberapa channel SFTP pada transport yang sama.
+# Jalankan dari root repo: python -m benchmarks.bench_upload
+
+
+def run(files, size, latency, workers):
+    payloads = [os.urandom(size) for _ in range(files)]
+    results = []
+    with StandinServer(latency=latency) as server:
+        client = server.connect()
+        for count in sorted({1, workers}):
+            remote_dir = tempfile.mkdtemp(prefix="bench_upload_")
+            try:
+                pool = SFTPPool(client, max_channels=count)
+                items = [UploadItem(f"f{i:05d}.bin", data, f"{remote_dir}/f{i:05d}.bin")
+                         for i, data in enumerate(payloads)]
+                batch = BatchUpload(pool, items, workers=count).start()
+                batch.wait()
+                summary = batch.summary()
+                pool.close()
+                results.append((count, summary))
+            finally:
+                shutil.rmtree(remote_dir, ignore_errors=True)
+        client.close()
+
+    print(f"{files} file x {size / 1024:.0f} KB, RTT {latency * 1000:.0f} ms")
+    print(f"{'worker':>6}{'berhasil':>10}{'total (s)':>11}{'file/s':>9}{'MB/s':>8}")
+    for count, s in results:
+        print(f"{count:>6}{s['succeeded']:>10}{s['seconds']:>11.2f}"
+              f"{s['files'] / s['seconds']:>9.1f}{s['bytes'] / s['seconds'] / MB:>8.2f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size", type=int, default=8 * 1024, help="ukuran per file (byte)")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=6)
+    args = parser.parse_args()
+    run(args.files, args.size, args.latency, args.workers)
+
+
+if __name__ == "__main__":
+    main()
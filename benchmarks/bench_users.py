@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from sshfm.users import UserStore
+
+# Login dan registrasi bersamaan: users.json lama (baca/tulis ulang seluruh
+# file per request) dibandingkan UserStore SQLite WAL. Hash password dibuat
+# sekali di awal (bukan bcrypt sungguhan), jadi yang diukur hanya penyimpanan.
+# Jalankan dari root repo: python -m benchmarks.bench_users
+
+
+# Cara lama di app.py: load seluruh file, tambah satu key, tulis ulang tanpa lock
+class JsonUsers:
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def get_hash(self, username):
+        return self.load().get(username)
+
+    def add(self, username, password_hash):
+        users = self.load()
+        if username in users:
+            return False
+        users[username] = password_hash
+        with open(self.path, "w") as f:
+            json.dump(users, f, indent=4)
+        return True
+
+    def count(self):
+        return len(self.load())
+
+
+def hammer(threads, per_thread, fn):
+    errors = []
+
+    def worker(index):
+        for i in range(per_thread):
+            try:
+                fn(index, i)
+            except Exception as e:
+                errors.append(e)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - start, errors
+
+
+def run(users, threads, logins, registrations):
+    root = tempfile.mkdtemp(prefix="bench_users_")
+    try:
+        seed = {f"user{i:06d}": f"$2b$12$hash{i:06d}" for i in range(users)}
+        json_path = os.path.join(root, "users.json")
+        with open(json_path, "w") as f:
+            json.dump(seed, f, indent=4)
+        store = UserStore(os.path.join(root, "users.db"))
+        start = time.perf_counter()
+        store.import_json(json_path)
+        import_seconds = time.perf_counter() - start
+
+        results = []
+        for name, backend in (("json", JsonUsers(json_path)), ("sqlite", store)):
+            login_seconds, login_errors = hammer(
+                threads, logins, lambda t, i: backend.get_hash(f"user{(t * 7919 + i) % users:06d}"))
+            before = backend.count()
+            reg_seconds, reg_errors = hammer(
+                threads, registrations, lambda t, i: backend.add(f"new{t:03d}_{i:05d}", "$2b$12$new"))
+            lost = before + threads * registrations - backend.count()
+            results.append((name, threads * logins / login_seconds, threads * registrations / reg_seconds,
+                            lost, len(login_errors) + len(reg_errors)))
+
+        print(f"{users} user, {threads} thread, impor JSON ke SQLite {import_seconds:.2f} s")
+        print(f"{'store':<8}{'login/s':>10}{'registrasi/s':>14}{'hilang':>8}{'error':>7}")
+        for name, login_rate, reg_rate, lost, errors in results:
+            print(f"{name:<8}{login_rate:>10.0f}{reg_rate:>14.0f}{lost:>8}{errors:>7}")
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=200, help="login per thread")
+    parser.add_argument("--registrations", type=int, default=50, help="registrasi per thread")
+    args = parser.parse_args()
+    run(args.users, args.threads, args.logins, args.registrations)
+
+
+if __name__ == "__main__":
+    main()
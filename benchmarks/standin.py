@@ -0,0 +1,467 @@
+import os
+import signal
+import socket
+import subprocess
+import threading
+import time
+import heapq
+from collections import Counter
+
+import paramiko
+from paramiko import SFTPServer, SFTPServerInterface, SFTPAttributes, SFTPHandle
+from paramiko.sftp import CMD_EXTENDED, SFTP_OK, SFTP_FAILURE, SFTP_NO_SUCH_FILE, SFTP_PERMISSION_DENIED
+
+# Server SSH/SFTP lokal berbasis paramiko untuk benchmark.
+# Melayani filesystem lokal apa adanya (tanpa chroot), jadi benchmark
+# cukup memakai path absolut di direktori sementara.
+
+_HOST_KEY = None
+_HOST_KEY_LOCK = threading.Lock()
+
+
+def _host_key():
+    global _HOST_KEY
+    with _HOST_KEY_LOCK:
+        if _HOST_KEY is None:
+            _HOST_KEY = paramiko.RSAKey.generate(2048)
+        return _HOST_KEY
+
+
+def _errno_to_status(e):
+    if isinstance(e, FileNotFoundError):
+        return SFTP_NO_SUCH_FILE
+    if isinstance(e, PermissionError):
+        return SFTP_PERMISSION_DENIED
+    return SFTP_FAILURE
+
+
+# Handle file untuk SFTP, memakai implementasi read/write bawaan paramiko
+class _LocalHandle(SFTPHandle):
+    def stat(self):
+        try:
+            return SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+        except OSError as e:
+            return _errno_to_status(e)
+
+    def chattr(self, attr):
+        return SFTP_OK
+
+
+class _LocalSFTP(SFTPServerInterface):
+    def __init__(self, server, standin, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.standin = standin
+
+    def _count(self, op):
+        self.standin.count(f"sftp_{op}")
+
+    def list_folder(self, path):
+        self._count("opendir")
+        try:
+            out = []
+            for name in os.listdir(path):
+                attr = SFTPAttributes.from_stat(os.lstat(os.path.join(path, name)))
+                attr.filename = name
+                out.append(attr)
+            return out
+        except OSError as e:
+            return _errno_to_status(e)
+
+    def stat(self, path):
+        self._count("stat")
+        try:
+            return SFTPAttributes.from_stat(os.stat(path))
+        except OSError as e:
+            return _errno_to_status(e)
+
+    def lstat(self, path):
+        self._count("lstat")
+        try:
+            return SFTPAttributes.from_stat(os.lstat(path))
+        except OSError as e:
+            return _errno_to_status(e)
+
+    def open(self, path, flags, attr):
+        self._count("open")
+        try:
+            mode = getattr(attr, "st_mode", None) or 0o644
+            fd = os.open(path, flags, mode)
+        except OSError as e:
+            return _errno_to_status(e)
+        if flags & os.O_WRONLY:
+            fstr = "ab" if flags & os.O_APPEND else "wb"
+        elif flags & os.O_RDWR:
+            fstr = "a+b" if flags & os.O_APPEND else "r+b"
+        else:
+            fstr = "rb"
+        try:
+            f = os.fdopen(fd, fstr)
+        except OSError as e:
+            return _errno_to_status(e)
+        handle = _LocalHandle(flags)
+        handle.filename = path
+        handle.readfile = f
+        handle.writefile = f
+        return handle
+
+    def remove(self, path):
+        self._count("remove")
+        try:
+            os.remove(path)
+        except OSError as e:
+            return _errno_to_status(e)
+        return SFTP_OK
+
+    def rename(self, oldpath, newpath):
+        self._count("rename")
+        if os.path.exists(newpath):
+            return SFTP_FAILURE
+        try:
+            os.rename(oldpath, newpath)
+        except OSError as e:
+            return _errno_to_status(e)
+        return SFTP_OK
+
+    def posix_rename(self, oldpath, newpath):
+        self._count("posix_rename")
+        try:
+            os.rename(oldpath, newpath)
+        except OSError as e:
+            return _errno_to_status(e)
+        return SFTP_OK
+
+    def mkdir(self, path, attr):
+        self._count("mkdir")
+        try:
+            os.mkdir(path)
+        except OSError as e:
+            return _errno_to_status(e)
+        return SFTP_OK
+
+    def rmdir(self, path):
+        self._count("rmdir")
+        try:
+            os.rmdir(path)
+        except OSError as e:
+            return _errno_to_status(e)
+        return SFTP_OK
+
+    def chattr(self, path, attr):
+        self._count("setstat")
+        try:
+            if attr.st_atime is not None and attr.st_mtime is not None:
+                os.utime(path, (attr.st_atime, attr.st_mtime))
+            if getattr(attr, "st_mode", None):
+                os.chmod(path, attr.st_mode & 0o7777)
+        except OSError as e:
+            return _errno_to_status(e)
+        return SFTP_OK
+
+    def canonicalize(self, path):
+        return os.path.normpath(path if os.path.isabs(path) else os.path.join("/", path))
+
+    def readlink(self, path):
+        try:
+            return os.readlink(path)
+        except OSError as e:
+            return _errno_to_status(e)
+
+    def symlink(self, target_path, path):
+        try:
+            os.symlink(target_path, path)
+        except OSError as e:
+            return _errno_to_status(e)
+        return SFTP_OK
+
+
+# Subsystem SFTP dengan ekstensi copy-data (seperti sftp-server OpenSSH 9+):
+# isi file disalin di sisi server dari satu handle ke handle lain
+class _CopyDataSFTPServer(SFTPServer):
+    def _process(self, t, request_number, msg):
+        if t == CMD_EXTENDED and self.server.standin.copy_data:
+            tag = msg.get_text()
+            if tag == "copy-data":
+                self._copy_data(request_number, msg)
+                return
+            msg.rewind()
+            msg.get_int()
+        super()._process(t, request_number, msg)
+
+    def _copy_data(self, request_number, msg):
+        self.server.standin.count("sftp_copy_data")
+        src = self.file_table.get(msg.get_binary())
+        offset = msg.get_int64()
+        length = msg.get_int64()
+        dst = self.file_table.get(msg.get_binary())
+        write_offset = msg.get_int64()
+        if src is None or dst is None:
+            self._send_status(request_number, SFTP_FAILURE, "Invalid handle")
+            return
+        try:
+            src.readfile.seek(offset)
+            dst.writefile.seek(write_offset)
+            remaining = length or None
+            while remaining is None or remaining > 0:
+                data = src.readfile.read(1024 * 1024 if remaining is None else min(remaining, 1024 * 1024))
+                if not data:
+                    break
+                dst.writefile.write(data)
+                if remaining is not None:
+                    remaining -= len(data)
+            dst.writefile.flush()
+        except OSError as e:
+            self._send_status(request_number, _errno_to_status(e))
+            return
+        self._send_status(request_number, SFTP_OK)
+
+
+class _Server(paramiko.ServerInterface):
+    def __init__(self, standin):
+        self.standin = standin
+
+    def get_allowed_auths(self, username):
+        return "publickey,password"
+
+    def check_auth_publickey(self, username, key):
+        self.standin.count("handshakes")
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_password(self, username, password):
+        self.standin.count("handshakes")
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED_OPEN_FAILED
+
+    # Tanpa terminal sungguhan: pty hanya dicatat agar channel yang ditutup
+    # menghentikan perintahnya dengan SIGHUP, seperti sshd
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        channel.standin_pty = True
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        if not self.standin.allow_exec:
+            return False
+        self.standin.count("exec")
+        threading.Thread(target=_run_exec, args=(channel, command), daemon=True).start()
+        return True
+
+
+# Jalankan perintah exec secara lokal dan alirkan stdout/stderr ke channel
+def _run_exec(channel, command):
+    if isinstance(command, bytes):
+        command = command.decode()
+    pty = getattr(channel, "standin_pty", False)
+    try:
+        proc = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                start_new_session=pty)
+    except OSError as e:
+        channel.sendall_stderr(str(e).encode())
+        channel.send_exit_status(127)
+        channel.close()
+        return
+
+    # Channel ditutup klien: dengan pty seluruh grup proses mendapat SIGHUP
+    # (trap di shell sempat berjalan), tanpa pty prosesnya langsung dimatikan
+    def hang_up():
+        try:
+            if pty:
+                os.killpg(proc.pid, signal.SIGHUP)
+            else:
+                proc.kill()
+        except OSError:
+            pass
+
+    def pump_err():
+        try:
+            for chunk in iter(lambda: proc.stderr.read1(32768), b""):
+                channel.sendall_stderr(chunk)
+        except OSError:
+            hang_up()
+
+    def pump_in():
+        try:
+            while True:
+                data = channel.recv(32768)
+                if not data:
+                    break
+                proc.stdin.write(data)
+                proc.stdin.flush()
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            # Klien mengirim EOF sebelum CLOSE; tunggu CLOSE selama prosesnya jalan
+            while pty and not channel.closed and proc.poll() is None:
+                time.sleep(0.05)
+            if pty and channel.closed:
+                hang_up()
+
+    t_err = threading.Thread(target=pump_err, daemon=True)
+    t_in = threading.Thread(target=pump_in, daemon=True)
+    t_err.start()
+    t_in.start()
+    try:
+        for chunk in iter(lambda: proc.stdout.read1(32768), b""):
+            channel.sendall(chunk)
+    except OSError:
+        hang_up()
+    t_err.join()
+    code = proc.wait()
+    try:
+        # Kode negatif (mati karena sinyal) dilaporkan seperti shell: 128 + sinyal
+        channel.send_exit_status(code if code >= 0 else 128 - code)
+        channel.shutdown_write()
+        channel.close()
+    except (OSError, EOFError):
+        pass
+
+
+# Saluran tunda satu arah: setiap potongan data diteruskan setelah
+# latency detik, dibatasi bandwidth (byte/detik) bila diisi
+def _delay_pump(src, dst, latency, bandwidth, stop):
+    queue = []
+    cond = threading.Condition()
+    state = {"seq": 0, "busy_until": 0.0, "eof": False}
+
+    def reader():
+        try:
+            while not stop.is_set():
+                data = src.recv(65536)
+                if not data:
+                    break
+                now = time.monotonic()
+                release = now + latency
+                if bandwidth:
+                    start = max(now, state["busy_until"])
+                    state["busy_until"] = start + len(data) / bandwidth
+                    release = state["busy_until"] + latency
+                with cond:
+                    heapq.heappush(queue, (release, state["seq"], data))
+                    state["seq"] += 1
+                    cond.notify()
+        except OSError:
+            pass
+        with cond:
+            state["eof"] = True
+            cond.notify()
+
+    threading.Thread(target=reader, daemon=True).start()
+    try:
+        while True:
+            with cond:
+                while not queue and not state["eof"]:
+                    cond.wait()
+                if not queue:
+                    break
+                release, _, data = queue[0]
+                delay = release - time.monotonic()
+                if delay > 0:
+                    cond.wait(delay)
+                    continue
+                heapq.heappop(queue)
+            dst.sendall(data)
+    except OSError:
+        pass
+    finally:
+        try:
+            dst.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+
+class StandinServer:
+    # latency: round trip tambahan dalam detik, dibagi dua per arah
+    # bandwidth: batas byte/detik per arah, None berarti tanpa batas
+    # copy_data: layani ekstensi SFTP copy-data (salin di sisi server)
+    def __init__(self, latency=0.0, bandwidth=None, allow_exec=True, copy_data=True):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.allow_exec = allow_exec
+        self.copy_data = copy_data
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._transports = []
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(128)
+        self.host, self.port = self._sock.getsockname()
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def reset_counters(self):
+        with self._lock:
+            self.counters.clear()
+
+    def start(self):
+        _host_key()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+        for t in list(self._transports):
+            try:
+                t.close()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        sock = conn
+        if self.latency or self.bandwidth:
+            sock, inner = socket.socketpair()
+            one_way = self.latency / 2.0
+            for src, dst in ((conn, inner), (inner, conn)):
+                threading.Thread(target=_delay_pump,
+                                 args=(src, dst, one_way, self.bandwidth, self._stop),
+                                 daemon=True).start()
+        transport = paramiko.Transport(sock)
+        transport.add_server_key(_host_key())
+        # Tawarkan kompresi seperti OpenSSH; dipakai hanya jika klien memintanya
+        transport.use_compression(True)
+        transport.set_subsystem_handler("sftp", _CopyDataSFTPServer, _LocalSFTP, self)
+        self._transports.append(transport)
+        try:
+            transport.start_server(server=_Server(self))
+        except (paramiko.SSHException, EOFError, OSError):
+            return
+
+    # Buat SSHClient yang sudah terhubung ke server ini
+    def connect(self, username="bench", **kwargs):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        kwargs.setdefault("password", "bench")
+        kwargs.setdefault("look_for_keys", False)
+        kwargs.setdefault("allow_agent", False)
+        client.connect(self.host, port=self.port, username=username, **kwargs)
+        return client
@@ -0,0 +1,290 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import posixpath
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import paramiko
+
+from benchmarks import trees
+from benchmarks.standin import StandinServer
+from sshfm.backends import AsyncSSHBackend, ParamikoBackend, available_backends
+from sshfm.metrics import OpStats
+from sshfm.search import walk_tree
+from sshfm.thumbnails import WORKERS as THUMB_WORKERS, generate_thumbnail
+from sshfm.transfer import BatchUpload, RangeDownload, UploadItem
+
+# Suite benchmark lengkap terhadap server stand-in (latensi dan bandwidth
+# buatan): listing folder lebar dan pohon dalam, thumbnail, upload, hapus,
+# download file besar dan exec. Hasilnya JSON yang bisa dibandingkan dengan
+# baseline tersimpan; exit code 1 jika ada skenario yang melambat.
+# Jalankan dari root repo: python -m benchmarks.suite --baseline benchmarks/baseline.json
+
+FORMAT = 1
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+MB = 1024 * 1024
+
+# Ukuran data per skala; "full" memakai file besar beberapa GB
+SCALES = {
+    'small': {'wide': 2000, 'depth': 4, 'fanout': 3, 'deep_files': 5, 'images': 40,
+              'image_size': [800, 600], 'large': 64 * MB, 'uploads': 200, 'upload_size': 16 * 1024,
+              'execs': 20},
+    'full': {'wide': 20000, 'depth': 7, 'fanout': 3, 'deep_files': 10, 'images': 300,
+             'image_size': [1920, 1080], 'large': 2048 * MB, 'uploads': 1000, 'upload_size': 64 * 1024,
+             'execs': 100},
+}
+
+
+# Data sintetis dan koneksi yang dipakai semua skenario
+class Context:
+    def __init__(self, root, scale, seed):
+        self.root = root
+        self.scale = scale
+        self.wide = trees.make_wide(root, scale['wide'], seed)
+        self.deep = trees.make_deep(root, scale['depth'], scale['fanout'], scale['deep_files'], seed)
+        self.images = trees.make_images(root, scale['images'], tuple(scale['image_size']), seed)
+        self.large = trees.make_large(root, scale['large'])
+        self.uploads = trees.make_upload_data(scale['uploads'], scale['upload_size'], seed)
+        self.upload_dir = os.path.join(root, "uploads")
+        self.local = tempfile.mkdtemp(prefix="bench_suite_local_")
+        self.backend = None
+        self.pool = None
+
+
+def scenario_listing_wide(ctx):
+    entries = ctx.backend.listdir(ctx.wide)
+    return len(entries), 0
+
+
+def scenario_listing_deep(ctx):
+    dirs, counts, errors = walk_tree(ctx.pool, ctx.deep)
+    if errors:
+        raise IOError(errors[0])
+    return counts['listed'], 0
+
+
+def scenario_thumbnails(ctx):
+    entries = ctx.backend.listdir(ctx.images)
+
+    def thumbnail(entry):
+        generate_thumbnail(ctx.backend, entry['path'], entry['size'])
+        return entry['size']
+
+    with ThreadPoolExecutor(max_workers=THUMB_WORKERS) as executor:
+        sizes = list(executor.map(thumbnail, entries))
+    return len(sizes), sum(sizes)
+
+
+def scenario_upload(ctx):
+    os.makedirs(ctx.upload_dir, exist_ok=True)
+    items = [UploadItem(name, data, posixpath.join(ctx.upload_dir, name)) for name, data in ctx.uploads]
+    batch = BatchUpload(ctx.pool, items).start()
+    batch.wait()
+    summary = batch.summary()
+    if summary['failed']:
+        raise IOError(f"{summary['failed']} upload gagal")
+    return len(items), summary['bytes']
+
+
+# Menghapus file yang diunggah ulang (tanpa diukur) sebelum tiap run
+def scenario_delete(ctx):
+    paths = [(posixpath.join(ctx.upload_dir, name),) for name, _ in ctx.uploads]
+    results = ctx.backend.map("remove", paths)
+    errors = [error for _, error in results if error]
+    if errors:
+        raise IOError(errors[0])
+    return len(paths), 0
+
+
+def scenario_download(ctx):
+    size = ctx.scale['large']
+    part_path = os.path.join(ctx.local, "large.part")
+    download = RangeDownload(ctx.pool, ctx.large, part_path, size, os.path.getmtime(ctx.large)).start()
+    download.wait()
+    if download.errors:
+        raise IOError(download.errors[0])
+    download.finish()
+    os.remove(part_path)
+    return 1, size
+
+
+def scenario_exec(ctx):
+    for _ in range(ctx.scale['execs']):
+        code, output, error = ctx.backend.exec("echo ok")
+        if code != 0:
+            raise IOError(error)
+    return ctx.scale['execs'], 0
+
+
+# (nama, skenario, persiapan yang tidak ikut diukur)
+SCENARIOS = [
+    ("listing_wide", scenario_listing_wide, None),
+    ("listing_deep", scenario_listing_deep, None),
+    ("thumbnails", scenario_thumbnails, None),
+    ("upload", scenario_upload, None),
+    ("delete", scenario_delete, scenario_upload),
+    ("download", scenario_download, None),
+    ("exec", scenario_exec, None),
+]
+
+
+def summarize(runs, ops, nbytes):
+    median = statistics.median(runs)
+    return {
+        'median_s': round(median, 4),
+        'min_s': round(min(runs), 4),
+        'max_s': round(max(runs), 4),
+        'runs': [round(seconds, 4) for seconds in runs],
+        'ops': ops,
+        'bytes': nbytes,
+        'ops_per_s': round(ops / median, 1) if median else None,
+        'mb_per_s': round(nbytes / median / MB, 2) if median and nbytes else None,
+    }
+
+
+def run(scale_name, latency, bandwidth, backend_name, repeat, seed, only=None):
+    scale = SCALES[scale_name]
+    root = tempfile.mkdtemp(prefix="bench_suite_")
+    ctx = None
+    try:
+        print(f"Membuat data sintetis ({scale_name})...", file=sys.stderr)
+        ctx = Context(root, scale, seed)
+        stats = OpStats(host="standin")
+        results = {}
+        with StandinServer(latency=latency, bandwidth=bandwidth) as server:
+            # Upload, download dan penelusuran pohon selalu lewat pool paramiko,
+            # seperti FileManager; listing, thumbnail, hapus dan exec lewat backend
+            paramiko_backend = ParamikoBackend.connect(server.host, "bench", password="bench",
+                                                       port=server.port, stats=stats)
+            ctx.pool = paramiko_backend.sftp_pool
+            if backend_name == "asyncssh":
+                ctx.backend = AsyncSSHBackend.connect(server.host, "bench", password="bench",
+                                                      port=server.port, stats=stats)
+            else:
+                ctx.backend = paramiko_backend
+            try:
+                for name, scenario, prepare in SCENARIOS:
+                    if only and name not in only:
+                        continue
+                    runs = []
+                    for _ in range(repeat):
+                        if prepare:
+                            prepare(ctx)
+                        start = time.perf_counter()
+                        ops, nbytes = scenario(ctx)
+                        runs.append(time.perf_counter() - start)
+                    results[name] = summarize(runs, ops, nbytes)
+                    print(f"  {name}: {results[name]['median_s']:.3f} s", file=sys.stderr)
+            finally:
+                if ctx.backend is not paramiko_backend:
+                    ctx.backend.close()
+                paramiko_backend.close()
+
+        return {
+            'format': FORMAT,
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            'config': {'scale': scale_name, 'latency': latency, 'bandwidth': bandwidth,
+                       'backend': backend_name, 'repeat': repeat, 'seed': seed, 'sizes': scale},
+            'environment': {'python': platform.python_version(), 'paramiko': paramiko.__version__,
+                            'platform': platform.platform(), 'cpus': os.cpu_count()},
+            'scenarios': results,
+            'sftp_ops': stats.snapshot(),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        if ctx is not None:
+            shutil.rmtree(ctx.local, ignore_errors=True)
+
+
+# Bandingkan median tiap skenario dengan baseline. Hasilnya baris tabel dan
+# jumlah skenario yang lebih lambat dari toleransi.
+def compare(results, baseline, tolerance):
+    rows = []
+    regressions = 0
+    for name, current in results['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            rows.append((name, None, current['median_s'], None, "baru"))
+            continue
+        change = (current['median_s'] - previous['median_s']) / previous['median_s'] if previous['median_s'] else 0.0
+        if change > tolerance:
+            status = "LEBIH LAMBAT"
+            regressions += 1
+        elif change < -tolerance:
+            status = "lebih cepat"
+        else:
+            status = "sama"
+        rows.append((name, previous['median_s'], current['median_s'], change, status))
+    return rows, regressions
+
+
+def print_results(results):
+    config = results['config']
+    bandwidth = f"{config['bandwidth'] / MB:.1f} MB/s" if config['bandwidth'] else "tanpa batas"
+    print(f"Skala {config['scale']}, backend {config['backend']}, RTT {config['latency'] * 1000:.0f} ms, "
+          f"bandwidth {bandwidth}, {config['repeat']}x per skenario")
+    print(f"{'skenario':<14}{'median (s)':>11}{'min (s)':>9}{'op':>8}{'op/s':>10}{'MB/s':>9}")
+    for name, item in results['scenarios'].items():
+        mb_per_s = f"{item['mb_per_s']:.2f}" if item['mb_per_s'] else "-"
+        print(f"{name:<14}{item['median_s']:>11.3f}{item['min_s']:>9.3f}{item['ops']:>8}"
+              f"{item['ops_per_s']:>10.1f}{mb_per_s:>9}")
+
+
+def print_comparison(rows, baseline, tolerance):
+    print(f"Dibandingkan dengan baseline {baseline['created']} (toleransi {tolerance * 100:.0f}%)")
+    print(f"{'skenario':<14}{'baseline (s)':>13}{'sekarang (s)':>13}{'selisih':>9}  status")
+    for name, before, now, change, status in rows:
+        before_str = f"{before:.3f}" if before is not None else "-"
+        change_str = f"{change * 100:+.0f}%" if change is not None else "-"
+        print(f"{name:<14}{before_str:>13}{now:>13.3f}{change_str:>9}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--latency", type=float, default=0.02, help="round trip tambahan dalam detik")
+    parser.add_argument("--bandwidth", type=float, default=None, help="batas byte/detik per arah")
+    parser.add_argument("--backend", choices=available_backends(), default="paramiko")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=[name for name, _, _ in SCENARIOS],
+                        help="hanya jalankan skenario ini")
+    parser.add_argument("--output", default="bench_results.json", help="file hasil JSON")
+    parser.add_argument("--baseline", help="bandingkan dengan file hasil sebelumnya")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="selisih median yang dianggap melambat")
+    parser.add_argument("--save-baseline", action="store_true", help=f"simpan hasil sebagai {BASELINE}")
+    args = parser.parse_args()
+
+    results = run(args.scale, args.latency, args.bandwidth, args.backend, args.repeat, args.seed, args.only)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print_results(results)
+    print(f"Hasil ditulis ke {args.output}")
+
+    if args.save_baseline:
+        with open(BASELINE, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline disimpan ke {BASELINE}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # Jumlah pengulangan boleh beda; data dan jaringan harus sama
+        if {**baseline['config'], 'repeat': None} != {**results['config'], 'repeat': None}:
+            print("Peringatan: konfigurasi baseline berbeda, perbandingan mungkin tidak adil")
+        rows, regressions = compare(results, baseline, args.tolerance)
+        print_comparison(rows, baseline, args.tolerance)
+        if regressions:
+            print(f"{regressions} skenario melambat")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
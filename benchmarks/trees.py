@@ -0,0 +1,70 @@
+import io
+import os
+import random
+
+from PIL import Image
+
+# Pohon file sintetis untuk benchmark. Nama, ukuran dan isi ditentukan seed,
+# jadi setiap run (dan setiap mesin) memakai data yang sama.
+
+
+# Satu folder dengan banyak file kecil
+def make_wide(root, files, seed=0, max_size=4096):
+    rng = random.Random(seed)
+    path = os.path.join(root, "wide")
+    os.makedirs(path, exist_ok=True)
+    for i in range(files):
+        with open(os.path.join(path, f"file_{i:06d}.txt"), "wb") as f:
+            f.write(rng.randbytes(rng.randrange(max_size)))
+    return path
+
+
+# Pohon dengan kedalaman `depth`, `fanout` subfolder dan `files` file per folder
+def make_deep(root, depth, fanout, files, seed=0, max_size=1024):
+    rng = random.Random(seed)
+    top = os.path.join(root, "deep")
+    level = [top]
+    for current in range(depth + 1):
+        next_level = []
+        for path in level:
+            os.makedirs(path, exist_ok=True)
+            for i in range(files):
+                with open(os.path.join(path, f"data_{i:03d}.log"), "wb") as f:
+                    f.write(rng.randbytes(rng.randrange(max_size)))
+            if current < depth:
+                next_level += [os.path.join(path, f"dir_{i:02d}") for i in range(fanout)]
+        level = next_level
+    return top
+
+
+# Gambar JPEG/PNG dengan pola berbeda per file (semua di bawah batas
+# thumbnail penuh, jadi tiap thumbnail membaca seluruh file)
+def make_images(root, count, size=(800, 600), seed=0):
+    rng = random.Random(seed)
+    path = os.path.join(root, "images")
+    os.makedirs(path, exist_ok=True)
+    gradient = Image.linear_gradient("L").resize(size)
+    for i in range(count):
+        color = Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))
+        image = Image.composite(color, gradient.convert("RGB").rotate(rng.randrange(360)), gradient)
+        ext = "png" if i % 4 == 3 else "jpg"
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG" if ext == "png" else "JPEG", quality=90)
+        with open(os.path.join(path, f"img_{i:05d}.{ext}"), "wb") as f:
+            f.write(buffer.getvalue())
+    return path
+
+
+# File besar sparse: tidak memakan disk di sisi server, tapi tetap dikirim
+# utuh lewat SFTP
+def make_large(root, size):
+    path = os.path.join(root, "large.bin")
+    with open(path, "wb") as f:
+        f.truncate(size)
+    return path
+
+
+# Isi file yang akan diunggah: [(nama, bytes)]
+def make_upload_data(count, size, seed=0):
+    rng = random.Random(seed)
+    return [(f"upload_{i:05d}.bin", rng.randbytes(size)) for i in range(count)]
@@ -0,0 +1 @@
+# Komponen pendukung SSH File Manager (listing, transfer, cache, dll.)
@@ -0,0 +1,275 @@
+import posixpath
+import queue
+import select
+import shlex
+import threading
+import time
+import zipfile
+
+from sshfm.search import normalize_root, walk_tree
+
+# Ukuran potongan yang dibaca dari channel/file remote
+ARCHIVE_CHUNK = 256 * 1024
+# File yang dibaca bersamaan saat membangun zip lewat SFTP
+ARCHIVE_WORKERS = 4
+# Potongan yang boleh antre per file; memori ~ workers * PREFETCH_CHUNKS * ARCHIVE_CHUNK
+PREFETCH_CHUNKS = 4
+# Tanggal paling awal yang bisa disimpan di zip (1980-01-01)
+ZIP_EPOCH = 315532800
+
+
+class ArchiveCancelled(Exception):
+    pass
+
+
+# Progres satu archive yang sedang dialirkan; dibaca UI dari thread lain
+class ArchiveProgress:
+    def __init__(self, name, method):
+        self.name = name
+        self.method = method
+        self.status = "menunggu"
+        self.files = 0
+        self.bytes = 0
+        self.error = None
+        self.start_time = None
+        self.end_time = None
+        self._cancel = threading.Event()
+
+    def begin(self, status="mengalirkan"):
+        if self.start_time is None:
+            self.start_time = time.monotonic()
+        self.status = status
+
+    def finish(self, status="selesai", error=None):
+        self.status = status
+        self.error = error
+        self.end_time = time.monotonic()
+
+    def cancel(self):
+        self._cancel.set()
+
+    # Link tidak pernah dibuka sampai kedaluwarsa, jadi archive tidak akan dibuat
+    def expire(self):
+        if self.status == "menunggu":
+            self.cancel()
+            self.finish("kedaluwarsa", "Link kedaluwarsa sebelum dibuka, klik Download lagi untuk membuat link baru")
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def is_running(self):
+        return self.status in ("menunggu", "menelusuri", "mengalirkan")
+
+    def elapsed(self):
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.monotonic()) - self.start_time
+
+    def rate(self):
+        elapsed = self.elapsed()
+        return self.bytes / elapsed / (1024 * 1024) if elapsed else 0.0
+
+
+# Cek apakah server punya shell dengan tar
+def tar_available(ssh_client):
+    try:
+        stdin, stdout, stderr = ssh_client.exec_command("command -v tar", timeout=10)
+        return stdout.channel.recv_exit_status() == 0
+    except Exception:
+        return False
+
+
+# Alirkan folder remote sebagai tar dari perintah tar di server. Nama file
+# dari -v (stderr) dipakai untuk menghitung jumlah file.
+def stream_tar(ssh_client, path, progress, compress=False):
+    path = normalize_root(path)
+    parent, name = posixpath.split(path)
+    if not name:
+        parent, name = "/", "."
+    flags = "czvf" if compress else "cvf"
+    command = f"tar -C {shlex.quote(parent)} -{flags} - -- {shlex.quote(name)}"
+    channel = ssh_client.get_transport().open_session()
+    errors = []
+    pending = b""
+    try:
+        channel.exec_command(command)
+        progress.begin()
+        while True:
+            if progress.cancelled:
+                raise ArchiveCancelled()
+            got_data = False
+            while channel.recv_ready():
+                data = channel.recv(ARCHIVE_CHUNK)
+                progress.bytes += len(data)
+                got_data = True
+                yield data
+            while channel.recv_stderr_ready():
+                pending += channel.recv_stderr(ARCHIVE_CHUNK)
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    if line.startswith(b"tar: "):
+                        errors.append(line.decode("utf-8", errors="replace"))
+                    elif not line.endswith(b"/"):
+                        progress.files += 1
+                got_data = True
+            if channel.exit_status_ready() and not channel.recv_ready() and not channel.recv_stderr_ready():
+                break
+            if not got_data:
+                select.select([channel], [], [], 0.1)
+        exit_code = channel.recv_exit_status()
+        if exit_code != 0:
+            progress.finish("error", "; ".join(errors[-3:]) or f"tar exit code {exit_code}")
+        else:
+            progress.finish()
+    except (ArchiveCancelled, GeneratorExit):
+        progress.finish("dibatalkan")
+        raise
+    except Exception as e:
+        progress.finish("error", str(e))
+        raise
+    finally:
+        channel.close()
+
+
+# Tujuan tulis ZipFile yang tidak bisa di-seek; byte yang ditulis diambil generator
+class _ZipSink:
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+# Baca satu file remote ke antrean terbatas di thread latar
+class _FileReader:
+    def __init__(self, sftp_pool, path, size, progress):
+        self.queue = queue.Queue(maxsize=PREFETCH_CHUNKS)
+        self._thread = threading.Thread(target=self._run, args=(sftp_pool, path, size, progress), daemon=True)
+        self._thread.start()
+
+    def _run(self, sftp_pool, path, size, progress):
+        try:
+            with sftp_pool.channel("archive_read") as sftp:
+                with sftp.open(path, "rb") as remote:
+                    # Ukuran sudah diketahui dari listing, jadi tidak perlu stat lagi
+                    remote.prefetch(size)
+                    while not progress.cancelled:
+                        chunk = remote.read(ARCHIVE_CHUNK)
+                        if not chunk:
+                            break
+                        self._put(chunk, progress)
+            self._put(None, progress)
+        except Exception as e:
+            self._put(e, progress)
+
+    def _put(self, item, progress):
+        while not progress.cancelled:
+            try:
+                self.queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def chunks(self, progress):
+        while True:
+            try:
+                item = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                if progress.cancelled:
+                    raise ArchiveCancelled()
+                continue
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+# Alirkan folder remote sebagai zip (tanpa kompresi) dari pembacaan SFTP paralel.
+# Beberapa file berikutnya sudah dibaca selagi file sekarang ditulis, tapi
+# tiap file hanya menyimpan beberapa potongan, jadi memori tetap kecil.
+# Pembaca memegang channel selama browser lambat mengambil data, jadi paling
+# sedikit satu channel pool disisakan untuk listing, thumbnail dan job lain.
+def stream_zip(sftp_pool, path, progress, workers=ARCHIVE_WORKERS):
+    workers = max(1, min(workers, sftp_pool.max_channels - 1))
+    root = normalize_root(path)
+    base = posixpath.basename(root) or "root"
+    progress.begin("menelusuri")
+    try:
+        dirs, _, errors = walk_tree(sftp_pool, root, workers=workers)
+        files = []
+        folders = []
+        for item in dirs.values():
+            for entry in item['entries']:
+                (folders if entry['is_dir'] else files).append(entry)
+        files.sort(key=lambda e: e['path'])
+        folders.sort(key=lambda e: e['path'])
+        progress.begin()
+
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for entry in folders:
+                archive.writestr(_zip_info(root, base, entry, "/"), b"")
+            yield from sink.drain()
+
+            readers = {}
+            def start_reader(index):
+                if index < len(files) and index not in readers:
+                    readers[index] = _FileReader(sftp_pool, files[index]['path'], files[index]['size'], progress)
+
+            for index in range(min(workers, len(files))):
+                start_reader(index)
+            for index, entry in enumerate(files):
+                start_reader(index)
+                reader = readers.pop(index)
+                info = _zip_info(root, base, entry)
+                info.file_size = entry['size']
+                try:
+                    with archive.open(info, "w", force_zip64=True) as dest:
+                        for chunk in reader.chunks(progress):
+                            dest.write(chunk)
+                            progress.bytes += len(chunk)
+                            yield from sink.drain()
+                except IOError as e:
+                    # File yang hilang atau tanpa izin dilewati, archive tetap jalan
+                    errors.append(f"{entry['path']}: {e}")
+                progress.files += 1
+                start_reader(index + workers)
+                yield from sink.drain()
+        yield from sink.drain()
+        progress.finish("selesai", "; ".join(errors[:3]) if errors else None)
+    except (ArchiveCancelled, GeneratorExit):
+        progress.cancel()
+        progress.finish("dibatalkan")
+        raise
+    except Exception as e:
+        progress.cancel()
+        progress.finish("error", str(e))
+        raise
+
+
+def _zip_info(root, base, entry, suffix=""):
+    name = posixpath.join(base, posixpath.relpath(entry['path'], root)) + suffix
+    info = zipfile.ZipInfo(name, time.localtime(max(entry['mtime'], ZIP_EPOCH))[:6])
+    info.compress_type = zipfile.ZIP_STORED
+    return info
+
+
+# Pilih metode: tar lewat exec jika ada shell, jika tidak zip lewat SFTP.
+# Hasilnya (nama file, content type, generator byte, progress).
+def open_archive(sftp_pool, ssh_client, path, method="auto", workers=ARCHIVE_WORKERS):
+    name = posixpath.basename(normalize_root(path)) or "root"
+    if method == "tar" or (method == "auto" and tar_available(ssh_client)):
+        progress = ArchiveProgress(name + ".tar", "tar")
+        return progress.name, "application/x-tar", stream_tar(ssh_client, path, progress), progress
+    progress = ArchiveProgress(name + ".zip", "zip")
+    return progress.name, "application/zip", stream_zip(sftp_pool, path, progress, workers), progress
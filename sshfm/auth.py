@@ -0,0 +1,182 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+# Cost factor bcrypt untuk hash baru; hash lama dengan cost lain di-hash
+# ulang saat login berhasil
+BCRYPT_ROUNDS = int(os.environ.get("SSHFM_BCRYPT_ROUNDS", "12"))
+# Proses hashing; sisakan CPU untuk server Streamlit
+HASH_WORKERS = int(os.environ.get("SSHFM_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+# Permintaan hash yang boleh antre sebelum ditolak (backpressure)
+MAX_PENDING = HASH_WORKERS * 4
+# Lama menunggu giliran antrean sebelum menyerah (detik)
+QUEUE_TIMEOUT = 5
+# Proses hashing berjalan dengan prioritas lebih rendah dari proses UI
+HASH_NICE = 10
+# Batas percobaan: gagal per username, dan semua percobaan per IP
+USER_FAILURES = (5, 300)
+IP_ATTEMPTS = (30, 60)
+
+
+class AuthBusy(Exception):
+    pass
+
+
+class Throttled(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Terlalu banyak percobaan, coba lagi dalam {int(retry_after) + 1} detik")
+        self.retry_after = retry_after
+
+
+def _lower_priority():
+    if hasattr(os, "nice"):
+        try:
+            os.nice(HASH_NICE)
+        except OSError:
+            pass
+
+
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def _check_password(password, hashed):
+    return bcrypt.checkpw(password.encode(), hashed.encode())
+
+
+# Cost factor dari hash bcrypt ($2b$12$...), None jika formatnya tidak dikenal
+def hash_rounds(hashed):
+    parts = hashed.split("$")
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+# bcrypt di pool proses terbatas. Thread skrip Streamlit hanya menunggu
+# hasilnya; jika antrean penuh, permintaan ditolak dengan AuthBusy alih-alih
+# menumpuk dan menghabiskan CPU semua sesi.
+class PasswordHasher:
+    def __init__(self, workers=HASH_WORKERS, max_pending=MAX_PENDING, rounds=BCRYPT_ROUNDS,
+                 queue_timeout=QUEUE_TIMEOUT):
+        self.workers = workers
+        self.rounds = rounds
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.max_pending = max_pending
+        # spawn: aman dipanggil dari server Streamlit yang multi-thread
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_lower_priority,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise AuthBusy("Server sedang sibuk memproses login, coba lagi sebentar")
+        with self._lock:
+            self.pending += 1
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self.pending -= 1
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(_hash_password, password, self.rounds)
+
+    def verify(self, password, hashed):
+        return self._run(_check_password, password, hashed)
+
+    def needs_rehash(self, hashed):
+        return hash_rounds(hashed) != self.rounds
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Batas percobaan per key dalam jendela waktu geser
+class AttemptLimiter:
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self._hits = {}
+        self._lock = threading.Lock()
+
+    def _recent(self, key, now):
+        hits = self._hits.get(key)
+        if hits is None:
+            return deque()
+        while hits and now - hits[0] > self.window:
+            hits.popleft()
+        if not hits:
+            del self._hits[key]
+        return hits
+
+    # Detik sampai key boleh mencoba lagi; 0 jika belum mencapai batas
+    def retry_after(self, key):
+        now = time.monotonic()
+        with self._lock:
+            hits = self._recent(key, now)
+            if len(hits) < self.limit:
+                return 0.0
+            return self.window - (now - hits[0])
+
+    def hit(self, key):
+        with self._lock:
+            self._hits.setdefault(key, deque()).append(time.monotonic())
+
+    def reset(self, key):
+        with self._lock:
+            self._hits.pop(key, None)
+
+
+# Login/registrasi dengan hashing di pool proses dan pembatasan percobaan
+class Authenticator:
+    def __init__(self, store, hasher=None, user_failures=USER_FAILURES, ip_attempts=IP_ATTEMPTS):
+        self.store = store
+        self.hasher = hasher or PasswordHasher()
+        self.user_failures = AttemptLimiter(*user_failures)
+        self.ip_attempts = AttemptLimiter(*ip_attempts)
+
+    def _check_limits(self, username, ip):
+        wait = max(self.user_failures.retry_after(username),
+                   self.ip_attempts.retry_after(ip) if ip else 0.0)
+        if wait > 0:
+            raise Throttled(wait)
+        if ip:
+            self.ip_attempts.hit(ip)
+
+    # True jika cocok. Hash dengan cost lama diganti diam-diam ke cost sekarang.
+    def login(self, username, password, ip=None):
+        self._check_limits(username, ip)
+        hashed = self.store.get_hash(username)
+        if hashed is None or not self.hasher.verify(password, hashed):
+            self.user_failures.hit(username)
+            return False
+        self.user_failures.reset(username)
+        if self.hasher.needs_rehash(hashed):
+            # Password sudah cocok; jika pool sibuk, rehash dicoba lagi di login berikutnya
+            try:
+                self.store.update_hash(username, self.hasher.hash(password))
+            except Exception:
+                pass
+        return True
+
+    # False jika username sudah dipakai
+    def register(self, username, password, ip=None):
+        self._check_limits(username, ip)
+        if self.store.exists(username):
+            return False
+        return self.store.add(username, self.hasher.hash(password))
+
+    def close(self):
+        self.hasher.close()
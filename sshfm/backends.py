@@ -0,0 +1,412 @@
+import asyncio
+import importlib.util
+import os
+import posixpath
+import stat as stat_module
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import paramiko
+
+from sshfm.content_cache import CHUNK_SIZE, copy_remote_file
+from sshfm.listing import entry_from_fields, iter_file_list, make_entry
+from sshfm.metrics import OpStats
+from sshfm.profiles import DEFAULT_PROFILE, connect_options, get_profile, sftp_options
+from sshfm.sftp_pool import SFTPPool
+from sshfm.transfer import remote_part_path, upload_buffer
+
+# Backend SSH/SFTP yang tersedia; asyncssh opsional (pip install asyncssh)
+BACKENDS = ("paramiko", "asyncssh")
+DEFAULT_BACKEND = os.environ.get("SSHFM_BACKEND", "paramiko")
+# Permintaan yang boleh berjalan bersamaan dalam map()
+CONCURRENCY = 64
+# Potongan write yang dikirim sebelum menunggu balasan (backend asyncssh)
+WRITE_AHEAD = 16
+
+
+def available_backends():
+    return [name for name in BACKENDS
+            if name == "paramiko" or importlib.util.find_spec(name) is not None]
+
+
+# Antarmuka bersama kedua backend. Semua method sinkron sehingga bisa dipanggil
+# langsung dari skrip Streamlit; error SFTP muncul sebagai IOError.
+#   listdir(path, on_progress)      -> daftar entri (dict seperti make_entry);
+#                                      on_progress(entri yang sudah diterima)
+#   stat(path)                      -> satu entri
+#   read(path, offset, length)      -> bytes
+#   write(path, data, on_progress)  -> jumlah byte
+#   download(path, fileobj, on_progress) -> jumlah byte
+#   mkdir(path), remove(path)
+#   exec(command, timeout)          -> (exit code, stdout, stderr)
+#   map(op, args_list)              -> [(hasil, error)] dijalankan bersamaan
+class SSHBackend:
+    name = None
+
+    def __init__(self, stats=None):
+        self.stats = stats or OpStats()
+
+    def map(self, op, args_list, concurrency=CONCURRENCY):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# Backend paramiko: tiap operasi meminjam channel dari SFTPPool, konkurensi
+# dibatasi jumlah channel dan dijalankan dengan satu thread per operasi.
+class ParamikoBackend(SSHBackend):
+    name = "paramiko"
+
+    def __init__(self, sftp_pool, ssh_client=None, owns_client=False):
+        super().__init__(sftp_pool.stats)
+        self.sftp_pool = sftp_pool
+        self.ssh_client = ssh_client or sftp_pool.ssh_client
+        self.owns_client = owns_client
+
+    @classmethod
+    def connect(cls, host, user, key_path=None, password=None, port=22, profile=DEFAULT_PROFILE,
+                timeout=10, max_channels=6, stats=None):
+        stats = stats or OpStats(host=host)
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        with stats.timed("connect"):
+            ssh.connect(hostname=host, port=port, username=user, password=password,
+                        key_filename=os.path.expanduser(key_path) if key_path else None,
+                        timeout=timeout, **connect_options(profile))
+        pool = SFTPPool(ssh, max_channels=max_channels, stats=stats, **sftp_options(profile))
+        return cls(pool, ssh, owns_client=True)
+
+    def listdir(self, path, on_progress=None):
+        entries = []
+        with self.sftp_pool.channel("listdir") as sftp:
+            for entry in iter_file_list(sftp, path):
+                entries.append(entry)
+                if on_progress:
+                    on_progress(entries)
+        return entries
+
+    def stat(self, path):
+        with self.sftp_pool.channel("stat") as sftp:
+            attr = sftp.stat(path)
+        attr.filename = posixpath.basename(path)
+        return make_entry(posixpath.dirname(path), attr)
+
+    def read(self, path, offset=0, length=None):
+        with self.sftp_pool.channel("read") as sftp:
+            with sftp.open(path, "rb") as f:
+                if offset:
+                    f.seek(offset)
+                # Dengan length diketahui, prefetch tidak perlu stat untuk ukuran file
+                f.prefetch(None if length is None else offset + length)
+                data = f.read(length)
+        self.stats.add_bytes("read", len(data))
+        return data
+
+    def write(self, path, data, on_progress=None):
+        with self.sftp_pool.channel("write") as sftp:
+            written = upload_buffer(sftp, data, path, on_progress=on_progress)
+        self.stats.add_bytes("write", written)
+        return written
+
+    def download(self, path, fileobj, on_progress=None):
+        with self.sftp_pool.channel("download") as sftp:
+            copied = copy_remote_file(sftp, path, fileobj, on_progress=on_progress)
+        self.stats.add_bytes("download", copied)
+        return copied
+
+    def mkdir(self, path):
+        with self.sftp_pool.channel("mkdir") as sftp:
+            sftp.mkdir(path)
+
+    def remove(self, path):
+        with self.sftp_pool.channel("remove") as sftp:
+            sftp.remove(path)
+
+    def exec(self, command, timeout=None):
+        with self.stats.timed("exec"):
+            stdin, stdout, stderr = self.ssh_client.exec_command(command, timeout=timeout)
+            output = stdout.read()
+            error = stderr.read()
+            exit_code = stdout.channel.recv_exit_status()
+        self.stats.add_bytes("exec", len(output) + len(error))
+        return exit_code, output.decode("utf-8", errors="replace"), error.decode("utf-8", errors="replace")
+
+    def map(self, op, args_list, concurrency=CONCURRENCY):
+        fn = getattr(self, op)
+
+        def call(args):
+            try:
+                return fn(*args), None
+            except Exception as e:
+                return None, str(e)
+
+        workers = max(1, min(concurrency, self.sftp_pool.max_channels, len(args_list)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backend") as executor:
+            return list(executor.map(call, args_list))
+
+    def close(self):
+        self.sftp_pool.close()
+        if self.owns_client:
+            self.ssh_client.close()
+
+
+# Backend asyncssh: satu koneksi dan satu channel SFTP dengan banyak
+# permintaan sekaligus di satu event loop (thread latar). Ribuan stat/read
+# bersamaan tidak butuh ribuan thread maupun channel.
+class AsyncSSHBackend(SSHBackend):
+    name = "asyncssh"
+
+    def __init__(self, host, user, key_path=None, password=None, port=22, profile=DEFAULT_PROFILE,
+                 timeout=10, stats=None):
+        super().__init__(stats or OpStats(host=host))
+        try:
+            import asyncssh
+        except ImportError:
+            raise ImportError("Backend asyncssh butuh paket asyncssh (pip install asyncssh)")
+        self._asyncssh = asyncssh
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True, name="asyncssh")
+        self._thread.start()
+        try:
+            self._conn, self._sftp = self._call(self._connect(host, user, key_path, password, port,
+                                                              profile, timeout), "connect")
+        except BaseException:
+            self._stop_loop()
+            raise
+
+    @classmethod
+    def connect(cls, host, user, key_path=None, password=None, port=22, profile=DEFAULT_PROFILE,
+                timeout=10, stats=None):
+        return cls(host, user, key_path, password, port, profile, timeout, stats)
+
+    def _algorithms(self, profile):
+        from asyncssh.encryption import get_encryption_algs
+        from asyncssh.mac import get_mac_algs
+        options = {'compression_algs': ["zlib@openssh.com", "zlib", "none"] if profile['compress'] else ["none"]}
+        if profile['ciphers']:
+            supported = {alg.decode() for alg in get_encryption_algs()}
+            ciphers = [name for name in profile['ciphers'] if name in supported]
+            if ciphers:
+                options['encryption_algs'] = ciphers
+        if profile['macs']:
+            supported = {alg.decode() for alg in get_mac_algs()}
+            macs = [name for name in profile['macs'] if name in supported]
+            if macs:
+                options['mac_algs'] = macs
+        return options
+
+    async def _connect(self, host, user, key_path, password, port, profile, timeout):
+        profile = get_profile(profile)
+        conn = await self._asyncssh.connect(
+            host, port=port, username=user, password=password,
+            client_keys=[os.path.expanduser(key_path)] if key_path else None,
+            known_hosts=None, connect_timeout=timeout,
+            window=profile['window_size'], max_pktsize=profile['max_packet_size'],
+            **self._algorithms(profile))
+        sftp = await conn.start_sftp_client()
+        return conn, sftp
+
+    # Jalankan coroutine di event loop dan tunggu hasilnya dari thread pemanggil
+    def _call(self, coro, op):
+        return asyncio.run_coroutine_threadsafe(self._timed(coro, op), self._loop).result()
+
+    async def _timed(self, coro, op):
+        start = time.perf_counter()
+        error = False
+        try:
+            return await coro
+        except self._asyncssh.SFTPError as e:
+            error = True
+            raise IOError(e.reason or str(e)) from None
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.stats.record(op, time.perf_counter() - start, error)
+
+    async def _listdir(self, path):
+        entries = []
+        async for item in self._sftp.scandir(path):
+            if item.filename in (".", ".."):
+                continue
+            attrs = item.attrs
+            if attrs.permissions is not None and stat_module.S_ISLNK(attrs.permissions):
+                # Ikuti symlink seperti stat(); link rusak dilewati
+                try:
+                    attrs = await self._sftp.stat(posixpath.join(path, item.filename))
+                except self._asyncssh.SFTPError:
+                    continue
+            entries.append(self._entry(path, item.filename, attrs))
+        return entries
+
+    @staticmethod
+    def _entry(path, name, attrs):
+        is_dir = attrs.permissions is not None and stat_module.S_ISDIR(attrs.permissions)
+        return entry_from_fields(path, name, attrs.size or 0, attrs.mtime or 0, is_dir)
+
+    async def _stat(self, path):
+        attrs = await self._sftp.stat(path)
+        return self._entry(posixpath.dirname(path), posixpath.basename(path), attrs)
+
+    async def _read(self, path, offset=0, length=None):
+        async with self._sftp.open(path, "rb") as f:
+            data = await f.read(-1 if length is None else length, offset)
+        self.stats.add_bytes("read", len(data))
+        return data
+
+    async def _download(self, path, fileobj):
+        copied = 0
+        async with self._sftp.open(path, "rb") as f:
+            while True:
+                chunk = await f.read(CHUNK_SIZE * 4, copied)
+                if not chunk:
+                    self.stats.add_bytes("download", copied)
+                    return copied
+                fileobj.write(chunk)
+                copied += len(chunk)
+
+    def listdir(self, path, on_progress=None):
+        entries = self._call(self._listdir(path), "listdir")
+        if on_progress:
+            on_progress(entries)
+        return entries
+
+    def stat(self, path):
+        return self._call(self._stat(path), "stat")
+
+    def read(self, path, offset=0, length=None):
+        return self._call(self._read(path, offset, length), "read")
+
+    # Potongan ditulis paralel (WRITE_AHEAD sekaligus) ke file sementara yang
+    # menggantikan path setelah selesai; on_progress dipanggil dari thread
+    # pemanggil agar aman untuk elemen Streamlit
+    def write(self, path, data, on_progress=None):
+        view = memoryview(data).cast("B")
+        total = len(view)
+        part_path = remote_part_path(path)
+        f = self._call(self._sftp.open(part_path, "wb"), "open")
+        start = time.perf_counter()
+        pending = []
+        offset = 0
+        done = 0
+        try:
+            while offset < total or pending:
+                while offset < total and len(pending) < WRITE_AHEAD:
+                    chunk = bytes(view[offset:offset + CHUNK_SIZE])
+                    pending.append((asyncio.run_coroutine_threadsafe(f.write(chunk, offset), self._loop), len(chunk)))
+                    offset += len(chunk)
+                future, size = pending.pop(0)
+                try:
+                    future.result()
+                except self._asyncssh.SFTPError as e:
+                    raise IOError(e.reason or str(e)) from None
+                done += size
+                if on_progress:
+                    on_progress(done)
+            self._call(f.close(), "close")
+            self._call(self._replace(part_path, path), "rename")
+        except BaseException:
+            for future, _ in pending:
+                future.cancel()
+            self._call(self._discard(f, part_path), "remove")
+            raise
+        finally:
+            self.stats.record("write", time.perf_counter() - start, nbytes=done)
+        if on_progress and total == 0:
+            on_progress(0)
+        return total
+
+    def download(self, path, fileobj, on_progress=None):
+        copied = self._call(self._download(path, fileobj), "download")
+        if on_progress:
+            on_progress(copied)
+        return copied
+
+    async def _replace(self, part_path, path):
+        try:
+            await self._sftp.posix_rename(part_path, path)
+        except self._asyncssh.SFTPOpUnsupported:
+            try:
+                await self._sftp.remove(path)
+            except self._asyncssh.SFTPError:
+                pass
+            await self._sftp.rename(part_path, path)
+
+    # File sementara dihapus setelah gagal; error di sini tidak menutupi error asli
+    async def _discard(self, f, part_path):
+        try:
+            await f.close()
+            await self._sftp.remove(part_path)
+        except (self._asyncssh.Error, OSError):
+            pass
+
+    # Coroutine _mkdir/_remove juga dipakai map("mkdir"/"remove")
+    async def _mkdir(self, path):
+        await self._sftp.mkdir(path)
+
+    async def _remove(self, path):
+        await self._sftp.remove(path)
+
+    def mkdir(self, path):
+        self._call(self._mkdir(path), "mkdir")
+
+    def remove(self, path):
+        self._call(self._remove(path), "remove")
+
+    async def _exec(self, command, timeout):
+        result = await self._conn.run(command, check=False, timeout=timeout,
+                                      encoding="utf-8", errors="replace")
+        self.stats.add_bytes("exec", len(result.stdout or "") + len(result.stderr or ""))
+        return result.exit_status, result.stdout or "", result.stderr or ""
+
+    def exec(self, command, timeout=None):
+        return self._call(self._exec(command, timeout), "exec")
+
+    # Semua operasi dikirim sekaligus di satu channel, dibatasi semaphore
+    def map(self, op, args_list, concurrency=CONCURRENCY):
+        coroutine_fn = getattr(self, "_" + op)
+
+        async def run_all():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def call(args):
+                async with semaphore:
+                    try:
+                        return await self._timed(coroutine_fn(*args), op), None
+                    except Exception as e:
+                        return None, str(e)
+
+            return await asyncio.gather(*(call(args) for args in args_list))
+
+        return asyncio.run_coroutine_threadsafe(run_all(), self._loop).result()
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+    def close(self):
+        async def shutdown():
+            self._sftp.exit()
+            self._conn.close()
+            await self._conn.wait_closed()
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(10)
+        except Exception:
+            pass
+        self._stop_loop()
+
+
+# Buka backend sesuai nama. Untuk paramiko, ssh_client/sftp_pool yang sudah
+# ada dipakai ulang jika diberikan.
+def open_backend(name, host, user, key_path=None, password=None, port=22, profile=DEFAULT_PROFILE,
+                 sftp_pool=None, stats=None):
+    if name == "asyncssh":
+        return AsyncSSHBackend.connect(host, user, key_path, password, port, profile,
+                                       stats=stats or (sftp_pool.stats if sftp_pool else None))
+    if name != "paramiko":
+        raise ValueError(f"Backend tidak dikenal: {name}")
+    if sftp_pool is not None:
+        return ParamikoBackend(sftp_pool)
+    return ParamikoBackend.connect(host, user, key_path, password, port, profile, stats=stats)
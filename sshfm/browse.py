@@ -0,0 +1,56 @@
+import fnmatch
+import math
+
+FILE_TYPES = ["folder", "image", "document", "video", "other"]
+PAGE_SIZES = [30, 60, 120, 300]
+
+SORT_KEYS = {
+    "Nama": lambda f: f['name'].lower(),
+    "Ukuran": lambda f: f['size'],
+    "Tanggal": lambda f: f['mtime'],
+    "Tipe": lambda f: (f['extension'], f['name'].lower()),
+}
+
+
+def entry_type(entry):
+    return "folder" if entry['is_dir'] else entry['type']
+
+
+# Filter berdasarkan nama (substring atau glob), ekstensi dan tipe
+def filter_entries(entries, name_query="", extensions=None, types=None):
+    query = name_query.strip().lower()
+    is_glob = any(c in query for c in "*?[")
+    result = []
+    for entry in entries:
+        name = entry['name'].lower()
+        if query:
+            if is_glob and not fnmatch.fnmatchcase(name, query):
+                continue
+            if not is_glob and query not in name:
+                continue
+        if extensions and entry['extension'] not in extensions:
+            continue
+        if types and entry_type(entry) not in types:
+            continue
+        result.append(entry)
+    return result
+
+
+# Urutkan dengan folder selalu di atas
+def sort_entries(entries, sort_by="Nama", descending=False):
+    key = SORT_KEYS[sort_by]
+    dirs = sorted((e for e in entries if e['is_dir']), key=key, reverse=descending)
+    files = sorted((e for e in entries if not e['is_dir']), key=key, reverse=descending)
+    return dirs + files
+
+
+def page_count(total, page_size):
+    return max(1, math.ceil(total / page_size))
+
+
+# Potong satu halaman; nomor halaman dimulai dari 1 dan dijepit ke rentang valid
+def paginate(entries, page, page_size):
+    pages = page_count(len(entries), page_size)
+    page = min(max(1, page), pages)
+    start = (page - 1) * page_size
+    return entries[start:start + page_size], page, pages
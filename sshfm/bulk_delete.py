@@ -0,0 +1,328 @@
+import posixpath
+import stat as stat_module
+import threading
+import time
+
+from paramiko import SFTPAttributes
+from paramiko.sftp import CMD_ATTRS, CMD_LSTAT, CMD_REMOVE, CMD_RMDIR, CMD_STATUS
+
+from sshfm.remote_copy import command_available
+from sshfm.search import normalize_root, walk_tree
+
+# Request SFTP yang boleh menunggu balasan sekaligus di satu channel
+PIPELINE_WINDOW = 64
+# "auto" memakai satu `rm` lewat exec jika server punya shell, selain itu SFTP
+DELETE_METHODS = ("auto", "rm", "sftp")
+
+
+class DeleteCancelled(Exception):
+    pass
+
+
+# Penampung balasan request yang dikirim tanpa ditunggu satu per satu
+class _Replies:
+    def __init__(self):
+        self.replies = {}
+
+    def _async_response(self, t, msg, num):
+        self.replies[num] = (t, msg)
+
+
+def _reply(sftp, t, msg):
+    if t == CMD_ATTRS:
+        return SFTPAttributes._from_msg(msg), None
+    if t == CMD_STATUS:
+        try:
+            sftp._convert_status(msg)
+            return None, None
+        except (IOError, EOFError) as e:
+            return None, e.strerror or str(e)
+    return None, f"balasan SFTP tak terduga ({t})"
+
+
+# Kirim banyak request satu-path (REMOVE/RMDIR/LSTAT) di satu channel tanpa
+# menunggu balasan tiap request; paling banyak `window` yang belum dibalas.
+# Hasilnya [(atribut atau None, error atau None)] sesuai urutan paths.
+def pipelined(sftp, command, paths, window=PIPELINE_WINDOW, on_reply=None, cancel=None):
+    collector = _Replies()
+    results = [None] * len(paths)
+    pending = {}
+    index = 0
+    while index < len(paths) or pending:
+        while index < len(paths) and len(pending) < window:
+            if cancel is not None and cancel.is_set():
+                break
+            pending[sftp._async_request(collector, command, paths[index])] = index
+            index += 1
+        if not pending:
+            break
+        sftp._read_response()
+        for num in [num for num in collector.replies if num in pending]:
+            t, msg = collector.replies.pop(num)
+            position = pending.pop(num)
+            results[position] = _reply(sftp, t, msg)
+            if on_reply:
+                on_reply(position, results[position])
+    return results
+
+
+# Satu path yang dihapus beserta hasilnya
+class DeleteItem:
+    def __init__(self, path):
+        self.path = normalize_root(path)
+        self.is_dir = False
+        self.entries = 0
+        self.removed = 0
+        self.status = "menunggu"
+        self.error = None
+
+
+# Hapus banyak file/folder sekaligus di thread latar. Lewat SFTP, semua
+# REMOVE dikirim dipipeline di satu channel, lalu RMDIR per kedalaman dari
+# yang terdalam. Lewat exec, semua path dikirim ke satu `xargs -0 rm` di
+# server. Hasil per path selalu dicek ulang dengan LSTAT.
+class BulkDelete:
+    def __init__(self, sftp_pool, paths, recursive=False, method="auto", ssh_client=None,
+                 window=PIPELINE_WINDOW):
+        if method not in DELETE_METHODS:
+            raise ValueError(f"Metode hapus tidak dikenal: {method}")
+        self.sftp_pool = sftp_pool
+        self.ssh_client = ssh_client or sftp_pool.ssh_client
+        self.items = [DeleteItem(path) for path in paths]
+        self.recursive = recursive
+        self.method = method
+        self.window = window
+        self.used_method = None
+        self.status = "menunggu"
+        self.error = None
+        self.start_time = None
+        self.end_time = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.status = "menghapus"
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            targets = self._classify()
+            if targets:
+                if self.method == "rm" or (self.method == "auto" and command_available(self.ssh_client, "rm")):
+                    self.used_method = "rm"
+                    self._delete_rm(targets)
+                else:
+                    self.used_method = "sftp"
+                    self._delete_sftp(targets)
+            self.status = "dibatalkan" if self._cancel.is_set() else "selesai"
+        except DeleteCancelled:
+            self.status = "dibatalkan"
+            for item in self.items:
+                if item.status == "menunggu":
+                    item.status = "dibatalkan"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "gagal"
+            for item in self.items:
+                if item.status == "menunggu":
+                    item.status = "gagal"
+                    item.error = self.error
+        self.end_time = time.perf_counter()
+
+    # LSTAT semua path: yang tidak ada gagal, folder tanpa mode rekursif hanya
+    # dihapus jika kosong (RMDIR)
+    def _classify(self):
+        selected = {item.path for item in self.items} - {"/"}
+        for item in self.items:
+            if item.path == "/":
+                item.status = "gagal"
+                item.error = "root tidak boleh dihapus"
+            elif self.recursive:
+                # Path di dalam folder lain yang dipilih ikut terhapus bersamanya
+                parent = posixpath.dirname(item.path)
+                while parent != "/" and parent not in selected:
+                    parent = posixpath.dirname(parent)
+                if parent in selected and parent != item.path:
+                    item.status = "dilewati"
+                    item.error = f"termasuk dalam {parent}"
+        candidates = [item for item in self.items if item.status == "menunggu"]
+        with self.sftp_pool.channel("delete_stat") as sftp:
+            results = pipelined(sftp, CMD_LSTAT, [item.path for item in candidates], self.window)
+        targets = []
+        for item, (attr, error) in zip(candidates, results):
+            if error:
+                item.status = "gagal"
+                item.error = error
+                continue
+            item.is_dir = stat_module.S_ISDIR(attr.st_mode)
+            item.entries = 1
+            targets.append(item)
+        return targets
+
+    def _set_result(self, item, error):
+        if error:
+            item.status = "gagal"
+            item.error = item.error or error
+        else:
+            item.status = "berhasil"
+            with self._lock:
+                item.removed = item.entries
+
+    # Satu `xargs -0 rm` untuk semua path (daftar lewat stdin, tanpa batas
+    # panjang perintah). Jika rm gagal, path yang masih ada dicek ulang dan
+    # pesan error rm dicocokkan ke path-nya.
+    def _delete_rm(self, targets):
+        if self.recursive:
+            paths = [item.path for item in targets]
+            flags = "-rf"
+        else:
+            paths = [item.path for item in targets if not item.is_dir]
+            flags = "-f"
+        errors = []
+        code = 0
+        if paths:
+            with self.sftp_pool.stats.timed("delete_rm"):
+                stdin, stdout, stderr = self.ssh_client.exec_command(f"xargs -0 rm {flags} --")
+                stdin.write(b"\0".join(path.encode() for path in paths))
+                stdin.channel.shutdown_write()
+                errors = stderr.read().decode(errors="replace").splitlines()
+                code = stdout.channel.recv_exit_status()
+        if not self.recursive:
+            self._rmdir_items([item for item in targets if item.is_dir])
+        if code == 0 and not errors:
+            for item in targets:
+                if item.status == "menunggu":
+                    self._set_result(item, None)
+            return
+        with self.sftp_pool.channel("delete_stat") as sftp:
+            results = pipelined(sftp, CMD_LSTAT, [item.path for item in targets], self.window)
+        for item, (attr, error) in zip(targets, results):
+            if item.status != "menunggu":
+                continue
+            if attr is None:
+                self._set_result(item, None)
+                continue
+            matched = [line for line in errors if item.path in line]
+            self._set_result(item, matched[0] if matched else "masih ada setelah rm")
+
+    # Folder ditelusuri dulu (rekursif), lalu semua file di semua item
+    # dihapus dalam satu aliran REMOVE, disusul RMDIR dari folder terdalam
+    def _delete_sftp(self, targets):
+        files = []
+        dirs = []
+        for item in targets:
+            if not item.is_dir:
+                files.append((item.path, item))
+                continue
+            if not self.recursive:
+                continue
+            tree, counts, walk_errors = walk_tree(self.sftp_pool, item.path)
+            if walk_errors:
+                item.error = walk_errors[0]
+            for info in tree.values():
+                for entry in info['entries']:
+                    if not entry['is_dir']:
+                        files.append((entry['path'], item))
+            dirs += [(path, item) for path in tree]
+            item.entries = sum(len(info['entries']) for info in tree.values()) + 1
+            if self._cancel.is_set():
+                raise DeleteCancelled()
+
+        failed = {}
+
+        def record(batch):
+            def on_reply(position, result):
+                path, item = batch[position]
+                if result[1]:
+                    failed.setdefault(item.path, f"{path}: {result[1]}")
+                elif item.is_dir:
+                    with self._lock:
+                        item.removed += 1
+            return on_reply
+
+        with self.sftp_pool.channel("delete") as sftp:
+            pipelined(sftp, CMD_REMOVE, [path for path, _ in files], self.window,
+                      record(files), self._cancel)
+            by_depth = {}
+            for path, item in dirs:
+                by_depth.setdefault(path.count("/"), []).append((path, item))
+            for depth in sorted(by_depth, reverse=True):
+                if self._cancel.is_set():
+                    break
+                batch = by_depth[depth]
+                pipelined(sftp, CMD_RMDIR, [path for path, _ in batch], self.window,
+                          record(batch), self._cancel)
+
+        if not self.recursive and not self._cancel.is_set():
+            self._rmdir_items([item for item in targets if item.is_dir])
+
+        remaining = [item for item in targets if item.status == "menunggu"]
+        if self._cancel.is_set():
+            # Sebagian request belum dikirim; path yang masih ada berarti dibatalkan
+            with self.sftp_pool.channel("delete_stat") as sftp:
+                results = pipelined(sftp, CMD_LSTAT, [item.path for item in remaining], self.window)
+            for item, (attr, _) in zip(remaining, results):
+                if attr is not None and item.path not in failed:
+                    item.status = "dibatalkan"
+        for item in remaining:
+            if item.status == "menunggu":
+                self._set_result(item, failed.get(item.path))
+
+    def _rmdir_items(self, items):
+        if not items:
+            return
+        with self.sftp_pool.channel("delete") as sftp:
+            results = pipelined(sftp, CMD_RMDIR, [item.path for item in items], self.window)
+        for item, (_, error) in zip(items, results):
+            self._set_result(item, error and f"folder tidak kosong atau tidak bisa dihapus ({error})")
+
+    # Request yang sudah dikirim tetap diproses server; sisanya tidak dikirim
+    def cancel(self):
+        self._cancel.set()
+
+    def is_running(self):
+        return self.status == "menghapus"
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_running()
+
+    def done_count(self):
+        with self._lock:
+            return sum(item.removed for item in self.items)
+
+    def total_count(self):
+        with self._lock:
+            return sum(item.entries for item in self.items)
+
+    def elapsed(self):
+        end = self.end_time or time.perf_counter()
+        return end - self.start_time if self.start_time else 0.0
+
+    def rows(self):
+        return [{
+            'path': item.path,
+            'tipe': "folder" if item.is_dir else "file",
+            'status': item.status,
+            'entri dihapus': item.removed,
+            'error': item.error or ""
+        } for item in self.items]
+
+    def summary(self):
+        counts = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return {
+            'items': len(self.items),
+            'succeeded': counts.get("berhasil", 0),
+            'skipped': counts.get("dilewati", 0),
+            'failed': counts.get("gagal", 0),
+            'removed': self.done_count(),
+            'method': self.used_method,
+            'seconds': self.elapsed()
+        }
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+# Ukuran potongan baca saat menyalin file remote ke cache
+CHUNK_SIZE = 256 * 1024
+# Batas total isi cache sebelum file yang paling lama tidak dipakai dibuang
+MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def default_cache_dir(name):
+    return os.path.join(tempfile.gettempdir(), "sshfm_cache", name)
+
+
+# Salin file remote ke file lokal per potongan, memori tetap kecil
+def copy_remote_file(sftp, remote_path, fileobj, chunk_size=CHUNK_SIZE, on_progress=None):
+    copied = 0
+    with sftp.open(remote_path, "rb") as remote:
+        remote.prefetch()
+        while True:
+            chunk = remote.read(chunk_size)
+            if not chunk:
+                break
+            fileobj.write(chunk)
+            copied += len(chunk)
+            if on_progress:
+                on_progress(copied)
+    return copied
+
+
+# Cache isi file remote di disk lokal, valid selama (size, mtime) sama
+class ContentCache:
+    def __init__(self, root=None, max_bytes=MAX_BYTES):
+        self.root = root or default_cache_dir("content")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _paths(self, host, remote_path):
+        key = hashlib.sha256(f"{host}\0{remote_path}".encode()).hexdigest()
+        base = os.path.join(self.root, key)
+        return base + ".data", base + ".json"
+
+    # Path lokal jika isi cache masih cocok dengan atribut remote
+    def lookup(self, host, remote_path, size, mtime):
+        data_path, meta_path = self._paths(host, remote_path)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta['size'] != size or meta['mtime'] != mtime:
+                return None
+            if os.path.getsize(data_path) != size:
+                return None
+            os.utime(data_path)
+            return data_path
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, host, remote_path, size, mtime, writer):
+        data_path, meta_path = self._paths(host, remote_path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer(f)
+            os.replace(tmp_path, data_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        with open(meta_path, "w") as f:
+            json.dump({'host': host, 'path': remote_path, 'size': size, 'mtime': mtime}, f)
+        self.prune()
+        return data_path
+
+    # Kembalikan path lokal berisi file remote lewat backend SFTP; unduh hanya jika berubah
+    def fetch(self, backend, host, remote_path, on_progress=None):
+        entry = backend.stat(remote_path)
+        cached = self.lookup(host, remote_path, entry['size'], entry['mtime'])
+        with self._lock:
+            if cached:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached:
+            return cached
+        return self.store(host, remote_path, entry['size'], entry['mtime'],
+                          lambda f: backend.download(remote_path, f, on_progress=on_progress))
+
+    # File sementara untuk download bertahap; namanya tetap agar bisa dilanjutkan
+    def part_path(self, host, remote_path):
+        return self._paths(host, remote_path)[0] + ".part"
+
+    # Pindahkan file .part yang sudah lengkap menjadi isi cache
+    def commit_part(self, host, remote_path, size, mtime):
+        data_path, meta_path = self._paths(host, remote_path)
+        os.replace(self.part_path(host, remote_path), data_path)
+        with open(meta_path, "w") as f:
+            json.dump({'host': host, 'path': remote_path, 'size': size, 'mtime': mtime}, f)
+        self.prune()
+        return data_path
+
+    def invalidate(self, host, remote_path):
+        for path in self._paths(host, remote_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # Buang file yang paling lama tidak dipakai sampai di bawah max_bytes
+    def prune(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.root):
+            if not name.endswith(".data"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            for victim in (path, path[:-len(".data")] + ".json"):
+                try:
+                    os.remove(victim)
+                except OSError:
+                    pass
+            total -= size
@@ -0,0 +1,161 @@
+import hashlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as futures_wait
+
+from sshfm.terminal import CommandRun
+
+# Jumlah sesi SSH paralel default saat fan-out
+FANOUT_WORKERS = 16
+
+
+# Baca inventory: satu host per baris (atau dipisah koma/spasi) dengan
+# format [user@]host[:port]. Baris diawali '#' diabaikan.
+def parse_inventory(text, default_user="root", default_port=22):
+    hosts = []
+    seen = set()
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        for token in re.split(r"[\s,]+", line):
+            if not token:
+                continue
+            user, _, hostport = token.rpartition('@')
+            host, port = hostport, default_port
+            match = re.match(r"^\[(.+)\](?::(\d+))?$", hostport) or re.match(r"^([^:]+)(?::(\d+))?$", hostport)
+            if match:
+                host = match.group(1)
+                port = int(match.group(2)) if match.group(2) else default_port
+            entry = {'host': host, 'user': user or default_user, 'port': port}
+            entry['label'] = f"{entry['user']}@{host}" + (f":{port}" if port != 22 else "")
+            if entry['label'] not in seen:
+                seen.add(entry['label'])
+                hosts.append(entry)
+    return hosts
+
+
+# Status eksekusi satu host
+class HostRun:
+    def __init__(self, entry):
+        self.entry = entry
+        self.label = entry['label']
+        self.status = "menunggu"
+        self.run = None
+        self.error = None
+        self.connect_seconds = None
+        self.start_time = None
+        self.end_time = None
+
+    def duration(self):
+        if self.start_time is None:
+            return None
+        return (self.end_time or time.monotonic()) - self.start_time
+
+    def exit_code(self):
+        return self.run.exit_code if self.run else None
+
+    def stdout(self):
+        return self.run.stdout.text() if self.run else ""
+
+    def stderr(self):
+        return self.run.stderr.text() if self.run else ""
+
+
+# Jalankan satu perintah di banyak host sekaligus dengan jumlah sesi SSH
+# terbatas. connect(entry) mengembalikan SSHClient yang sudah terhubung.
+# Jika stats diberikan, connect dan exec dicatat per host.
+class FanoutRun:
+    def __init__(self, hosts, command, connect, workers=FANOUT_WORKERS, timeout=None, stats=None):
+        self.command = command
+        self.connect = connect
+        self.timeout = timeout
+        self.stats = stats
+        self.hosts = [HostRun(entry) for entry in hosts]
+        self.workers = max(1, min(workers, len(self.hosts) or 1))
+        self.start_time = None
+        self._cancel = threading.Event()
+        self._futures = []
+
+    def start(self):
+        self.start_time = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fanout")
+        self._futures = [executor.submit(self._run_host, host) for host in self.hosts]
+        executor.shutdown(wait=False)
+        return self
+
+    def _run_host(self, host):
+        if self._cancel.is_set():
+            host.status = "dibatalkan"
+            return
+        host.start_time = time.monotonic()
+        host.status = "menghubungkan"
+        client = None
+        try:
+            try:
+                client = self.connect(host.entry)
+            finally:
+                host.connect_seconds = time.monotonic() - host.start_time
+                if self.stats is not None:
+                    self.stats.record("connect", host.connect_seconds, client is None, host=host.label)
+            host.status = "berjalan"
+            host.run = CommandRun(client, self.command, timeout=self.timeout,
+                                  stats=self.stats, host=host.label).start()
+            while not host.run.wait(0.2):
+                if self._cancel.is_set():
+                    host.run.cancel()
+            host.status = host.run.status
+            host.error = host.run.error
+        except Exception as e:
+            host.status = "error"
+            host.error = str(e)
+        finally:
+            host.end_time = time.monotonic()
+            if client is not None:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        futures_wait(self._futures, timeout=timeout)
+        return all(f.done() for f in self._futures)
+
+    def is_running(self):
+        return not all(f.done() for f in self._futures)
+
+    def elapsed(self):
+        if self.start_time is None:
+            return 0.0
+        ends = [h.end_time for h in self.hosts]
+        if self.is_running() or None in ends:
+            return time.monotonic() - self.start_time
+        return max(ends, default=self.start_time) - self.start_time
+
+    def rows(self):
+        return [{
+            'host': host.label,
+            'status': host.status,
+            'exit code': host.exit_code(),
+            'durasi (s)': round(host.duration(), 2) if host.duration() is not None else None,
+            'baris output': host.stdout().count("\n"),
+            'error': host.error or ""
+        } for host in self.hosts]
+
+    # Kelompokkan host yang hasilnya identik (exit code, stdout, stderr)
+    def groups(self):
+        groups = {}
+        for host in self.hosts:
+            if host.status in ("menunggu", "menghubungkan", "berjalan"):
+                continue
+            digest = hashlib.sha256("\0".join([
+                str(host.exit_code()), host.stdout(), host.stderr(), host.error or ""
+            ]).encode()).hexdigest()
+            group = groups.setdefault(digest, {
+                'hosts': [], 'exit_code': host.exit_code(), 'status': host.status,
+                'stdout': host.stdout(), 'stderr': host.stderr(), 'error': host.error
+            })
+            group['hosts'].append(host.label)
+        return sorted(groups.values(), key=lambda g: -len(g['hosts']))
@@ -0,0 +1,237 @@
+import itertools
+import queue
+import threading
+import time
+
+from sshfm.metrics import OpStats
+
+# Jumlah worker latar per sesi
+JOB_WORKERS = 4
+# Job dari klik pengguna didahulukan dari pekerjaan latar seperti thumbnail
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 10
+# Jumlah job selesai yang tetap ditampilkan di panel (job tak terlihat,
+# mis. thumbnail, disimpan sebanyak ini juga secara terpisah)
+HISTORY = 30
+
+RUNNING_STATUSES = ("antre", "berjalan")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# Satu pekerjaan latar. Fungsi job menerima objek ini untuk melaporkan
+# progres (report) dan memeriksa pembatalan (check).
+class Job:
+    def __init__(self, job_id, kind, label, total=None, visible=True, hold=False):
+        self.id = job_id
+        self.kind = kind
+        self.label = label
+        self.total = total
+        self.visible = visible
+        # Job yang ditahan tidak dibuang dari riwayat sampai release()
+        self.held = hold
+        self.done = 0
+        self.status = "antre"
+        self.result = None
+        self.error = None
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._on_cancel = []
+
+    def report(self, done, total=None):
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    # Fungsi yang dipanggil saat job dibatalkan, mis. cancel() milik transfer
+    def on_cancel(self, callback):
+        self._on_cancel.append(callback)
+        if self._cancel.is_set():
+            callback()
+
+    def cancel(self):
+        self._cancel.set()
+        for callback in list(self._on_cancel):
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def is_running(self):
+        return self.status in RUNNING_STATUSES
+
+    # Lama job menunggu di antrean sebelum dijalankan worker
+    def wait_seconds(self):
+        return (self.started or self.finished or time.monotonic()) - self.submitted
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def rate(self):
+        elapsed = self.elapsed()
+        return self.done / elapsed / (1024 * 1024) if elapsed else 0.0
+
+
+# Executor job per sesi Streamlit: beberapa thread memakai transport SSH
+# yang sama, antrean berprioritas, dan objek job bertahan di session_state
+# sehingga UI cukup membaca status di setiap rerun.
+class JobManager:
+    def __init__(self, workers=JOB_WORKERS, stats=None, history=HISTORY):
+        self.workers = workers
+        self.history = history
+        self.stats = stats or OpStats()
+        self._queue = queue.PriorityQueue()
+        self._ids = itertools.count(1)
+        self._jobs = []
+        self._lock = threading.Lock()
+        self._threads = []
+        self._closed = False
+
+    def _ensure_workers(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, daemon=True,
+                                          name=f"job-{len(self._threads)}")
+                thread.start()
+                self._threads.append(thread)
+
+    # Jalankan fn(job) di latar; hasil fn disimpan di job.result. hold=True
+    # menahan job di riwayat sampai release(), mis. selama pemanggil masih
+    # perlu memproses hasilnya setelah selesai.
+    def submit(self, kind, label, fn, total=None, priority=PRIORITY_USER, visible=True, on_done=None,
+               hold=False):
+        if self._closed:
+            raise RuntimeError("JobManager sudah ditutup")
+        job = Job(next(self._ids), kind, label, total, visible, hold)
+        with self._lock:
+            self._jobs.append(job)
+            self._trim()
+        self._queue.put((priority, job.id, job, fn, on_done))
+        self._ensure_workers()
+        return job
+
+    def _worker(self):
+        while True:
+            priority, _, job, fn, on_done = self._queue.get()
+            if job is None:
+                return
+            if job.cancelled:
+                job.status = "dibatalkan"
+                job.finished = time.monotonic()
+                self._call_done(job, on_done)
+                continue
+            job.started = time.monotonic()
+            job.status = "berjalan"
+            self.stats.record(f"antre:{job.kind}", job.started - job.submitted)
+            try:
+                job.result = fn(job)
+                job.status = "dibatalkan" if job.cancelled else "selesai"
+            except JobCancelled:
+                job.status = "dibatalkan"
+            except Exception as e:
+                job.status = "gagal"
+                job.error = str(e)
+            job.finished = time.monotonic()
+            self.stats.record(f"job:{job.kind}", job.finished - job.started, job.status == "gagal")
+            self._call_done(job, on_done)
+
+    # on_done dipanggil sekali per job, juga untuk job yang dibatalkan sebelum berjalan
+    @staticmethod
+    def _call_done(job, on_done):
+        if on_done is not None:
+            try:
+                on_done(job)
+            except Exception:
+                pass
+
+    # Buang job selesai yang paling lama agar daftar tidak tumbuh terus. Job
+    # tak terlihat dihitung terpisah agar tidak menggeser riwayat job
+    # pengguna; job yang masih ditahan tidak pernah dibuang.
+    def _trim(self):
+        drop = set()
+        for visible in (True, False):
+            finished = [job for job in self._jobs
+                        if job.visible == visible and not job.held and not job.is_running()]
+            drop.update(job.id for job in finished[:max(0, len(finished) - self.history)])
+        if drop:
+            self._jobs = [job for job in self._jobs if job.id not in drop]
+
+    def release(self, job_id):
+        with self._lock:
+            for job in self._jobs:
+                if job.id == job_id:
+                    job.held = False
+            self._trim()
+
+    def jobs(self, visible_only=True):
+        with self._lock:
+            jobs = [job for job in self._jobs if job.visible or not visible_only]
+        return sorted(jobs, key=lambda job: (not job.is_running(), -job.id))
+
+    # Job terbaru untuk (kind, label), mis. download file tertentu
+    def find(self, kind, label):
+        with self._lock:
+            for job in reversed(self._jobs):
+                if job.kind == kind and job.label == label:
+                    return job
+        return None
+
+    def get(self, job_id):
+        with self._lock:
+            for job in self._jobs:
+                if job.id == job_id:
+                    return job
+        return None
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def clear_finished(self):
+        with self._lock:
+            self._jobs = [job for job in self._jobs if job.is_running() or job.held]
+
+    def active_count(self, visible_only=True):
+        return sum(1 for job in self.jobs(visible_only) if job.is_running())
+
+    # Kedalaman antrean, job berjalan dan latensi tunggu antrean
+    def metrics(self):
+        with self._lock:
+            jobs = list(self._jobs)
+        waits = [job.started - job.submitted for job in jobs if job.started is not None]
+        return {
+            'queued': sum(1 for job in jobs if job.status == "antre"),
+            'running': sum(1 for job in jobs if job.status == "berjalan"),
+            'finished': sum(1 for job in jobs if job.status == "selesai"),
+            'failed': sum(1 for job in jobs if job.status == "gagal"),
+            'cancelled': sum(1 for job in jobs if job.status == "dibatalkan"),
+            'queue_depth': self._queue.qsize(),
+            'avg_wait_ms': sum(waits) / len(waits) * 1000 if waits else 0.0,
+            'max_wait_ms': max(waits) * 1000 if waits else 0.0,
+            'workers': self.workers,
+        }
+
+    def shutdown(self):
+        self._closed = True
+        with self._lock:
+            jobs = list(self._jobs)
+        for job in jobs:
+            if job.is_running():
+                job.cancel()
+        for _ in self._threads:
+            self._queue.put((float("inf"), 0, None, None, None))
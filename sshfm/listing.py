@@ -0,0 +1,129 @@
+import os
+import posixpath
+import stat as stat_module
+import time
+from collections import OrderedDict
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
+DOCUMENT_EXTENSIONS = ['.pdf', '.doc', '.docx', '.txt', '.csv', '.xlsx', '.xls']
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv']
+
+# Jumlah permintaan READDIR yang dikirim sekaligus tanpa menunggu balasan
+READ_AHEADS = 50
+# Umur maksimum listing yang di-cache (detik)
+LISTING_TTL = 30
+
+
+# Bentuk baku path remote: tanpa "/" di akhir, "." dan ".." diselesaikan
+def normalize_root(path):
+    return posixpath.normpath(path or "/")
+
+
+# Deteksi tipe file dari ekstensi
+def detect_file_type(name):
+    ext = os.path.splitext(name)[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        return "image", ext
+    if ext in DOCUMENT_EXTENSIONS:
+        return "document", ext
+    if ext in VIDEO_EXTENSIONS:
+        return "video", ext
+    return "other", ext
+
+
+# Path remote selalu POSIX; nama file boleh berisi backslash
+def join_remote(path, name):
+    return posixpath.join(path, name)
+
+
+# Dict entri yang dipakai UI
+def entry_from_fields(path, name, size, mtime, is_dir):
+    file_type, ext = detect_file_type(name)
+    return {
+        'name': name,
+        'path': join_remote(path, name),
+        'size': size,
+        'mtime': mtime,
+        'modified': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(mtime)),
+        'is_dir': is_dir,
+        'type': file_type,
+        'extension': ext
+    }
+
+
+# Ubah SFTPAttributes menjadi dict entri
+def make_entry(path, attr):
+    return entry_from_fields(path, attr.filename, attr.st_size, attr.st_mtime,
+                             bool(stat_module.S_ISDIR(attr.st_mode)))
+
+
+# Generator daftar file: nama dan atribut diambil dari aliran READDIR
+# yang dipipeline, jadi tidak ada stat() per file. Entri dikirim begitu
+# balasan READDIR tiba sehingga UI bisa mulai menggambar lebih awal.
+def iter_file_list(sftp, path, read_aheads=READ_AHEADS):
+    links = []
+    for attr in sftp.listdir_iter(path, read_aheads=read_aheads):
+        # READDIR memberi atribut link itu sendiri; link di-stat setelah
+        # listing selesai karena READDIR yang dipipeline masih menunggu balasan
+        if attr.st_mode is not None and stat_module.S_ISLNK(attr.st_mode):
+            links.append(attr.filename)
+            continue
+        yield make_entry(path, attr)
+    for name in links:
+        try:
+            target = sftp.stat(join_remote(path, name))
+        except IOError:
+            # Link rusak atau tanpa izin dilewati, sama seperti sebelumnya
+            continue
+        target.filename = name
+        yield make_entry(path, target)
+
+
+# Cache listing per path untuk satu sesi, dengan TTL dan penghitung hit/miss.
+# Path dinormalisasi sehingga "/var/log/" dan "/var/log" memakai entri yang sama.
+class ListingCache:
+    def __init__(self, ttl=LISTING_TTL, max_entries=64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+
+    def get(self, path):
+        path = normalize_root(path)
+        item = self._entries.get(path)
+        if item is not None and time.monotonic() - item[0] <= self.ttl:
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return item[1]
+        self.misses += 1
+        return None
+
+    def put(self, path, files):
+        path = normalize_root(path)
+        self._entries[path] = (time.monotonic(), files)
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # Hapus entri path tertentu, atau semua jika path None
+    def invalidate(self, path=None):
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(normalize_root(path), None)
+        self.invalidations += 1
+
+    def age(self, path):
+        item = self._entries.get(normalize_root(path))
+        return None if item is None else time.monotonic() - item[0]
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'entries': len(self._entries),
+            'ttl': self.ttl
+        }
@@ -0,0 +1,209 @@
+import bisect
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Batas atas bucket histogram latensi (detik); bucket terakhir adalah +Inf
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Endpoint /metrics (format teks Prometheus) hanya aktif jika port diisi
+METRICS_HOST = os.environ.get("SSHFM_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("SSHFM_METRICS_PORT", "0"))
+
+# Semua OpStats yang masih hidup di proses ini, untuk ekspor Prometheus
+_registry = weakref.WeakSet()
+_registry_lock = threading.Lock()
+
+
+def _new_item(size):
+    return {'count': 0, 'total': 0.0, 'max': 0.0, 'errors': 0, 'bytes': 0, 'buckets': [0] * size}
+
+
+# Perkiraan kuantil dari histogram (interpolasi linear di dalam bucket)
+def _quantile(buckets, counts, q):
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    lower = 0.0
+    for index, count in enumerate(counts):
+        upper = buckets[index] if index < len(buckets) else None
+        if count and seen + count >= rank:
+            if upper is None:
+                return lower
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+        if upper is not None:
+            lower = upper
+    return lower
+
+
+# Statistik per (operasi, host): jumlah, total, maksimum, error, byte dan
+# histogram latensi. record() hanya satu lock dan satu bisect sehingga aman
+# dipanggil di setiap operasi SFTP/SSH.
+class OpStats:
+    def __init__(self, host=None, buckets=BUCKETS):
+        self.host = host or ""
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._data = {}
+        with _registry_lock:
+            _registry.add(self)
+
+    def _item(self, op, host):
+        key = (op, host or self.host)
+        item = self._data.get(key)
+        if item is None:
+            item = self._data[key] = _new_item(len(self.buckets) + 1)
+        return item
+
+    def record(self, op, seconds, error=False, nbytes=0, host=None):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            item = self._item(op, host)
+            item['count'] += 1
+            item['total'] += seconds
+            if seconds > item['max']:
+                item['max'] = seconds
+            item['buckets'][index] += 1
+            if error:
+                item['errors'] += 1
+            if nbytes:
+                item['bytes'] += nbytes
+
+    # Tambah byte yang dipindahkan operasi yang waktunya dicatat di tempat lain
+    def add_bytes(self, op, nbytes, host=None):
+        if not nbytes:
+            return
+        with self._lock:
+            self._item(op, host)['bytes'] += nbytes
+
+    @contextmanager
+    def timed(self, op, host=None):
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(op, time.perf_counter() - start, error, host=host)
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+    # Salinan data mentah: {(operasi, host): item}
+    def series(self):
+        with self._lock:
+            return {key: dict(item, buckets=list(item['buckets'])) for key, item in self._data.items()}
+
+    # Ringkasan untuk ditampilkan sebagai tabel
+    def snapshot(self):
+        rows = []
+        for (op, host), item in sorted(self.series().items()):
+            if not item['count']:
+                continue
+            rows.append({
+                'operasi': op,
+                'host': host,
+                'jumlah': item['count'],
+                'rata-rata (ms)': round(item['total'] / item['count'] * 1000, 2),
+                'p50 (ms)': round(min(_quantile(self.buckets, item['buckets'], 0.5), item['max']) * 1000, 2),
+                'p95 (ms)': round(min(_quantile(self.buckets, item['buckets'], 0.95), item['max']) * 1000, 2),
+                'maks (ms)': round(item['max'] * 1000, 2),
+                'total (s)': round(item['total'], 3),
+                'byte': item['bytes'],
+                'error': item['errors']
+            })
+        return rows
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Format teks Prometheus untuk stats yang diberikan, atau semua OpStats di
+# proses ini. Seri dengan (operasi, host) sama dijumlahkan.
+def prometheus_text(stats=None):
+    if stats is None:
+        with _registry_lock:
+            stats = list(_registry)
+    merged = {}
+    for item_stats in stats:
+        for key, item in item_stats.series().items():
+            buckets = item_stats.buckets
+            current = merged.get((key, buckets))
+            if current is None:
+                merged[(key, buckets)] = item
+                continue
+            for field in ('count', 'total', 'errors', 'bytes'):
+                current[field] += item[field]
+            current['buckets'] = [a + b for a, b in zip(current['buckets'], item['buckets'])]
+
+    lines = ["# HELP sshfm_op_duration_seconds Latensi operasi SSH/SFTP",
+             "# TYPE sshfm_op_duration_seconds histogram"]
+    errors = ["# HELP sshfm_op_errors_total Operasi SSH/SFTP yang gagal",
+              "# TYPE sshfm_op_errors_total counter"]
+    transferred = ["# HELP sshfm_op_bytes_total Byte yang dipindahkan operasi SSH/SFTP",
+                   "# TYPE sshfm_op_bytes_total counter"]
+    for ((op, host), buckets), item in sorted(merged.items()):
+        labels = f'op="{_label(op)}",host="{_label(host)}"'
+        if item['count']:
+            cumulative = 0
+            for upper, count in zip(list(buckets) + ["+Inf"], item['buckets']):
+                cumulative += count
+                le = upper if upper == "+Inf" else _number(float(upper))
+                lines.append(f'sshfm_op_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"sshfm_op_duration_seconds_sum{{{labels}}} {_number(item['total'])}")
+            lines.append(f"sshfm_op_duration_seconds_count{{{labels}}} {item['count']}")
+            errors.append(f"sshfm_op_errors_total{{{labels}}} {item['errors']}")
+        if item['bytes']:
+            transferred.append(f"sshfm_op_bytes_total{{{labels}}} {item['bytes']}")
+    return "\n".join(lines + errors + transferred) + "\n"
+
+
+# Server HTTP kecil yang menyajikan prometheus_text() di /metrics
+class MetricsServer:
+    def __init__(self, host=METRICS_HOST, port=METRICS_PORT):
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self.url = f"http://{host}:{self._server.server_port}/metrics"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @staticmethod
+    def _handler_class():
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+# Server metrik jika SSHFM_METRICS_PORT diisi, selain itu None
+def start_metrics_server():
+    return MetricsServer() if METRICS_PORT else None
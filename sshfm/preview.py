@@ -0,0 +1,192 @@
+import codecs
+import threading
+
+from sshfm.terminal import OutputBuffer
+
+# Potongan default untuk preview awal/akhir file
+PREVIEW_SIZE = 64 * 1024
+# Batas satu potongan preview, berapa pun ukuran file
+MAX_PREVIEW_SIZE = 1024 * 1024
+# Byte yang dipakai untuk menebak encoding
+DETECT_SIZE = 64 * 1024
+# Mode follow: jeda polling, batas teks yang disimpan (karakter) dan
+# potongan baca per permintaan
+FOLLOW_INTERVAL = 1.0
+FOLLOW_BUFFER = 256 * 1024
+FOLLOW_READ = 64 * 1024
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+]
+# Byte kontrol yang wajar di file teks (tab, baris baru, form feed, escape ANSI)
+_TEXT_CONTROLS = set(b"\t\n\r\f\b\x1b")
+
+
+# Tebak encoding dari sampel byte; None jika isinya tampak biner.
+# Sampel bisa terpotong di tengah karakter multibyte di kedua ujungnya.
+def detect_encoding(sample):
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if not sample:
+        return "utf-8"
+    if b"\x00" in sample:
+        # UTF-16 tanpa BOM: NUL hampir selalu di byte ganjil (LE) atau genap (BE)
+        half = len(sample) // 2 or 1
+        if sample[1::2].count(0) > half * 0.4 and not sample[0::2].count(0):
+            return "utf-16-le"
+        if sample[0::2].count(0) > half * 0.4 and not sample[1::2].count(0):
+            return "utf-16-be"
+        return None
+    controls = sum(1 for byte in sample if byte < 0x20 and byte not in _TEXT_CONTROLS)
+    if controls > len(sample) // 10:
+        return None
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(_skip_continuation(sample), final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return "latin-1"
+    best = from_bytes(sample).best()
+    return best.encoding if best is not None else "latin-1"
+
+
+# Lewati byte lanjutan UTF-8 di awal potongan yang dimulai di tengah karakter
+def _skip_continuation(data):
+    start = 0
+    while start < min(len(data), 3) and 0x80 <= data[start] <= 0xBF:
+        start += 1
+    return data[start:]
+
+
+# Decode satu potongan. Karakter yang terpotong di awal (jika bukan awal
+# file) dan di akhir (jika bukan akhir file) dibuang, bukan diganti �.
+def decode_chunk(data, encoding, at_start=True, at_end=True):
+    if encoding in ("utf-8", "utf-8-sig") and not at_start:
+        data = _skip_continuation(data)
+        encoding = "utf-8"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    return decoder.decode(data, final=at_end)
+
+
+# Baca satu potongan teks dari offset byte lewat backend (read dengan seek,
+# bukan seluruh file). Hasilnya dict offset/end/size/encoding/text; text None
+# jika file tampak biner.
+def read_chunk(backend, path, offset, length=PREVIEW_SIZE, encoding=None, size=None):
+    if size is None:
+        size = backend.stat(path)['size']
+    offset = max(0, min(offset, size))
+    if encoding and encoding.startswith("utf-16"):
+        offset -= offset % 2
+    length = max(0, min(length, MAX_PREVIEW_SIZE, size - offset))
+    data = backend.read(path, offset, length) if length else b""
+    if encoding is None:
+        encoding = detect_encoding(data[:DETECT_SIZE])
+    end = offset + len(data)
+    return {
+        'path': path,
+        'offset': offset,
+        'end': end,
+        'size': size,
+        'encoding': encoding,
+        'text': None if encoding is None else decode_chunk(data, encoding, offset == 0, end >= size)
+    }
+
+
+def read_head(backend, path, length=PREVIEW_SIZE, encoding=None):
+    return read_chunk(backend, path, 0, length, encoding)
+
+
+def read_tail(backend, path, length=PREVIEW_SIZE, encoding=None):
+    size = backend.stat(path)['size']
+    return read_chunk(backend, path, size - length, length, encoding, size)
+
+
+# Ikuti file yang terus bertambah (seperti tail -f) di thread latar: ukuran
+# file dicek tiap interval dan hanya byte baru yang dibaca. Teks disimpan di
+# ring buffer terbatas; jika file tumbuh lebih cepat dari batas itu, bagian
+# tengahnya dilewati. File yang mengecil (dirotasi/dipotong) dibaca dari awal.
+class LogFollower:
+    def __init__(self, backend, path, offset, encoding="utf-8", initial_text="",
+                 interval=FOLLOW_INTERVAL, max_buffer=FOLLOW_BUFFER, read_size=FOLLOW_READ):
+        self.backend = backend
+        self.path = path
+        self.offset = offset
+        self.size = offset
+        self.encoding = encoding
+        self.interval = interval
+        self.max_buffer = max_buffer
+        self.read_size = read_size
+        self.output = OutputBuffer(max_buffer)
+        self.output.append(initial_text)
+        self.status = "menunggu"
+        self.error = None
+        self.polls = 0
+        self.bytes_read = 0
+        self.skipped = 0
+        self.truncations = 0
+        self._decoder = self._new_decoder()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def _new_decoder(self):
+        return codecs.getincrementaldecoder(self.encoding)(errors="replace")
+
+    def start(self):
+        self.status = "berjalan"
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._cancel.wait(self.interval):
+            try:
+                self.poll()
+                self.error = None
+            except Exception as e:
+                # File bisa sementara hilang saat dirotasi; terus mencoba
+                self.error = str(e)
+        self.status = "berhenti"
+
+    # Satu putaran: cek ukuran, lalu baca byte yang ditambahkan sejak poll terakhir
+    def poll(self):
+        self.polls += 1
+        size = self.backend.stat(self.path)['size']
+        self.size = size
+        if size < self.offset:
+            self.truncations += 1
+            self.offset = 0
+            self._decoder = self._new_decoder()
+            self.output.append("\n--- file dipotong atau dirotasi, dibaca dari awal ---\n")
+        if size - self.offset > self.max_buffer:
+            jump = size - self.max_buffer - self.offset
+            self.skipped += jump
+            self.offset += jump
+            self._decoder = self._new_decoder()
+            self.output.append(f"\n--- {jump} byte dilewati ---\n")
+        while self.offset < size and not self._cancel.is_set():
+            data = self.backend.read(self.path, self.offset, min(self.read_size, size - self.offset))
+            if not data:
+                break
+            self.offset += len(data)
+            self.bytes_read += len(data)
+            self.output.append(self._decoder.decode(data))
+
+    def text(self):
+        return self.output.text()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_running(self):
+        return self.status == "berjalan"
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_running()
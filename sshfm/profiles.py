@@ -0,0 +1,88 @@
+import paramiko
+
+from sshfm.sftp_pool import MAX_PACKET_SIZE, WINDOW_SIZE
+
+# Profil koneksi SSH: kompresi, urutan cipher dan MAC yang diminta, serta
+# window dan ukuran paket channel. Cipher yang tidak didukung paramiko
+# (mis. chacha20-poly1305) dilewati, jadi urutan boleh berisi nama lain.
+PROFILES = {
+    "default": {
+        'description': "Negosiasi bawaan paramiko, tanpa kompresi",
+        'compress': False,
+        'ciphers': None,
+        'macs': None,
+        'window_size': WINDOW_SIZE,
+        'max_packet_size': MAX_PACKET_SIZE,
+    },
+    "LAN": {
+        'description': "AES-GCM (AEAD, tanpa MAC terpisah), tanpa kompresi, window dan paket besar",
+        'compress': False,
+        'ciphers': ("aes128-gcm@openssh.com", "aes256-gcm@openssh.com", "chacha20-poly1305@openssh.com",
+                    "aes128-ctr", "aes256-ctr"),
+        'macs': ("hmac-sha2-256-etm@openssh.com", "hmac-sha2-256"),
+        'window_size': 64 * 1024 * 1024,
+        'max_packet_size': 128 * 1024,
+    },
+    "WAN": {
+        'description': "Kompresi zlib untuk data teks, AES-GCM, window besar untuk RTT tinggi",
+        'compress': True,
+        'ciphers': ("aes128-gcm@openssh.com", "chacha20-poly1305@openssh.com", "aes128-ctr"),
+        'macs': ("hmac-sha2-256-etm@openssh.com", "hmac-sha2-256"),
+        'window_size': 64 * 1024 * 1024,
+        'max_packet_size': MAX_PACKET_SIZE,
+    },
+}
+DEFAULT_PROFILE = "default"
+
+
+def get_profile(name):
+    return PROFILES.get(name or DEFAULT_PROFILE, PROFILES[DEFAULT_PROFILE])
+
+
+def _supported(preferred, available):
+    return tuple(name for name in preferred if name in available)
+
+
+# Transport dengan urutan cipher/MAC dan window dari profil
+def _transport_factory(profile):
+    def factory(sock, **kwargs):
+        transport = paramiko.Transport(sock, default_window_size=profile['window_size'],
+                                       default_max_packet_size=profile['max_packet_size'], **kwargs)
+        options = transport.get_security_options()
+        if profile['ciphers']:
+            ciphers = _supported(profile['ciphers'], transport._cipher_info)
+            if ciphers:
+                options.ciphers = ciphers
+        if profile['macs']:
+            macs = _supported(profile['macs'], transport._mac_info)
+            if macs:
+                options.digests = macs
+        return transport
+    return factory
+
+
+# Argumen tambahan untuk SSHClient.connect sesuai profil
+def connect_options(name):
+    profile = get_profile(name)
+    return {
+        'compress': profile['compress'],
+        'transport_factory': _transport_factory(profile),
+    }
+
+
+# Argumen window/paket untuk SFTPPool sesuai profil
+def sftp_options(name):
+    profile = get_profile(name)
+    return {'window_size': profile['window_size'], 'max_packet_size': profile['max_packet_size']}
+
+
+# Algoritma yang benar-benar dipakai setelah negosiasi, untuk ditampilkan di UI
+def negotiated(ssh_client):
+    transport = ssh_client.get_transport()
+    if transport is None:
+        return {}
+    return {
+        'cipher': transport.local_cipher,
+        'mac': transport.local_mac,
+        'kompresi': transport.local_compression,
+    }
@@ -0,0 +1,430 @@
+import shlex
+import socket
+import stat as stat_module
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as futures_wait
+
+from paramiko import SFTPAttributes, SSHException
+from paramiko.sftp import CMD_EXTENDED, CMD_SETSTAT
+from paramiko.sftp_client import int64
+
+from sshfm.search import normalize_root, walk_tree
+from sshfm.transfer import MB, discard_remote, remote_part_path, replace_remote
+
+# Potongan yang dibaca/ditulis saat menyalin lewat klien (stream)
+COPY_CHUNK = 256 * 1024
+# Item yang diproses bersamaan. File di dalamnya disalin oleh pool terpisah
+# berukuran setengah channel pool (satu channel per file), agar channel
+# sisanya tetap tersedia untuk listing dan job lain di pool yang sama.
+COPY_WORKERS = 2
+# "auto" memilih cp di server, lalu ekstensi copy-data, lalu stream
+COPY_METHODS = ("auto", "cp", "copy-data", "stream")
+# Pesan cp/mv yang tidak mengenal opsi GNU (BusyBox, BSD)
+_OPTION_ERRORS = ("unrecognized option", "invalid option", "illegal option", "unknown option")
+
+
+class CopyCancelled(Exception):
+    pass
+
+
+# Perintah shell di server tersedia (dan exec diizinkan)
+def command_available(ssh_client, name):
+    try:
+        stdin, stdout, stderr = ssh_client.exec_command(f"command -v {shlex.quote(name)}", timeout=10)
+        return stdout.channel.recv_exit_status() == 0
+    except Exception:
+        return False
+
+
+def _run_command(ssh_client, command):
+    stdin, stdout, stderr = ssh_client.exec_command(command)
+    output = stdout.read().decode(errors="replace") + stderr.read().decode(errors="replace")
+    return stdout.channel.recv_exit_status(), output.strip()
+
+
+# Mode dan waktu sumber diset di tujuan dengan satu SETSTAT
+def _copy_attributes(sftp, path, attr):
+    attrs = SFTPAttributes()
+    attrs.st_mode = stat_module.S_IMODE(attr.st_mode)
+    attrs.st_atime, attrs.st_mtime = attr.st_atime, attr.st_mtime
+    sftp._request(CMD_SETSTAT, path, attrs)
+
+
+def _exists(sftp, path):
+    try:
+        sftp.lstat(path)
+        return True
+    except IOError:
+        return False
+
+
+# Pindahkan/ganti nama satu path di server. posix-rename (menimpa tujuan)
+# dipakai lebih dulu; server tanpa ekstensi itu memakai RENAME biasa. Jika
+# rename ditolak (mis. beda filesystem) dan shell tersedia, `mv` di server
+# yang menyalin lalu menghapus sumbernya. Hasilnya nama metode yang dipakai.
+def rename_path(sftp_pool, src, dst, overwrite=False, ssh_client=None):
+    with sftp_pool.channel("rename") as sftp:
+        if not overwrite and _exists(sftp, dst):
+            raise IOError(f"{dst} sudah ada")
+        try:
+            sftp.posix_rename(src, dst)
+            return "posix-rename"
+        except IOError as e:
+            error = e
+        if "unsupported" in str(error).lower():
+            try:
+                if overwrite and _exists(sftp, dst) and not stat_module.S_ISDIR(sftp.lstat(dst).st_mode):
+                    sftp.remove(dst)
+                sftp.rename(src, dst)
+                return "rename"
+            except IOError as e:
+                error = e
+        if not _exists(sftp, src):
+            raise error
+    ssh_client = ssh_client or sftp_pool.ssh_client
+    if not command_available(ssh_client, "mv"):
+        raise error
+    code, output = _run_command(ssh_client, f"mv -f -T -- {shlex.quote(src)} {shlex.quote(dst)}")
+    if code != 0:
+        raise IOError(output or str(error))
+    return "mv"
+
+
+# Satu sumber dalam salin/pindah beserta status dan progresnya
+class CopyItem:
+    def __init__(self, src, dst, is_dir=False, size=0):
+        self.src = normalize_root(src)
+        self.dst = normalize_root(dst)
+        self.is_dir = is_dir
+        # Untuk folder, diisi total ukuran file setelah pohonnya ditelusuri
+        self.size = size
+        self.done = 0
+        self.files = 0
+        self.status = "menunggu"
+        self.method = None
+        self.error = None
+        self.seconds = 0.0
+
+
+# Salin atau pindahkan banyak file/folder tanpa data lewat mesin Streamlit.
+# Pindah memakai rename_path. Salin memilih cara tercepat yang didukung
+# server: `cp --reflink=auto` lewat exec (reflink di btrfs/xfs, salinan lokal
+# di disk lain), ekstensi SFTP copy-data (OpenSSH 9+), atau terakhir aliran
+# baca-tulis di satu channel (data tetap lewat klien, tapi dua arah berjalan
+# bersamaan dan tidak pernah menyentuh disk lokal).
+class RemoteCopy:
+    def __init__(self, sftp_pool, items, action="copy", overwrite=False, method="auto",
+                 workers=COPY_WORKERS, ssh_client=None):
+        if method not in COPY_METHODS:
+            raise ValueError(f"Metode salin tidak dikenal: {method}")
+        self.sftp_pool = sftp_pool
+        self.ssh_client = ssh_client or sftp_pool.ssh_client
+        self.items = items
+        self.action = action
+        self.overwrite = overwrite
+        self.method = method
+        self.file_workers = max(1, sftp_pool.max_channels // 2)
+        self.workers = max(1, min(workers, self.file_workers))
+        self.start_time = None
+        self.end_time = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._executor = None
+        self._files = None
+        self._remaining = len(items)
+        self._futures = []
+        self._has_cp = None
+        self._copy_data = method in ("auto", "copy-data")
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="remote_copy")
+        self._files = ThreadPoolExecutor(max_workers=self.file_workers, thread_name_prefix="remote_copy_file")
+        self._futures = [self._executor.submit(self._run, item) for item in self.items]
+        self._executor.shutdown(wait=False)
+        return self
+
+    def _check(self):
+        if self._cancel.is_set():
+            raise CopyCancelled()
+
+    def _add_done(self, item, count):
+        with self._lock:
+            item.done += count
+
+    def _run(self, item):
+        try:
+            self._run_item(item)
+        finally:
+            with self._lock:
+                self._remaining -= 1
+                last = not self._remaining
+            if last:
+                self._files.shutdown(wait=False)
+
+    def _run_item(self, item):
+        if self._cancel.is_set():
+            item.status = "dibatalkan"
+            return
+        start = time.perf_counter()
+        item.status = "memindahkan" if self.action == "move" else "menyalin"
+        try:
+            if item.src == item.dst:
+                item.status = "dilewati"
+                item.error = "sumber dan tujuan sama"
+                return
+            if item.dst.startswith(item.src.rstrip("/") + "/"):
+                raise IOError("tujuan berada di dalam sumber")
+            with self.sftp_pool.channel("stat") as sftp:
+                exists = _exists(sftp, item.dst)
+                if exists and not self.overwrite:
+                    item.status = "dilewati"
+                    item.error = "tujuan sudah ada"
+                    return
+                attr = sftp.stat(item.src)
+            if self.action == "move":
+                item.method = rename_path(self.sftp_pool, item.src, item.dst, True, self.ssh_client)
+            else:
+                item.is_dir = stat_module.S_ISDIR(attr.st_mode)
+                if item.is_dir:
+                    self._copy_tree(item, exists)
+                else:
+                    item.size = attr.st_size
+                    self._copy_file(item)
+            item.seconds = time.perf_counter() - start
+            item.status = "berhasil"
+            item.error = None
+        except CopyCancelled:
+            item.status = "dibatalkan"
+        except Exception as e:
+            item.status = "gagal"
+            item.error = str(e)
+
+    def _shell_copy(self):
+        if self.method not in ("auto", "cp"):
+            return False
+        if self._has_cp is None:
+            self._has_cp = command_available(self.ssh_client, "cp")
+        return self._has_cp
+
+    def _copy_file(self, item):
+        if self._shell_copy() and self._copy_cp(item, {item.src: item.size}):
+            return
+        self._files.submit(self._copy_one, item, item.src, item.dst).result()
+
+    # Salin folder: telusuri dulu untuk ukuran total (progres), lalu salin
+    # seluruhnya dengan satu cp, atau buat struktur folder dan salin per file.
+    # Folder tujuan yang sudah ada (mode timpa) digabung per file lewat SFTP,
+    # karena hasil cp di folder sementara tidak bisa di-rename ke atasnya.
+    def _copy_tree(self, item, exists=False):
+        dirs, counts, errors = walk_tree(self.sftp_pool, item.src)
+        if errors:
+            raise IOError(errors[0])
+        files = [entry for info in dirs.values() for entry in info['entries'] if not entry['is_dir']]
+        with self._lock:
+            item.size = sum(entry['size'] for entry in files)
+        self._check()
+        if (not exists and self._shell_copy()
+                and self._copy_cp(item, {entry['path']: entry['size'] for entry in files})):
+            return
+        relative = lambda path: item.dst + path[len(item.src):]
+        with self.sftp_pool.channel("mkdir") as sftp:
+            modes = {}
+            for path in sorted(dirs, key=lambda path: path.count("/")):
+                modes[path] = sftp.stat(path)
+                try:
+                    sftp.mkdir(relative(path))
+                except IOError:
+                    # Folder tujuan yang sudah ada (mode timpa) digabung
+                    if not _exists(sftp, relative(path)):
+                        raise
+        futures = [self._files.submit(self._copy_one, item, entry['path'], relative(entry['path']))
+                   for entry in files]
+        futures_wait(futures)
+        for future in futures:
+            future.result()
+        # Mode dan waktu folder diset setelah isinya, dari yang terdalam
+        with self.sftp_pool.channel("chattr") as sftp:
+            for path in sorted(dirs, key=lambda path: path.count("/"), reverse=True):
+                _copy_attributes(sftp, relative(path), modes[path])
+
+    # cp di server ke nama sementara di samping tujuan, lalu `mv -T` ke
+    # tujuan setelah cp selesai; jika gagal, nama sementara dihapus. Progres
+    # dari baris -v "'src' -> 'dst'". False jika cp/mv tidak mengenal opsinya
+    # sehingga cara lain perlu dicoba.
+    def _copy_cp(self, item, sizes):
+        command = (f"t={shlex.quote(remote_part_path(item.dst))}; "
+                   f"trap 'rm -rf -- \"$t\"; exit 129' HUP TERM; "
+                   f"cp -R -p -T --reflink=auto -v -- {shlex.quote(item.src)} \"$t\" && "
+                   f"mv -f -T -- \"$t\" {shlex.quote(item.dst)}; "
+                   f"c=$?; [ $c -eq 0 ] || rm -rf -- \"$t\"; exit $c")
+        channel = self.ssh_client.get_transport().open_session()
+        errors = []
+
+        def parse(line):
+            line = line.decode(errors="replace").rstrip("\r")
+            if not line.startswith("'"):
+                if line.strip():
+                    errors.append(line.strip())
+                return
+            source = line.split("' -> '", 1)[0][1:]
+            if source in sizes:
+                self._add_done(item, sizes[source])
+                item.files += 1
+
+        try:
+            # Dengan pty, menutup channel saat batal membuat sshd mengirim
+            # SIGHUP ke shell dan cp; trap di atas lalu menghapus salinan
+            # sementara. Server yang menolak pty (no-pty) menjalankan cp tanpa
+            # pty: cp berjalan sampai selesai dan mv tetap dijalankan.
+            try:
+                channel.get_pty()
+            except SSHException:
+                pass
+            channel.set_combine_stderr(True)
+            channel.exec_command(command)
+            channel.settimeout(0.5)
+            pending = b""
+            while True:
+                self._check()
+                try:
+                    data = channel.recv(32768)
+                except socket.timeout:
+                    continue
+                if not data:
+                    break
+                *lines, pending = (pending + data).split(b"\n")
+                for line in lines:
+                    parse(line)
+            parse(pending)
+            code = channel.recv_exit_status()
+        finally:
+            channel.close()
+        if code != 0:
+            message = "\n".join(errors)
+            if any(text in message.lower() for text in _OPTION_ERRORS):
+                self._has_cp = False
+                self._add_done(item, -item.done)
+                item.files = 0
+                return False
+            raise IOError(message or f"cp keluar dengan kode {code}")
+        with self._lock:
+            item.done = item.size
+        item.method = "cp"
+        self.sftp_pool.stats.add_bytes("copy_cp", item.size)
+        return True
+
+    # Satu file (di pool file) lewat copy-data jika server mendukungnya,
+    # selain itu stream. Data ditulis ke nama sementara yang baru
+    # menggantikan tujuan setelah lengkap; mode dan waktu ubah disamakan
+    # dengan sumber.
+    def _copy_one(self, item, src, dst):
+        self._check()
+        part_path = remote_part_path(dst)
+        with self.sftp_pool.channel("copy_file") as sftp:
+            try:
+                attr = sftp.stat(src)
+                if self._copy_data and self._copy_data_file(sftp, src, part_path):
+                    item.method = "copy-data"
+                    self._add_done(item, attr.st_size)
+                    self.sftp_pool.stats.add_bytes("copy_data", attr.st_size)
+                else:
+                    item.method = "stream"
+                    self._stream_file(sftp, item, src, part_path)
+                _copy_attributes(sftp, part_path, attr)
+                replace_remote(sftp, part_path, dst)
+            except BaseException:
+                discard_remote(sftp, part_path)
+                raise
+        with self._lock:
+            item.files += 1
+
+    def _copy_data_file(self, sftp, src, dst):
+        with sftp.open(src, "rb") as rf, sftp.open(dst, "wb") as wf:
+            try:
+                # Panjang 0 berarti sampai akhir file sumber
+                sftp._request(CMD_EXTENDED, "copy-data", rf.handle, int64(0), int64(0),
+                              wf.handle, int64(0))
+            except IOError as e:
+                if "unsupported" not in str(e).lower():
+                    raise
+                self._copy_data = False
+                return False
+        return True
+
+    # Baca dengan prefetch dan tulis dipipeline di channel yang sama; balasan
+    # keduanya dicocokkan paramiko per request sehingga tetap berjalan bersamaan
+    def _stream_file(self, sftp, item, src, dst):
+        with sftp.open(src, "rb") as rf, sftp.open(dst, "wb") as wf:
+            size = rf.stat().st_size
+            rf.prefetch(size)
+            wf.set_pipelined(True)
+            copied = 0
+            while copied < size:
+                self._check()
+                data = rf.read(min(COPY_CHUNK, size - copied))
+                if not data:
+                    break
+                wf.write(data)
+                copied += len(data)
+                self._add_done(item, len(data))
+        self.sftp_pool.stats.add_bytes("copy_stream", copied)
+
+    # Item yang belum selesai berhenti. File tujuan yang sudah ada tidak
+    # pernah tertimpa sebagian (lihat _copy_one dan _copy_cp); folder baru
+    # yang disalin per file bisa tertinggal berisi sebagian file.
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        futures_wait(self._futures, timeout=timeout)
+        finished = all(f.done() for f in self._futures)
+        if finished and self.end_time is None:
+            self.end_time = time.perf_counter()
+        return finished
+
+    def is_running(self):
+        return any(not f.done() for f in self._futures)
+
+    def done_bytes(self):
+        with self._lock:
+            return sum(item.done for item in self.items)
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(item.size for item in self.items)
+
+    def elapsed(self):
+        end = self.end_time or time.perf_counter()
+        return end - self.start_time if self.start_time else 0.0
+
+    def rate(self):
+        elapsed = self.elapsed()
+        return self.done_bytes() / elapsed / MB if elapsed > 0 else 0.0
+
+    def rows(self):
+        return [{
+            'sumber': item.src,
+            'tujuan': item.dst,
+            'status': item.status,
+            'metode': item.method or "",
+            'file': item.files,
+            'ukuran (KB)': round(item.size / 1024, 1),
+            'detik': round(item.seconds, 2),
+            'error': item.error or ""
+        } for item in self.items]
+
+    def summary(self):
+        counts = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return {
+            'items': len(self.items),
+            'succeeded': counts.get("berhasil", 0),
+            'skipped': counts.get("dilewati", 0),
+            'failed': counts.get("gagal", 0),
+            'bytes': self.done_bytes(),
+            'seconds': self.elapsed(),
+            'rate': self.rate()
+        }
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import posixpath
+import shlex
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from sshfm.browse import filter_entries
+from sshfm.content_cache import default_cache_dir
+from sshfm.listing import READ_AHEADS, entry_from_fields, make_entry, normalize_root
+
+# Jumlah direktori yang dipindai bersamaan saat walk lewat SFTP
+WALK_WORKERS = 6
+# Batas waktu perintah find di server (detik)
+FIND_TIMEOUT = 300
+# Satu record per entri, diakhiri NUL agar nama file berisi newline tetap aman
+FIND_FORMAT = r"%y\t%s\t%T@\t%p\0"
+# Ukuran potongan output find yang dibaca sekaligus
+FIND_CHUNK = 64 * 1024
+
+
+# Jalankan find -printf di server dan kembalikan {dir: {'mtime', 'entries'}}.
+# Mengembalikan None jika tidak ada shell atau find tidak mendukung -printf.
+# Output dibaca per potongan dan diurai per record, tidak ditampung utuh.
+def scan_with_find(ssh_client, root, timeout=FIND_TIMEOUT):
+    command = f"find {shlex.quote(root)} -printf {shlex.quote(FIND_FORMAT)} 2>/dev/null"
+    dirs = {}
+    try:
+        stdin, stdout, stderr = ssh_client.exec_command(command, timeout=timeout)
+        stdin.close()
+        for record in _find_records(stdout):
+            if not _add_find_record(dirs, root, record):
+                stdout.channel.close()
+                return None
+        exit_code = stdout.channel.recv_exit_status()
+    except Exception:
+        return None
+    # Exit code 1 berarti sebagian direktori tidak bisa dibaca; hasilnya tetap dipakai
+    if exit_code not in (0, 1):
+        return None
+    return dirs if root in dirs else None
+
+
+# Record find (tanpa NUL penutup) satu per satu dari stream stdout
+def _find_records(stdout):
+    rest = b""
+    while True:
+        chunk = stdout.read(FIND_CHUNK)
+        if not chunk:
+            break
+        records = (rest + chunk).split(b"\0")
+        rest = records.pop()
+        yield from records
+    if rest:
+        yield rest
+
+
+# Masukkan satu record find ke {dir: {'mtime', 'entries'}}; False jika formatnya
+# tidak dikenali (find tanpa -printf)
+def _add_find_record(dirs, root, record):
+    try:
+        kind, size, mtime, path = record.decode("utf-8", errors="replace").split("\t", 3)
+        size, mtime = int(size), int(float(mtime))
+    except ValueError:
+        return False
+    if path == root:
+        dirs.setdefault(root, {'mtime': mtime, 'entries': []})['mtime'] = mtime
+        return True
+    parent, name = posixpath.split(path)
+    is_dir = kind == "d"
+    dirs.setdefault(parent, {'mtime': None, 'entries': []})['entries'].append(
+        entry_from_fields(parent, name, size, mtime, is_dir))
+    if is_dir:
+        dirs.setdefault(path, {'mtime': mtime, 'entries': []})['mtime'] = mtime
+    return True
+
+
+# Filter hasil pencarian: nama (substring/glob), ekstensi, tipe, ukuran dan waktu ubah
+def search_entries(entries, name_query="", extensions=None, types=None,
+                   min_size=None, max_size=None, modified_after=None, modified_before=None):
+    result = []
+    for entry in filter_entries(entries, name_query, extensions, types):
+        if min_size is not None and entry['size'] < min_size:
+            continue
+        if max_size is not None and entry['size'] > max_size:
+            continue
+        if modified_after is not None and entry['mtime'] < modified_after:
+            continue
+        if modified_before is not None and entry['mtime'] > modified_before:
+            continue
+        result.append(entry)
+    return result
+
+
+# Satu direktori: stat dulu, listing hanya jika mtime berubah
+def _scan_dir(sftp_pool, path, previous):
+    with sftp_pool.channel("walk") as sftp:
+        mtime = sftp.stat(path).st_mtime
+        cached = previous.get(path)
+        if cached is not None and cached['mtime'] == mtime:
+            return mtime, cached['entries'], True
+        entries = [make_entry(path, attr) for attr in sftp.listdir_iter(path, read_aheads=READ_AHEADS)]
+        return mtime, entries, False
+
+
+# Telusuri pohon direktori lewat SFTP, beberapa direktori sekaligus di channel
+# pool. Symlink tidak diikuti sehingga tidak ada loop. Hasilnya
+# ({dir: {'mtime', 'entries'}}, {'listed', 'reused'}, [error per folder]).
+def walk_tree(sftp_pool, root, previous=None, workers=WALK_WORKERS, on_progress=None):
+    previous = previous or {}
+    dirs = {}
+    counts = {'listed': 0, 'reused': 0}
+    errors = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="walk") as executor:
+        pending = {executor.submit(_scan_dir, sftp_pool, root, previous): root}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    mtime, entries, reused = future.result()
+                except IOError as e:
+                    if path == root:
+                        raise
+                    errors.append(f"{path}: {e}")
+                    continue
+                dirs[path] = {'mtime': mtime, 'entries': entries}
+                counts['reused' if reused else 'listed'] += 1
+                for entry in entries:
+                    if entry['is_dir']:
+                        pending[executor.submit(_scan_dir, sftp_pool, entry['path'], previous)] = entry['path']
+            if on_progress:
+                on_progress(len(dirs), len(pending))
+    return dirs, counts, errors
+
+
+# Indeks lokal isi pohon direktori untuk satu (host, root), disimpan di disk.
+# Refresh bertahap (lewat SFTP): direktori yang mtime-nya tidak berubah tidak
+# di-listing ulang, cukup satu stat. Perubahan isi file tanpa tambah/hapus/rename
+# entri tidak mengubah mtime direktori, jadi hanya terlihat setelah refresh penuh.
+class TreeIndex:
+    def __init__(self, host, root, index_dir=None):
+        self.host = host
+        self.root = normalize_root(root)
+        self.index_dir = index_dir or default_cache_dir("index")
+        self.dirs = {}
+        self.updated = None
+        self.method = None
+        self.errors = []
+        self._lock = threading.Lock()
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.load()
+
+    @property
+    def file_path(self):
+        key = hashlib.sha256(f"{self.host}\0{self.root}".encode()).hexdigest()
+        return os.path.join(self.index_dir, key + ".json")
+
+    def load(self):
+        try:
+            with open(self.file_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        # Entri disimpan ringkas: [nama, size, mtime, is_dir]
+        self.dirs = {
+            path: {'mtime': item['mtime'],
+                   'entries': [entry_from_fields(path, *fields) for fields in item['entries']]}
+            for path, item in data['dirs'].items()
+        }
+        self.updated = data['updated']
+        self.method = data.get('method')
+        return True
+
+    def save(self):
+        data = {
+            'host': self.host,
+            'root': self.root,
+            'updated': self.updated,
+            'method': self.method,
+            'dirs': {
+                path: {'mtime': item['mtime'],
+                       'entries': [[e['name'], e['size'], e['mtime'], e['is_dir']] for e in item['entries']]}
+                for path, item in self.dirs.items()
+            }
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.file_path)
+
+    def is_empty(self):
+        return not self.dirs
+
+    def age(self):
+        return None if self.updated is None else time.time() - self.updated
+
+    def entry_count(self):
+        return sum(len(item['entries']) for item in self.dirs.values())
+
+    def entries(self):
+        for item in self.dirs.values():
+            yield from item['entries']
+
+    def search(self, **filters):
+        return search_entries(self.entries(), **filters)
+
+    # Perbarui indeks. method: "auto", "find" atau "sftp". "auto" memakai find
+    # untuk indeks baru atau refresh penuh (jika tersedia) dan walk SFTP bertahap
+    # untuk refresh biasa, karena find selalu membaca ulang seluruh pohon.
+    # Mengembalikan statistik: metode, direktori di-listing/dipakai ulang, durasi.
+    def refresh(self, sftp_pool, ssh_client=None, method="auto", full=False,
+                workers=WALK_WORKERS, on_progress=None):
+        start = time.monotonic()
+        stats = {'method': None, 'listed': 0, 'reused': 0, 'errors': 0}
+        dirs = None
+        use_find = method == "find" or (method == "auto" and (full or self.is_empty()))
+        if use_find and ssh_client is not None:
+            dirs = scan_with_find(ssh_client, self.root)
+            if dirs is not None:
+                stats['method'] = "find"
+                stats['listed'] = len(dirs)
+                self.errors = []
+        if dirs is None:
+            if method == "find":
+                raise IOError("find -printf tidak tersedia di server")
+            dirs = self._walk_sftp(sftp_pool, full, workers, stats, on_progress)
+            stats['method'] = "sftp"
+        with self._lock:
+            self.dirs = dirs
+            self.updated = time.time()
+            self.method = stats['method']
+        self.save()
+        stats['dirs'] = len(dirs)
+        stats['entries'] = self.entry_count()
+        stats['seconds'] = time.monotonic() - start
+        return stats
+
+    def _walk_sftp(self, sftp_pool, full, workers, stats, on_progress):
+        dirs, counts, errors = walk_tree(sftp_pool, self.root, {} if full else self.dirs,
+                                         workers, on_progress)
+        stats.update(counts)
+        self.errors = errors
+        stats['errors'] = len(errors)
+        return dirs
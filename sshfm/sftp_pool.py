@@ -0,0 +1,113 @@
+import socket
+import threading
+from contextlib import contextmanager
+
+import paramiko
+
+from sshfm.metrics import OpStats
+
+# Batas default channel SFTP yang boleh dipakai bersamaan per koneksi
+MAX_CHANNELS = 4
+# Window dan paket channel SFTP; window lebih besar dari default paramiko
+# (2 MB) mengurangi jeda menunggu WINDOW_ADJUST saat transfer besar
+WINDOW_SIZE = 16 * 1024 * 1024
+MAX_PACKET_SIZE = 32 * 1024
+# Kesalahan transport yang berarti channel rusak. Error status SFTP biasa
+# (file tidak ada, izin ditolak) juga IOError/OSError, jadi tidak termasuk.
+CHANNEL_ERRORS = (EOFError, paramiko.SSHException, ConnectionError, socket.timeout)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+# Buka channel SFTP di atas transport yang sudah ada dengan window yang disetel
+def open_sftp(ssh_client, window_size=WINDOW_SIZE, max_packet_size=MAX_PACKET_SIZE):
+    return paramiko.SFTPClient.from_transport(ssh_client.get_transport(),
+                                              window_size=window_size,
+                                              max_packet_size=max_packet_size)
+
+
+# Pool channel SFTP untuk satu SSHClient. Channel dipakai ulang antar
+# rerun Streamlit; channel yang mati dibuang dan dibuka ulang.
+class SFTPPool:
+    def __init__(self, ssh_client, max_channels=MAX_CHANNELS, acquire_timeout=30, stats=None,
+                 window_size=WINDOW_SIZE, max_packet_size=MAX_PACKET_SIZE):
+        self.ssh_client = ssh_client
+        self.window_size = window_size
+        self.max_packet_size = max_packet_size
+        self.max_channels = max_channels
+        self.acquire_timeout = acquire_timeout
+        self.stats = stats or OpStats()
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_channels)
+        self._closed = False
+
+    @staticmethod
+    def is_healthy(sftp):
+        channel = sftp.get_channel()
+        if channel is None or channel.closed:
+            return False
+        transport = channel.get_transport()
+        return transport is not None and transport.is_active()
+
+    def _open(self):
+        with self.stats.timed("open_sftp"):
+            return open_sftp(self.ssh_client, self.window_size, self.max_packet_size)
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                sftp = self._idle.pop() if self._idle else None
+            if sftp is None:
+                return self._open()
+            if self.is_healthy(sftp):
+                return sftp
+            self._discard(sftp)
+
+    def _checkin(self, sftp):
+        with self._lock:
+            if not self._closed and self.is_healthy(sftp):
+                self._idle.append(sftp)
+                return
+        self._discard(sftp)
+
+    @staticmethod
+    def _discard(sftp):
+        try:
+            sftp.close()
+        except Exception:
+            pass
+
+    # Pinjam satu channel; waktu di dalam blok dicatat sebagai operasi `op`
+    @contextmanager
+    def channel(self, op="sftp"):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise PoolTimeout(f"Semua {self.max_channels} channel SFTP sedang dipakai")
+        sftp = None
+        try:
+            sftp = self._checkout()
+            with self.stats.timed(op):
+                yield sftp
+        except CHANNEL_ERRORS:
+            # Channel kemungkinan rusak, jangan dikembalikan ke pool
+            if sftp is not None:
+                self._discard(sftp)
+                sftp = None
+            raise
+        finally:
+            if sftp is not None:
+                self._checkin(sftp)
+            self._slots.release()
+
+    def idle_count(self):
+        with self._lock:
+            return len(self._idle)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for sftp in idle:
+            self._discard(sftp)
@@ -0,0 +1,230 @@
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import paramiko
+
+from sshfm.metrics import OpStats
+from sshfm.sftp_pool import MAX_CHANNELS, SFTPPool
+
+# Kesalahan yang menandakan koneksi SSH sudah tidak bisa dipakai. Error status
+# SFTP (file tidak ada, izin ditolak) juga OSError, jadi socket.error tidak dipakai.
+CONNECTION_ERRORS = (EOFError, paramiko.SSHException, ConnectionError, socket.timeout)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class _Pooled:
+    def __init__(self, key, client):
+        self.key = key
+        self.client = client
+        self.last_used = time.monotonic()
+        self.reused = False
+        self.sftp_pool = None
+
+
+# Pool koneksi SSH untuk seluruh proses, dikunci per (host, user).
+# connect(host, user) harus mengembalikan SSHClient yang sudah terhubung.
+# Tiap koneksi bisa membawa satu SFTPPool (run_sftp) yang ikut dipakai ulang.
+class SSHConnectionPool:
+    def __init__(self, connect, max_size=8, idle_timeout=300, keepalive=30,
+                 acquire_timeout=30, stats=None, sftp_channels=MAX_CHANNELS):
+        self._connect = connect
+        self.max_size = max_size
+        self.sftp_channels = sftp_channels
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.acquire_timeout = acquire_timeout
+        self.stats = stats or OpStats()
+        self.handshakes = 0
+        self.reused = 0
+        self._idle = {}
+        self._total = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+        self._reaper.start()
+
+    @staticmethod
+    def is_healthy(client):
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def _open(self, key):
+        with self.stats.timed("connect", host=key[0]):
+            client = self._connect(*key)
+        transport = client.get_transport()
+        if transport is not None and self.keepalive:
+            transport.set_keepalive(self.keepalive)
+        with self._cond:
+            self.handshakes += 1
+        return _Pooled(key, client)
+
+    @staticmethod
+    def _close(item):
+        if item.sftp_pool is not None:
+            item.sftp_pool.close()
+        try:
+            item.client.close()
+        except Exception:
+            pass
+
+    def _release_slot(self):
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    # Ambil koneksi idle yang sehat, atau siapkan slot untuk koneksi baru
+    def _checkout(self, key):
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Pool koneksi sudah ditutup")
+                idle = self._idle.get(key)
+                while idle:
+                    item = idle.pop()
+                    if self.is_healthy(item.client):
+                        self.reused += 1
+                        item.reused = True
+                        return item
+                    self._total -= 1
+                    self._close(item)
+                if self._total < self.max_size:
+                    self._total += 1
+                    break
+                # Pool penuh: korbankan koneksi idle milik key lain yang paling lama
+                victim = self._oldest_idle()
+                if victim is not None:
+                    self._idle[victim.key].remove(victim)
+                    self._close(victim)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"Semua {self.max_size} koneksi SSH sedang dipakai")
+                self._cond.wait(remaining)
+        try:
+            return self._open(key)
+        except BaseException:
+            self._release_slot()
+            raise
+
+    def _oldest_idle(self):
+        oldest = None
+        for items in self._idle.values():
+            for item in items:
+                if oldest is None or item.last_used < oldest.last_used:
+                    oldest = item
+        return oldest
+
+    def _checkin(self, item):
+        item.last_used = time.monotonic()
+        with self._cond:
+            if not self._closed and self.is_healthy(item.client):
+                self._idle.setdefault(item.key, []).append(item)
+                self._cond.notify()
+                return
+        self._close(item)
+        self._release_slot()
+
+    def _discard(self, item):
+        self._close(item)
+        self._release_slot()
+
+    @contextmanager
+    def connection(self, host, user):
+        item = self._checkout((host, user))
+        try:
+            yield item.client
+        except CONNECTION_ERRORS:
+            self._discard(item)
+            raise
+        except BaseException:
+            self._checkin(item)
+            raise
+        else:
+            self._checkin(item)
+
+    # Jalankan fn(client). Jika koneksi hasil pakai ulang ternyata putus,
+    # operasi diulang sekali dengan koneksi baru.
+    def run(self, host, user, fn, op="ssh"):
+        return self._run(host, user, lambda item: fn(item.client), op)
+
+    # Seperti run(), tetapi fn menerima SFTPPool milik koneksi itu. Channel SFTP
+    # dibuka sekali per koneksi dan dipakai ulang sampai koneksinya ditutup.
+    def run_sftp(self, host, user, fn, op="sftp"):
+        return self._run(host, user, lambda item: fn(self._sftp_pool(item)), op)
+
+    # Koneksi sedang dipinjam satu pemanggil, jadi tidak perlu dikunci
+    def _sftp_pool(self, item):
+        if item.sftp_pool is None:
+            item.sftp_pool = SFTPPool(item.client, max_channels=self.sftp_channels, stats=self.stats)
+        return item.sftp_pool
+
+    def _run(self, host, user, fn, op):
+        for attempt in range(2):
+            item = self._checkout((host, user))
+            try:
+                with self.stats.timed(op, host=host):
+                    result = fn(item)
+            except CONNECTION_ERRORS:
+                self._discard(item)
+                if attempt or not item.reused:
+                    raise
+                continue
+            except BaseException:
+                self._checkin(item)
+                raise
+            self._checkin(item)
+            return result
+
+    # Tutup koneksi idle yang melewati idle_timeout
+    def evict_idle(self):
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            for key, items in self._idle.items():
+                keep = []
+                for item in items:
+                    if now - item.last_used > self.idle_timeout or not self.is_healthy(item.client):
+                        expired.append(item)
+                    else:
+                        keep.append(item)
+                self._idle[key] = keep
+            self._total -= len(expired)
+            if expired:
+                self._cond.notify_all()
+        for item in expired:
+            self._close(item)
+        return len(expired)
+
+    def _reap_loop(self):
+        interval = max(1, min(self.idle_timeout / 2, 30))
+        while True:
+            time.sleep(interval)
+            with self._cond:
+                if self._closed:
+                    return
+            self.evict_idle()
+
+    def info(self):
+        with self._cond:
+            return {
+                'total': self._total,
+                'idle': sum(len(items) for items in self._idle.values()),
+                'handshakes': self.handshakes,
+                'reused': self.reused
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            items = [item for items in self._idle.values() for item in items]
+            self._idle = {}
+            self._total -= len(items)
+            self._cond.notify_all()
+        for item in items:
+            self._close(item)
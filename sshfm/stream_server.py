@@ -0,0 +1,105 @@
+import os
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+# st.download_button selalu menampung seluruh isi di memori, jadi archive
+# folder dan file unduhan dialirkan lewat server HTTP kecil ini. Alamatnya
+# bisa diubah lewat environment jika browser tidak berjalan di mesin yang sama.
+STREAM_HOST = os.environ.get("SSHFM_STREAM_HOST", "127.0.0.1")
+STREAM_PORT = int(os.environ.get("SSHFM_STREAM_PORT", "0"))
+STREAM_URL = os.environ.get("SSHFM_STREAM_URL")
+# Link yang belum dibuka kedaluwarsa setelah waktu ini (detik)
+LINK_TTL = 600
+# Potongan yang dibaca per write() saat mengalirkan file lokal
+FILE_CHUNK = 1024 * 1024
+
+
+# Isi file lokal per potongan; file baru dibuka saat aliran mulai dan
+# ditutup saat selesai atau dihentikan (close() dari handler)
+def file_stream(path, chunk_size=FILE_CHUNK):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            yield chunk
+
+
+# Server HTTP lokal untuk mengalirkan generator byte ke browser. Setiap
+# link memakai token acak dan hanya bisa dibuka sekali, kecuali didaftarkan
+# dengan once=False (berlaku sampai kedaluwarsa).
+class StreamServer:
+    def __init__(self, host=STREAM_HOST, port=STREAM_PORT, base_url=STREAM_URL, link_ttl=LINK_TTL):
+        self.link_ttl = link_ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+        else:
+            self.base_url = f"http://{host}:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    # Daftarkan generator; open_stream() dipanggil saat link dibuka
+    def register(self, filename, content_type, open_stream, once=True):
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._expire()
+            self._jobs[token] = (time.monotonic(), filename, content_type, open_stream, once)
+        return f"{self.base_url}/{token}/{quote(filename)}"
+
+    def _take(self, token):
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(token)
+            if job is not None and job[4]:
+                del self._jobs[token]
+        return job[1:4] if job else None
+
+    def _expire(self):
+        now = time.monotonic()
+        for token in [t for t, job in self._jobs.items() if now - job[0] > self.link_ttl]:
+            del self._jobs[token]
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                token = self.path.lstrip("/").split("/", 1)[0]
+                job = server._take(token)
+                if job is None:
+                    self.send_error(404, "Link tidak ditemukan atau sudah dipakai")
+                    return
+                filename, content_type, open_stream = job
+                try:
+                    stream = open_stream()
+                except Exception as e:
+                    self.send_error(502, "Gagal membuka file", f"{filename}: {e}")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(filename)}")
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                try:
+                    for chunk in stream:
+                        self.wfile.write(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                except Exception:
+                    # Header sudah terkirim; koneksi ditutup sehingga download gagal di browser
+                    pass
+                finally:
+                    stream.close()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,236 @@
+import hashlib
+import mmap
+import os
+import posixpath
+import shlex
+import time
+from contextlib import contextmanager
+
+from sshfm.search import normalize_root, walk_tree
+from sshfm.transfer import UPLOAD_WORKERS, BatchUpload, UploadItem
+
+# Cara membandingkan file lokal dengan file di server
+COMPARE_MODES = {
+    "mtime": "Ukuran + waktu ubah",
+    "size": "Ukuran saja",
+    "checksum": "Ukuran + sha256 (sha256sum di server)",
+}
+# Panjang maksimum argumen satu perintah sha256sum
+CHECKSUM_ARGS_LIMIT = 64 * 1024
+
+
+# Satu file sumber: dari buffer upload browser (tanpa mtime) atau dari disk lokal
+class SourceFile:
+    def __init__(self, rel_path, size, mtime=None, data=None, local_path=None):
+        self.rel_path = rel_path
+        self.size = size
+        self.mtime = mtime
+        self.data = data
+        self.local_path = local_path
+        self._sha256 = None
+
+    # Isi file sebagai buffer selama blok with; file lokal di-mmap (tidak
+    # dibaca ke memori) dan ditutup lagi begitu blok selesai
+    @contextmanager
+    def open_buffer(self):
+        if self.data is not None:
+            yield self.data
+            return
+        if self.size == 0:
+            yield b""
+            return
+        with open(self.local_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+    def sha256(self):
+        if self._sha256 is None:
+            with self.open_buffer() as buffer:
+                self._sha256 = hashlib.sha256(buffer).hexdigest()
+        return self._sha256
+
+
+# Semua file di bawah folder lokal, path relatif memakai '/'
+def scan_local_dir(root):
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            st = os.stat(path)
+            rel = os.path.relpath(path, root).replace(os.sep, "/")
+            sources.append(SourceFile(rel, st.st_size, st.st_mtime, local_path=path))
+    return sources
+
+
+# File dari st.file_uploader (mode folder: nama berisi path relatif).
+# strip_top membuang nama folder teratas sehingga isinya langsung ke tujuan.
+def sources_from_uploads(uploaded_files, strip_top=False):
+    sources = []
+    for uploaded_file in uploaded_files:
+        rel = uploaded_file.name.replace("\\", "/").lstrip("/")
+        if strip_top and "/" in rel:
+            rel = rel.split("/", 1)[1]
+        sources.append(SourceFile(rel, uploaded_file.size, data=uploaded_file.getbuffer()))
+    return sources
+
+
+# sha256 file di server lewat sha256sum, beberapa file per perintah.
+# Hasilnya {path relatif: hex}; file yang gagal dibaca tidak ada di hasil.
+def remote_checksums(ssh_client, remote_root, rel_paths):
+    checksums = {}
+    batches, batch, size = [], [], 0
+    for rel in rel_paths:
+        if batch and size + len(rel) > CHECKSUM_ARGS_LIMIT:
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(rel)
+        size += len(rel) + 3
+    if batch:
+        batches.append(batch)
+    for batch in batches:
+        command = f"cd {shlex.quote(remote_root)} && sha256sum -- " + " ".join(shlex.quote(r) for r in batch)
+        stdin, stdout, stderr = ssh_client.exec_command(command)
+        output = stdout.read().decode("utf-8", errors="replace")
+        exit_code = stdout.channel.recv_exit_status()
+        if exit_code != 0 and not output:
+            raise IOError(stderr.read().decode("utf-8", errors="replace").strip()
+                          or f"sha256sum exit code {exit_code}")
+        for line in output.splitlines():
+            # Nama berisi backslash/newline ditulis dengan escape dan diawali '\'
+            escaped = line.startswith("\\")
+            digest, _, name = line.lstrip("\\").partition("  ")
+            if escaped:
+                name = _unescape_name(name)
+            checksums[name] = digest
+    return checksums
+
+
+def _unescape_name(name):
+    result = []
+    chars = iter(name)
+    for char in chars:
+        if char == "\\":
+            char = {"n": "\n", "r": "\r", "\\": "\\"}.get(next(chars, ""), "")
+        result.append(char)
+    return "".join(result)
+
+
+# Hasil perbandingan satu file
+class SyncAction:
+    def __init__(self, source, remote, action, reason):
+        self.source = source
+        self.remote = remote
+        self.action = action
+        self.reason = reason
+
+
+# Rencana sinkronisasi (dry-run): file baru, berubah dan sama. start()
+# hanya mengunggah file baru/berubah secara paralel.
+class SyncPlan:
+    def __init__(self, remote_root, actions, remote_dirs, remote_only, seconds):
+        self.remote_root = remote_root
+        self.actions = actions
+        self.remote_dirs = remote_dirs
+        self.remote_only = remote_only
+        self.seconds = seconds
+
+    def changed(self):
+        return [a for a in self.actions if a.action in ("baru", "berubah")]
+
+    def counts(self):
+        counts = {'baru': 0, 'berubah': 0, 'sama': 0, 'konflik': 0}
+        for action in self.actions:
+            counts[action.action] += 1
+        counts['upload_bytes'] = sum(a.source.size for a in self.changed())
+        counts['hanya di server'] = len(self.remote_only)
+        return counts
+
+    def rows(self, include_same=False):
+        return [{
+            'file': a.source.rel_path,
+            'aksi': a.action,
+            'alasan': a.reason,
+            'lokal (KB)': round(a.source.size / 1024, 1),
+            'server (KB)': round(a.remote['size'] / 1024, 1) if a.remote else None,
+        } for a in self.actions if include_same or a.action != "sama"]
+
+    # Buat folder yang belum ada lalu unggah file yang berubah
+    def start(self, sftp_pool, workers=UPLOAD_WORKERS):
+        changed = self.changed()
+        needed = set()
+        for action in changed:
+            parent = posixpath.dirname(action.source.rel_path)
+            while parent:
+                needed.add(parent)
+                parent = posixpath.dirname(parent)
+        missing = [self.remote_root] if self.remote_root not in self.remote_dirs else []
+        missing += [posixpath.join(self.remote_root, d) for d in sorted(needed)]
+        missing = [d for d in missing if d not in self.remote_dirs]
+        if missing:
+            with sftp_pool.channel("mkdir") as sftp:
+                for path in missing:
+                    try:
+                        sftp.mkdir(path)
+                    except IOError:
+                        # Sudah ada (dibuat proses lain); kegagalan lain muncul saat upload
+                        pass
+        # File dibuka di worker upload, jadi yang terbuka bersamaan paling
+        # banyak sebanyak worker
+        items = [UploadItem(a.source.rel_path, a.source.open_buffer,
+                            posixpath.join(self.remote_root, a.source.rel_path),
+                            mtime=a.source.mtime, size=a.source.size) for a in changed]
+        return BatchUpload(sftp_pool, items, workers=workers).start()
+
+
+# Bandingkan file sumber dengan isi remote_root di server dan buat rencana.
+# compare: "mtime" (ukuran + waktu ubah), "size" atau "checksum".
+def plan_sync(sftp_pool, sources, remote_root, compare="mtime", ssh_client=None,
+              workers=UPLOAD_WORKERS):
+    start = time.monotonic()
+    remote_root = normalize_root(remote_root)
+    try:
+        dirs, _, _ = walk_tree(sftp_pool, remote_root, workers=workers)
+    except IOError:
+        # Folder tujuan belum ada: semua file baru
+        dirs = {}
+    remote = {}
+    for item in dirs.values():
+        for entry in item['entries']:
+            remote[posixpath.relpath(entry['path'], remote_root)] = entry
+
+    actions = []
+    verify = []
+    for source in sources:
+        entry = remote.get(source.rel_path)
+        if entry is None:
+            actions.append(SyncAction(source, None, "baru", "belum ada di server"))
+        elif entry['is_dir']:
+            actions.append(SyncAction(source, entry, "konflik", "sudah ada sebagai folder"))
+        elif entry['size'] != source.size:
+            actions.append(SyncAction(source, entry, "berubah", "ukuran berbeda"))
+        elif compare == "checksum":
+            verify.append(SyncAction(source, entry, "sama", "sha256 sama"))
+            actions.append(verify[-1])
+        elif compare == "mtime" and source.mtime is not None and int(source.mtime) != entry['mtime']:
+            actions.append(SyncAction(source, entry, "berubah", "waktu ubah berbeda"))
+        else:
+            actions.append(SyncAction(source, entry, "sama",
+                                      "ukuran dan waktu ubah sama" if compare == "mtime" and source.mtime is not None
+                                      else "ukuran sama"))
+
+    # Checksum hanya untuk file yang ukurannya sama; sisanya sudah pasti berubah
+    if verify:
+        if ssh_client is None:
+            raise IOError("Perbandingan checksum butuh akses shell (exec)")
+        checksums = remote_checksums(ssh_client, remote_root, [a.source.rel_path for a in verify])
+        for action in verify:
+            digest = checksums.get(action.source.rel_path)
+            if digest is None:
+                action.action, action.reason = "berubah", "checksum server tidak tersedia"
+            elif digest != action.source.sha256():
+                action.action, action.reason = "berubah", "sha256 berbeda"
+
+    local_paths = {s.rel_path for s in sources}
+    remote_only = sorted(rel for rel, entry in remote.items()
+                         if not entry['is_dir'] and rel not in local_paths)
+    return SyncPlan(remote_root, actions, set(dirs), remote_only, time.monotonic() - start)
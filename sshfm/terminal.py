@@ -0,0 +1,142 @@
+import codecs
+import select
+import threading
+import time
+from collections import deque
+
+# Batas output terbaru yang disimpan per perintah (karakter)
+BUFFER_LIMIT = 256 * 1024
+RECV_SIZE = 32768
+
+
+# Ring buffer teks dengan batas ukuran; bagian tertua dibuang lebih dulu
+class OutputBuffer:
+    def __init__(self, limit=BUFFER_LIMIT):
+        self.limit = limit
+        self.dropped = 0
+        self._chunks = deque()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def append(self, text):
+        if not text:
+            return
+        with self._lock:
+            self._chunks.append(text)
+            self._size += len(text)
+            while self._size > self.limit:
+                excess = self._size - self.limit
+                head = self._chunks[0]
+                if len(head) <= excess:
+                    self._chunks.popleft()
+                    self._size -= len(head)
+                    self.dropped += len(head)
+                else:
+                    self._chunks[0] = head[excess:]
+                    self._size -= excess
+                    self.dropped += excess
+
+    def text(self):
+        with self._lock:
+            return "".join(self._chunks)
+
+
+# Jalankan satu perintah lewat exec dan baca stdout/stderr bersamaan per
+# potongan di thread latar, jadi output bisa ditampilkan selagi perintah
+# berjalan dan stderr yang penuh tidak membuat stdout macet. Jika stats
+# diberikan, durasi dan byte output dicatat sebagai operasi "exec".
+class CommandRun:
+    def __init__(self, ssh_client, command, timeout=None, max_buffer=BUFFER_LIMIT, stats=None, host=None):
+        self.ssh_client = ssh_client
+        self.command = command
+        self.timeout = timeout
+        self.stats = stats
+        self.host = host
+        self.stdout = OutputBuffer(max_buffer)
+        self.stderr = OutputBuffer(max_buffer)
+        self.status = "menunggu"
+        self.exit_code = None
+        self.error = None
+        self.bytes_received = 0
+        self.start_time = None
+        self.end_time = None
+        self._channel = None
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.start_time = time.monotonic()
+        self.status = "berjalan"
+        try:
+            self._channel = self.ssh_client.get_transport().open_session()
+            self._channel.exec_command(self.command)
+        except Exception as e:
+            self._finish("error", str(e))
+            return self
+        self._thread = threading.Thread(target=self._pump, daemon=True)
+        self._thread.start()
+        return self
+
+    def _pump(self):
+        channel = self._channel
+        out_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        err_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            while True:
+                if self._cancel.is_set():
+                    channel.close()
+                    self._finish("dibatalkan")
+                    return
+                if self.timeout and time.monotonic() - self.start_time > self.timeout:
+                    channel.close()
+                    self._finish("timeout")
+                    return
+                got_data = False
+                while channel.recv_ready():
+                    data = channel.recv(RECV_SIZE)
+                    self.bytes_received += len(data)
+                    self.stdout.append(out_decoder.decode(data))
+                    got_data = True
+                while channel.recv_stderr_ready():
+                    data = channel.recv_stderr(RECV_SIZE)
+                    self.bytes_received += len(data)
+                    self.stderr.append(err_decoder.decode(data))
+                    got_data = True
+                if channel.exit_status_ready() and not channel.recv_ready() and not channel.recv_stderr_ready():
+                    self.stdout.append(out_decoder.decode(b"", final=True))
+                    self.stderr.append(err_decoder.decode(b"", final=True))
+                    self.exit_code = channel.recv_exit_status()
+                    channel.close()
+                    self._finish("selesai")
+                    return
+                if not got_data:
+                    # Tunggu data baru tanpa busy loop
+                    select.select([channel], [], [], 0.1)
+        except Exception as e:
+            self._finish("error", str(e))
+
+    def _finish(self, status, error=None):
+        self.status = status
+        self.error = error
+        self.end_time = time.monotonic()
+        if self.stats is not None:
+            self.stats.record("exec", self.end_time - self.start_time, status in ("error", "timeout"),
+                              nbytes=self.bytes_received, host=self.host)
+
+    def cancel(self):
+        self._cancel.set()
+        if self._thread is None and self.is_running():
+            self._finish("dibatalkan")
+
+    def is_running(self):
+        return self.status in ("menunggu", "berjalan")
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_running()
+
+    def elapsed(self):
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.monotonic()) - self.start_time
@@ -0,0 +1,274 @@
+import base64
+import hashlib
+import io
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from sshfm.content_cache import default_cache_dir
+from sshfm.jobs import PRIORITY_BACKGROUND
+
+THUMB_SIZE = (200, 200)
+# Batas ukuran file yang diunduh utuh untuk dibuat thumbnail
+MAX_FULL_SIZE = 1024 * 1024
+# Segmen APP1 (EXIF) paling besar 64 KB dan berada di awal file JPEG
+EXIF_READ_SIZE = 64 * 1024
+WORKERS = 4
+# Batas total thumbnail di disk sebelum yang paling lama tidak dipakai dibuang
+MAX_DISK_BYTES = 100 * 1024 * 1024
+# Gagal baca karena jaringan (timeout, pool penuh) dicoba lagi setelah ini (detik)
+RETRY_AFTER = 30
+
+_MIME_BY_FORMAT = {'PNG': 'image/png', 'GIF': 'image/gif', 'WEBP': 'image/webp', 'BMP': 'image/bmp'}
+
+
+# Isi file tidak bisa dijadikan thumbnail (format rusak/tak dikenal, terlalu
+# besar); hasilnya tetap sama selama file tidak berubah, jadi boleh di-cache
+class ThumbnailError(Exception):
+    pass
+
+
+# Ambil thumbnail JPEG yang tertanam di EXIF (IFD1) dari potongan awal file
+def read_exif_thumbnail(head):
+    if head[:2] != b'\xff\xd8':
+        return None
+    pos = 2
+    while pos + 4 <= len(head):
+        if head[pos] != 0xFF:
+            return None
+        marker = head[pos + 1]
+        length = struct.unpack('>H', head[pos + 2:pos + 4])[0]
+        if marker == 0xDA:
+            return None
+        if marker == 0xE1 and head[pos + 4:pos + 10] == b'Exif\x00\x00':
+            return _thumbnail_from_tiff(head[pos + 10:pos + 2 + length])
+        pos += 2 + length
+    return None
+
+
+def _thumbnail_from_tiff(tiff):
+    try:
+        order = {b'II': '<', b'MM': '>'}[tiff[:2]]
+        ifd0 = struct.unpack(order + 'I', tiff[4:8])[0]
+        count = struct.unpack(order + 'H', tiff[ifd0:ifd0 + 2])[0]
+        next_ifd = ifd0 + 2 + count * 12
+        ifd1 = struct.unpack(order + 'I', tiff[next_ifd:next_ifd + 4])[0]
+        if not ifd1:
+            return None
+        count = struct.unpack(order + 'H', tiff[ifd1:ifd1 + 2])[0]
+        offset = length = None
+        for i in range(count):
+            entry = tiff[ifd1 + 2 + i * 12:ifd1 + 14 + i * 12]
+            tag = struct.unpack(order + 'H', entry[:2])[0]
+            value = struct.unpack(order + 'I', entry[8:12])[0]
+            if tag == 0x0201:
+                offset = value
+            elif tag == 0x0202:
+                length = value
+        if offset is None or not length or offset + length > len(tiff):
+            return None
+        return tiff[offset:offset + length]
+    except (KeyError, struct.error):
+        return None
+
+
+# Resize gambar lalu encode base64, hasilnya (mime, b64)
+def render_thumbnail(data, size=THUMB_SIZE):
+    img = Image.open(io.BytesIO(data))
+    fmt = img.format if img.format else "JPEG"
+    # JPEG bisa didekode langsung pada skala kecil (DCT scaling)
+    img.draft('RGB', size)
+    img.thumbnail(size)
+    buffered = io.BytesIO()
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    img.save(buffered, format=fmt)
+    return _MIME_BY_FORMAT.get(fmt, 'image/jpeg'), base64.b64encode(buffered.getvalue()).decode()
+
+
+def _render(data):
+    try:
+        return render_thumbnail(data)
+    except Exception as e:
+        raise ThumbnailError(f"Gambar tidak bisa dibaca: {e}") from None
+
+
+# Buat thumbnail dari file remote lewat backend SFTP. File besar hanya
+# dibaca sebagian (thumbnail EXIF) jika formatnya memungkinkan. Error
+# baca dari backend diteruskan apa adanya; isi yang tidak bisa dijadikan
+# thumbnail menjadi ThumbnailError.
+def generate_thumbnail(backend, file_path, file_size, max_size=MAX_FULL_SIZE):
+    ext = os.path.splitext(file_path)[1].lower()
+    if file_size <= max_size:
+        return _render(backend.read(file_path, 0, file_size))
+    if ext in ('.jpg', '.jpeg'):
+        head = backend.read(file_path, 0, EXIF_READ_SIZE)
+        embedded = read_exif_thumbnail(head)
+        if embedded:
+            return _render(embedded)
+    raise ThumbnailError("File terlalu besar untuk preview")
+
+
+# Cache thumbnail dua tingkat: LRU di memori dan file di disk (dibatasi
+# max_bytes, yang paling lama tidak dipakai dibuang seperti ContentCache).
+# Kunci (host, path, size, mtime), jadi file yang berubah otomatis dibuat ulang.
+class ThumbnailCache:
+    def __init__(self, root=None, mem_items=512, max_bytes=MAX_DISK_BYTES):
+        self.root = root or default_cache_dir("thumbnails")
+        self.mem_items = mem_items
+        self.max_bytes = max_bytes
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        # Perkiraan total di disk; dihitung ulang setiap prune
+        self._disk_bytes = 0
+        self.prune()
+
+    @staticmethod
+    def make_key(host, path, size, mtime):
+        return hashlib.sha256(f"{host}\0{path}\0{size}\0{mtime}".encode()).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                return self._mem[key]
+        path = os.path.join(self.root, key + ".thumb")
+        try:
+            with open(path) as f:
+                mime, b64 = f.read().split("\n", 1)
+            # Waktu ubah menandai kapan terakhir dipakai (urutan LRU prune)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        value = ('ready', (mime, b64))
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self._remember(key, value)
+        status, payload = value
+        if status != 'ready':
+            return
+        tmp_path = os.path.join(self.root, f"{key}.{threading.get_ident()}.tmp")
+        text = "\n".join(payload)
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(text)
+            os.replace(tmp_path, os.path.join(self.root, key + ".thumb"))
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes += len(text)
+            over = self._disk_bytes > self.max_bytes
+        if over:
+            self.prune()
+
+    # Buang thumbnail di disk yang paling lama tidak dipakai sampai di bawah max_bytes
+    def prune(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.root):
+            if not name.endswith(".thumb"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._mem[key] = value
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.mem_items:
+                self._mem.popitem(last=False)
+
+
+# Pembuat thumbnail di latar belakang dengan jumlah worker terbatas.
+# get() tidak pernah menunggu jaringan: hasilnya 'ready', 'pending' atau 'error'.
+# Hanya ThumbnailError yang di-cache; gagal baca (timeout, pool penuh) diingat
+# di memori dan dicoba lagi setelah RETRY_AFTER detik.
+# Dengan jobs (JobManager) thumbnail memakai antrean job sesi dengan prioritas
+# rendah, sehingga download/upload pengguna didahulukan.
+class ThumbnailService:
+    def __init__(self, backend, host, cache=None, workers=WORKERS, max_size=MAX_FULL_SIZE, jobs=None):
+        self.backend = backend
+        self.host = host
+        self.cache = cache or ThumbnailCache()
+        self.max_size = max_size
+        self.jobs = jobs
+        self._executor = None
+        if jobs is None:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnail")
+        self._pending = set()
+        self._failed = {}
+        self._lock = threading.Lock()
+
+    def get(self, entry):
+        key = self.cache.make_key(self.host, entry['path'], entry['size'], entry['mtime'])
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            failed = self._failed.get(key)
+            if failed is not None and time.monotonic() - failed[0] < RETRY_AFTER:
+                return ('error', failed[1])
+            if key not in self._pending:
+                self._pending.add(key)
+                # Pending dilepas saat job/future selesai, juga jika dibatalkan sebelum berjalan
+                if self.jobs is not None:
+                    self.jobs.submit("thumbnail", entry['path'],
+                                     lambda job, path=entry['path'], size=entry['size']: self._generate(key, path, size),
+                                     priority=PRIORITY_BACKGROUND, visible=False,
+                                     on_done=lambda job: self._done(key))
+                else:
+                    future = self._executor.submit(self._generate, key, entry['path'], entry['size'])
+                    future.add_done_callback(lambda future: self._done(key))
+        return ('pending', None)
+
+    def _generate(self, key, path, size):
+        try:
+            value = ('ready', generate_thumbnail(self.backend, path, size, self.max_size))
+        except ThumbnailError as e:
+            value = ('error', str(e))
+        except Exception as e:
+            now = time.monotonic()
+            with self._lock:
+                for old in [k for k, (when, _) in self._failed.items() if now - when >= RETRY_AFTER]:
+                    del self._failed[old]
+                self._failed[key] = (now, str(e))
+            return
+        self.cache.put(key, value)
+        with self._lock:
+            self._failed.pop(key, None)
+
+    def _done(self, key):
+        with self._lock:
+            self._pending.discard(key)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
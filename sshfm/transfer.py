@@ -0,0 +1,374 @@
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait as futures_wait
+
+# Ukuran potongan yang ditulis per panggilan write() saat upload
+UPLOAD_CHUNK = 256 * 1024
+MB = 1024 * 1024
+# Jumlah worker default untuk upload banyak file
+UPLOAD_WORKERS = 4
+# Download besar dipecah per rentang RANGE_SIZE, dibaca per READ_BLOCK
+RANGE_SIZE = 8 * MB
+READ_BLOCK = 256 * 1024
+RANGE_WORKERS = 4
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+# Hitung throughput dan batasi frekuensi update UI
+class ProgressMeter:
+    def __init__(self, total, on_update, interval=0.2):
+        self.total = total
+        self.on_update = on_update
+        self.interval = interval
+        self.done = 0
+        self.start = time.perf_counter()
+        self._last = 0.0
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.start
+        return self.done / elapsed / MB if elapsed > 0 else 0.0
+
+    def update(self, done):
+        self.done = done
+        now = time.perf_counter()
+        if done >= self.total or now - self._last >= self.interval:
+            self._last = now
+            self.on_update(done, self.total, self.rate())
+
+    def add(self, count):
+        self.update(self.done + count)
+
+
+# Nama sementara di samping file tujuan; tujuan baru diganti setelah
+# datanya lengkap sehingga isi lama tetap utuh jika transfer gagal/dibatalkan
+def remote_part_path(remote_path):
+    return f"{remote_path}.part-{secrets.token_hex(4)}"
+
+
+# Ganti target dengan file sementara. posix-rename menimpa secara atomik;
+# server tanpa ekstensi itu: target dihapus dulu lalu RENAME biasa.
+def replace_remote(sftp, part_path, remote_path):
+    try:
+        sftp.posix_rename(part_path, remote_path)
+        return
+    except IOError as e:
+        if "unsupported" not in str(e).lower():
+            raise
+    try:
+        sftp.remove(remote_path)
+    except IOError:
+        pass
+    sftp.rename(part_path, remote_path)
+
+
+# Hapus file sementara setelah gagal; error diabaikan agar error asli yang naik
+def discard_remote(sftp, part_path):
+    try:
+        sftp.remove(part_path)
+    except Exception:
+        pass
+
+
+# Upload langsung dari buffer di memori (bytes/memoryview) ke file sementara
+# di server, lalu diganti namanya menjadi remote_path setelah selesai.
+# Request WRITE dipipeline sehingga klien tidak menunggu ACK tiap potongan.
+def upload_buffer(sftp, data, remote_path, chunk_size=UPLOAD_CHUNK, on_progress=None):
+    part_path = remote_part_path(remote_path)
+    try:
+        # View dilepas sebelum kembali agar buffer mmap bisa langsung ditutup
+        with memoryview(data) as base, base.cast("B") as view:
+            total = len(view)
+            with sftp.open(part_path, "wb") as f:
+                f.set_pipelined(True)
+                for offset in range(0, total, chunk_size):
+                    with view[offset:offset + chunk_size] as chunk:
+                        f.write(chunk)
+                    if on_progress:
+                        on_progress(min(offset + chunk_size, total))
+        replace_remote(sftp, part_path, remote_path)
+    except BaseException:
+        discard_remote(sftp, part_path)
+        raise
+    if on_progress and total == 0:
+        on_progress(0)
+    return total
+
+
+def format_progress(label, done, total, rate):
+    return f"{label}: {done / MB:.1f} / {total / MB:.1f} MB — {rate:.2f} MB/s"
+
+
+# Buffer item upload: data langsung, atau data() yang membuka buffer sebagai
+# context manager (mis. mmap file lokal) tepat sebelum diunggah
+@contextmanager
+def _open_data(data):
+    if callable(data):
+        with data() as buffer:
+            yield buffer
+    else:
+        yield data
+
+
+# Satu file dalam batch upload beserta statusnya. data boleh berupa fungsi
+# pembuka (lihat _open_data); size wajib diisi untuk data seperti itu.
+class UploadItem:
+    def __init__(self, name, data, remote_path, mtime=None, size=None):
+        self.name = name
+        self.data = data
+        self.remote_path = remote_path
+        # Jika diisi, waktu ubah file di server disamakan dengan file sumber
+        self.mtime = mtime
+        self.size = size if size is not None else len(memoryview(data).cast("B"))
+        self.sent = 0
+        self.status = "menunggu"
+        self.attempts = 0
+        self.error = None
+        self.seconds = 0.0
+
+
+# Upload banyak file sekaligus, disebar ke beberapa channel SFTP di atas
+# transport yang sama. File yang gagal dicoba ulang sampai `retries` kali.
+class BatchUpload:
+    def __init__(self, sftp_pool, items, workers=UPLOAD_WORKERS, retries=2):
+        self.sftp_pool = sftp_pool
+        self.items = items
+        self.workers = max(1, min(workers, sftp_pool.max_channels))
+        self.retries = retries
+        self.total = sum(item.size for item in items)
+        self.start_time = None
+        self.end_time = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._executor = None
+        self._futures = []
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="upload")
+        self._futures = [self._executor.submit(self._upload, item) for item in self.items]
+        self._executor.shutdown(wait=False)
+        return self
+
+    def _set_sent(self, item, sent):
+        with self._lock:
+            item.sent = sent
+
+    # Dipanggil per potongan; pembatalan menghentikan upload di tengah file
+    def _on_progress(self, item, sent):
+        if self._cancel.is_set():
+            raise TransferCancelled()
+        self._set_sent(item, sent)
+
+    def _upload(self, item):
+        for attempt in range(self.retries + 1):
+            if self._cancel.is_set():
+                item.status = "dibatalkan"
+                return
+            item.attempts = attempt + 1
+            item.status = "mengunggah"
+            self._set_sent(item, 0)
+            start = time.perf_counter()
+            try:
+                with self.sftp_pool.channel("upload") as sftp, _open_data(item.data) as data:
+                    upload_buffer(sftp, data, item.remote_path,
+                                  on_progress=lambda sent: self._on_progress(item, sent))
+                    if item.mtime is not None:
+                        sftp.utime(item.remote_path, (item.mtime, item.mtime))
+                self.sftp_pool.stats.add_bytes("upload", item.size)
+                item.seconds = time.perf_counter() - start
+                item.status = "berhasil"
+                item.error = None
+                return
+            except TransferCancelled:
+                item.status = "dibatalkan"
+                return
+            except Exception as e:
+                item.error = str(e)
+                item.status = "mencoba ulang" if attempt < self.retries else "gagal"
+                self._set_sent(item, 0)
+                if attempt < self.retries:
+                    time.sleep(0.5 * (attempt + 1))
+
+    # File yang belum selesai dihentikan; file yang sudah terunggah tetap ada
+    def cancel(self):
+        self._cancel.set()
+
+    # Tunggu sampai selesai atau timeout; True jika semua file sudah diproses
+    def wait(self, timeout=None):
+        futures_wait(self._futures, timeout=timeout)
+        finished = all(f.done() for f in self._futures)
+        if finished and self.end_time is None:
+            self.end_time = time.perf_counter()
+        return finished
+
+    def done_bytes(self):
+        with self._lock:
+            return sum(item.sent for item in self.items)
+
+    def elapsed(self):
+        end = self.end_time or time.perf_counter()
+        return end - self.start_time if self.start_time else 0.0
+
+    def rate(self):
+        elapsed = self.elapsed()
+        return self.done_bytes() / elapsed / MB if elapsed > 0 else 0.0
+
+    def rows(self):
+        return [{
+            'file': item.name,
+            'status': item.status,
+            'ukuran (KB)': round(item.size / 1024, 1),
+            'percobaan': item.attempts,
+            'MB/s': round(item.size / item.seconds / MB, 2) if item.seconds else None,
+            'error': item.error or ""
+        } for item in self.items]
+
+    def summary(self):
+        succeeded = sum(1 for item in self.items if item.status == "berhasil")
+        return {
+            'files': len(self.items),
+            'succeeded': succeeded,
+            'failed': len(self.items) - succeeded,
+            'bytes': self.done_bytes(),
+            'seconds': self.elapsed(),
+            'rate': self.rate()
+        }
+
+
+# Download satu file besar sebagai beberapa rentang byte paralel. Tiap
+# rentang dibaca dengan readv (request READ dipipeline) lewat channel
+# SFTP sendiri. Progres per rentang disimpan di <part>.json sehingga
+# download yang terputus bisa dilanjutkan dari offset terakhir yang valid.
+class RangeDownload:
+    def __init__(self, sftp_pool, remote_path, part_path, size, mtime,
+                 workers=RANGE_WORKERS, range_size=RANGE_SIZE, retries=3):
+        self.sftp_pool = sftp_pool
+        self.remote_path = remote_path
+        self.part_path = part_path
+        self.state_path = part_path + ".json"
+        self.size = size
+        self.mtime = mtime
+        self.workers = max(1, min(workers, sftp_pool.max_channels))
+        self.range_size = range_size
+        self.retries = retries
+        self.errors = []
+        self.resumed_bytes = 0
+        self.start_time = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._last_save = 0.0
+        self._futures = []
+        self.ranges = self._load_state()
+
+    def _load_state(self):
+        fresh = {offset: 0 for offset in range(0, self.size, self.range_size)}
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if (state['size'] != self.size or state['mtime'] != self.mtime
+                    or state['range_size'] != self.range_size
+                    or os.path.getsize(self.part_path) != self.size):
+                return fresh
+            ranges = {int(offset): written for offset, written in state['ranges'].items()}
+            if set(ranges) != set(fresh):
+                return fresh
+            self.resumed_bytes = sum(ranges.values())
+            return ranges
+        except (OSError, ValueError, KeyError):
+            return fresh
+
+    def _save_state(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_save < 1.0:
+                return
+            self._last_save = now
+            state = {'size': self.size, 'mtime': self.mtime, 'range_size': self.range_size,
+                     'ranges': {str(offset): written for offset, written in self.ranges.items()}}
+        tmp_path = f"{self.state_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        if not self.resumed_bytes:
+            with open(self.part_path, "wb") as f:
+                f.truncate(self.size)
+        self._save_state(force=True)
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="download")
+        self._futures = [executor.submit(self._fetch_range, offset)
+                         for offset in sorted(self.ranges)
+                         if self.ranges[offset] < self._range_length(offset)]
+        executor.shutdown(wait=False)
+        return self
+
+    def _range_length(self, offset):
+        return min(self.range_size, self.size - offset)
+
+    def _fetch_range(self, offset):
+        end = offset + self._range_length(offset)
+        for attempt in range(self.retries + 1):
+            position = offset + self.ranges[offset]
+            if position >= end:
+                return
+            pieces = [(p, min(READ_BLOCK, end - p)) for p in range(position, end, READ_BLOCK)]
+            try:
+                with self.sftp_pool.channel("download_range") as sftp, \
+                        sftp.open(self.remote_path, "rb") as remote, \
+                        open(self.part_path, "r+b") as local:
+                    for (piece_offset, _), data in zip(pieces, remote.readv(pieces)):
+                        if self._cancel.is_set():
+                            self._save_state(force=True)
+                            return
+                        local.seek(piece_offset)
+                        local.write(data)
+                        with self._lock:
+                            self.ranges[offset] += len(data)
+                        self.sftp_pool.stats.add_bytes("download_range", len(data))
+                        self._save_state()
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    with self._lock:
+                        self.errors.append(f"offset {offset}: {e}")
+                    self._save_state(force=True)
+                    return
+                time.sleep(0.5 * (attempt + 1))
+
+    def wait(self, timeout=None):
+        futures_wait(self._futures, timeout=timeout)
+        return all(f.done() for f in self._futures)
+
+    # Berhenti setelah potongan yang sedang ditulis; bisa dilanjutkan nanti
+    def cancel(self):
+        self._cancel.set()
+
+    def done_bytes(self):
+        with self._lock:
+            return sum(self.ranges.values())
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        fetched = self.done_bytes() - self.resumed_bytes
+        return fetched / elapsed / MB if elapsed > 0 else 0.0
+
+    # Pastikan semua rentang lengkap; state dihapus hanya jika sukses
+    def finish(self):
+        self.wait()
+        self._save_state(force=True)
+        if self.errors or self.done_bytes() != self.size:
+            raise IOError("Download belum lengkap, klik lagi untuk melanjutkan: "
+                          + "; ".join(self.errors))
+        try:
+            os.remove(self.state_path)
+        except OSError:
+            pass
+        return self.part_path
@@ -0,0 +1,109 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Lama menunggu lock tulis SQLite sebelum menyerah (detik)
+BUSY_TIMEOUT = 10
+
+
+# Penyimpanan user di SQLite (mode WAL): pembaca tidak diblok penulis dan
+# tiap registrasi adalah satu INSERT atomik, bukan menulis ulang seluruh file.
+# Hash password di-cache di memori proses sehingga login tidak membaca disk.
+class UserStore:
+    def __init__(self, path, cache_size=100000):
+        self.path = path
+        self.cache_size = cache_size
+        self._local = threading.local()
+        self._cache = {}
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS users (
+                                username TEXT PRIMARY KEY,
+                                password_hash TEXT NOT NULL,
+                                created REAL NOT NULL)""")
+
+    # Satu koneksi per thread; sqlite3 tidak boleh dipakai bersama antar thread
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, username, password_hash):
+        with self._lock:
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[username] = password_hash
+
+    # Hash password user, atau None jika tidak terdaftar
+    def get_hash(self, username):
+        with self._lock:
+            if username in self._cache:
+                return self._cache[username]
+        row = self._connect().execute("SELECT password_hash FROM users WHERE username = ?",
+                                      (username,)).fetchone()
+        if row is None:
+            return None
+        self._remember(username, row[0])
+        return row[0]
+
+    def exists(self, username):
+        return self.get_hash(username) is not None
+
+    # Tambah user; False jika username sudah ada (juga saat registrasi bersamaan)
+    def add(self, username, password_hash):
+        try:
+            self._connect().execute("INSERT INTO users (username, password_hash, created) VALUES (?, ?, ?)",
+                                    (username, password_hash, time.time()))
+        except sqlite3.IntegrityError:
+            return False
+        self._remember(username, password_hash)
+        return True
+
+    def update_hash(self, username, password_hash):
+        self._connect().execute("UPDATE users SET password_hash = ? WHERE username = ?",
+                                (password_hash, username))
+        self._remember(username, password_hash)
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    # Impor user dari users.json lama ({username: hash}) dalam satu transaksi.
+    # User yang sudah ada tidak ditimpa. Hasilnya (diimpor, dilewati).
+    def import_json(self, json_path):
+        with open(json_path) as f:
+            users = json.load(f)
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO users (username, password_hash, created) VALUES (?, ?, ?)",
+                             [(username, password_hash, now) for username, password_hash in users.items()])
+            imported = conn.total_changes - before
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return imported, len(users) - imported
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# Impor users.json sekali: setelah berhasil file lama diganti nama menjadi
+# <nama>.imported agar tidak diimpor ulang. Hasilnya (diimpor, dilewati) atau None.
+def migrate_json(store, json_path):
+    if not os.path.exists(json_path):
+        return None
+    result = store.import_json(json_path)
+    os.replace(json_path, json_path + ".imported")
+    return result
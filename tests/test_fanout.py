@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.standin import StandinServer
+from sshfm.fanout import FanoutRun, parse_inventory
+from sshfm.metrics import OpStats
+
+# Fan-out perintah ke beberapa server SSH lokal (stand-in), tanpa server asli.
+# Jalankan dari root repo: python -m pytest tests
+
+
+@pytest.fixture(scope="module")
+def servers():
+    servers = [StandinServer().start() for _ in range(3)]
+    yield servers
+    for server in servers:
+        server.stop()
+
+
+def inventory_for(servers):
+    return parse_inventory("\n".join(f"bench@127.0.0.1:{server.port}" for server in servers))
+
+
+def connector(servers):
+    by_port = {server.port: server for server in servers}
+    return lambda entry: by_port[entry['port']].connect(entry['user'])
+
+
+def test_parse_inventory():
+    hosts = parse_inventory("""
+        # rak A
+        web1, admin@web2:2222
+        web1 [::1]:2200   # duplikat web1 diabaikan
+    """)
+    assert [h['label'] for h in hosts] == ["root@web1", "admin@web2:2222", "root@::1:2200"]
+    assert hosts[1] == {'host': "web2", 'user': "admin", 'port': 2222, 'label': "admin@web2:2222"}
+    assert hosts[2]['host'] == "::1" and hosts[2]['port'] == 2200
+
+
+def test_identical_outputs_are_grouped(servers):
+    stats = OpStats()
+    fanout = FanoutRun(inventory_for(servers), "echo sama; exit 3", connector(servers),
+                       stats=stats).start()
+    assert fanout.wait(30)
+    assert [h.status for h in fanout.hosts] == ["selesai"] * 3
+    assert [row['exit code'] for row in fanout.rows()] == [3, 3, 3]
+    groups = fanout.groups()
+    assert len(groups) == 1
+    assert groups[0]['exit_code'] == 3 and groups[0]['stdout'] == "sama\n"
+    assert sorted(groups[0]['hosts']) == sorted(h.label for h in fanout.hosts)
+    assert {row['host'] for row in stats.snapshot() if row['operasi'] == "exec"} == {h.label for h in fanout.hosts}
+
+
+def test_unreachable_host_gets_its_own_group(servers):
+    hosts = inventory_for(servers) + parse_inventory("bench@127.0.0.1:1")
+    connect = connector(servers)
+
+    def connect_or_fail(entry):
+        if entry['port'] == 1:
+            raise ConnectionRefusedError("koneksi ditolak")
+        return connect(entry)
+
+    fanout = FanoutRun(hosts, "echo ok", connect_or_fail).start()
+    assert fanout.wait(30)
+    failed = fanout.hosts[-1]
+    assert failed.status == "error" and "ditolak" in failed.error
+    groups = fanout.groups()
+    assert [len(g['hosts']) for g in groups] == [3, 1]
+    assert groups[1]['hosts'] == [failed.label]
+
+
+def test_sessions_are_bounded_by_workers(servers):
+    hosts = inventory_for(servers) * 2
+    for i, entry in enumerate(hosts):
+        hosts[i] = dict(entry, label=f"{entry['label']}#{i}")
+    lock = threading.Lock()
+    active = [0, 0]
+    connect = connector(servers)
+
+    def counting_connect(entry):
+        with lock:
+            active[0] += 1
+            active[1] = max(active)
+        try:
+            client = connect(entry)
+            time.sleep(0.2)
+            return client
+        finally:
+            with lock:
+                active[0] -= 1
+
+    fanout = FanoutRun(hosts, "true", counting_connect, workers=2).start()
+    assert fanout.wait(30)
+    assert fanout.workers == 2
+    assert active[1] == 2
+    assert all(h.status == "selesai" for h in fanout.hosts)
+
+
+def test_cancel_stops_running_commands(servers):
+    fanout = FanoutRun(inventory_for(servers), "sleep 30", connector(servers)).start()
+    deadline = time.monotonic() + 10
+    while any(h.status != "berjalan" for h in fanout.hosts) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    fanout.cancel()
+    assert fanout.wait(10)
+    assert [h.status for h in fanout.hosts] == ["dibatalkan"] * 3
+    assert fanout.elapsed() < 10